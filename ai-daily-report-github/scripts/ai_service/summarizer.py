@@ -5,11 +5,14 @@
 """
 
 import logging
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 import json
 import re
 
 from ai_service.deepseek_client import get_client
+from ai_service.rate_limiter import estimate_tokens
+from config.settings import LLM_MAX_CONCURRENCY, SUMMARY_BATCH_TOKENS, SUMMARY_BATCH_MAX_ITEMS
 from crawler.models import ScoredNewsItem
 
 logger = logging.getLogger(__name__)
@@ -21,12 +24,14 @@ class Summarizer:
     def __init__(self):
         self.client = get_client()
 
-    def summarize_single(self, title: str, content: str, language: str = "en") -> Optional[str]:
-        """为单条新闻生成中文摘要"""
-        if len(content) > 1200:
-            content = content[:1200] + "..."
+    def summarize_single(self, title: str, content: str, language: str = "en",
+                         compact: bool = False) -> Optional[str]:
+        """为单条新闻生成中文摘要；compact 时（摘要预算用尽）只给短正文、要短摘要"""
+        limit = self.COMPACT_CONTENT_PER_ITEM if compact else 1200
+        if len(content) > limit:
+            content = content[:limit] + "..."
 
-        prompt = self._build_summary_prompt(title, content, language)
+        prompt = self._build_summary_prompt(title, content, language, "50字以内" if compact else "100-150字")
 
         messages = [
             {
@@ -36,7 +41,8 @@ class Summarizer:
             {"role": "user", "content": prompt}
         ]
 
-        response = self.client.chat(messages, temperature=0.3, max_tokens=500)
+        response = self.client.chat(messages, temperature=0.3, max_tokens=200 if compact else 500,
+                                    stage="summarize")
 
         if response:
             summary = response.strip().strip('"\'')
@@ -60,14 +66,14 @@ class Summarizer:
         summary_lower = summary.lower()
         return any(kw in summary_lower for kw in cls.INVALID_SUMMARY_KEYWORDS)
 
-    def _build_summary_prompt(self, title: str, content: str, language: str) -> str:
+    def _build_summary_prompt(self, title: str, content: str, language: str, length: str = "100-150字") -> str:
         if language == "zh":
-            return f"""为以下新闻生成100-150字中文摘要，提取核心事件，保持客观，保留公司名原名，正文不足时根据标题推断，直接输出摘要：
+            return f"""为以下新闻生成{length}中文摘要，提取核心事件，保持客观，保留公司名原名，正文不足时根据标题推断，直接输出摘要：
 
 标题：{title}
 正文：{content}"""
         else:
-            return f"""将以下英文新闻翻译并总结成100-150字中文摘要，提取核心事件，保持客观，保留公司名原名，正文不足时根据标题推断，直接输出摘要：
+            return f"""将以下英文新闻翻译并总结成{length}中文摘要，提取核心事件，保持客观，保留公司名原名，正文不足时根据标题推断，直接输出摘要：
 
 Title: {title}
 Content: {content}"""
@@ -75,43 +81,30 @@ Content: {content}"""
     def summarize_batch(
         self,
         news_list: List[ScoredNewsItem],
-        batch_size: int = 2
+        batch_size: int = SUMMARY_BATCH_MAX_ITEMS,
+        fallback: Optional[List[ScoredNewsItem]] = None
     ) -> List[ScoredNewsItem]:
-        """批量生成摘要"""
+        """
+        批量生成摘要：按预估 token 打包，多批并发请求，失败的批次拆小重试
+        fallback: 传入列表时，模型调用最终失败、改用原摘要兜底的条目追加到其中
+        """
         logger.info(f"开始批量生成摘要: {len(news_list)} 条新闻")
 
-        for i in range(0, len(news_list), batch_size):
-            batch = news_list[i:i + batch_size]
-
-            if len(batch) > 1:
-                summaries = self._batch_summarize(batch)
-                if summaries:
-                    for j, item in enumerate(batch):
-                        if j < len(summaries):
-                            s = summaries[j]
-                            # 容错：模型可能返回 dict 而非 str
-                            if isinstance(s, dict):
-                                s = s.get("content", s.get("summary", str(s)))
-                            item.summary_cn = str(s).strip() if s else ""
-                            logger.debug(f"批量摘要完成: {item.raw_item.title[:30]}...")
-                    continue
-
-            # 批量失败或单条 → 逐条处理
-            for item in batch:
-                if item.summary_cn:
-                    continue
-                content = item.raw_item.content or item.raw_item.summary or ""
-                # 即使正文为空，也用标题生成摘要
-                if not content:
-                    content = item.raw_item.title
-                summary = self.summarize_single(
-                    item.raw_item.title,
-                    content,
-                    item.raw_item.language
-                )
-                if summary:
-                    item.summary_cn = summary
-                    logger.debug(f"单条摘要完成: {item.raw_item.title[:30]}...")
+        pending = [item for item in news_list if not item.summary_cn]
+        entries = [self._batch_entry(item) for item in pending]
+        packs = self._pack(entries, batch_size)
+        logger.info(f"打包为 {len(packs)} 批，并发 {min(LLM_MAX_CONCURRENCY, len(packs))}")
+
+        # 结果按下标回填，与完成先后无关
+        results: Dict[int, str] = {}
+        if packs:
+            with ThreadPoolExecutor(max_workers=min(LLM_MAX_CONCURRENCY, len(packs))) as pool:
+                futures = [pool.submit(self._summarize_pack, pending, entries, pack) for pack in packs]
+                for future in futures:
+                    results.update(future.result())
+        for i, item in enumerate(pending):
+            if i in results:
+                item.summary_cn = results[i]
 
         # 最后兜底：仍无摘要的用 raw_item.summary 填充
         no_summary_count = 0
@@ -119,33 +112,77 @@ Content: {content}"""
             if not item.summary_cn:
                 item.summary_cn = item.raw_item.summary or ""
                 no_summary_count += 1
+                if fallback is not None:
+                    fallback.append(item)
         if no_summary_count:
             logger.warning(f"仍有 {no_summary_count} 条新闻无摘要")
 
         logger.info(f"摘要生成完成，消耗tokens: {self.client.get_total_tokens()}")
         return news_list
 
-    def _batch_summarize(self, batch: List[ScoredNewsItem]) -> Optional[List[str]]:
-        """批量处理多条新闻（单次API调用）"""
-        MAX_CONTENT_PER_ITEM = 600
-        MAX_TOTAL_CHARS = 2500
-
-        news_texts = []
-        total_chars = 0
-        for i, item in enumerate(batch):
-            content = item.raw_item.content or item.raw_item.summary
-            if len(content) > MAX_CONTENT_PER_ITEM:
-                content = content[:MAX_CONTENT_PER_ITEM] + "..."
-
-            entry = f"【新闻{i + 1}】({item.raw_item.language == 'en' and '英文' or '中文'})\n标题: {item.raw_item.title}\n正文: {content}"
-            news_texts.append(entry)
-
-            total_chars += len(entry)
-            if total_chars > MAX_TOTAL_CHARS:
-                logger.warning(f"批量输入过长 ({total_chars} chars)，改为逐条处理")
-                return None
-
-        prompt = f"""为以下{len(batch)}条新闻各生成50-80字中文摘要，英文新闻先翻译再总结，正文不足时根据标题推断，按JSON数组输出["摘要1","摘要2"]，只输出数组：
+    MAX_CONTENT_PER_ITEM = 600
+    COMPACT_CONTENT_PER_ITEM = 300  # 预算用尽后的短摘要模式
+
+    def _batch_entry(self, item: ScoredNewsItem) -> str:
+        """批量提示词中单条新闻的内容（不含序号）"""
+        content = item.raw_item.content or item.raw_item.summary or ""
+        if len(content) > self.MAX_CONTENT_PER_ITEM:
+            content = content[:self.MAX_CONTENT_PER_ITEM] + "..."
+        language = item.raw_item.language == 'en' and '英文' or '中文'
+        return f"({language})\n标题: {item.raw_item.title}\n正文: {content}"
+
+    @staticmethod
+    def _pack(entries: List[str], max_items: int) -> List[List[int]]:
+        """按原顺序贪心打包：预估 token 超出预算或条数到上限时另起一批"""
+        packs, current, current_tokens = [], [], 0
+        for i, entry in enumerate(entries):
+            tokens = estimate_tokens(entry)
+            if current and (len(current) >= max_items or current_tokens + tokens > SUMMARY_BATCH_TOKENS):
+                packs.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            packs.append(current)
+        return packs
+
+    def _summarize_pack(self, items: List[ScoredNewsItem], entries: List[str], pack: List[int]) -> Dict[int, str]:
+        """处理一批，返回 {下标: 摘要}；批量失败时对半拆分重试，单条走逐条接口"""
+        compact = self.client.usage.over_budget("summarize")
+        if len(pack) > 1:
+            summaries = self._batch_summarize([entries[i] for i in pack], compact)
+            if summaries:
+                result = {}
+                for i, s in zip(pack, summaries):
+                    # 容错：模型可能返回 dict 而非 str
+                    if isinstance(s, dict):
+                        s = s.get("content", s.get("summary", str(s)))
+                    result[i] = str(s).strip() if s else ""
+                    logger.debug(f"批量摘要完成: {items[i].raw_item.title[:30]}...")
+                return result
+            mid = len(pack) // 2
+            logger.info(f"批量摘要失败，拆分为 {mid} + {len(pack) - mid} 条重试")
+            result = self._summarize_pack(items, entries, pack[:mid])
+            result.update(self._summarize_pack(items, entries, pack[mid:]))
+            return result
+
+        item = items[pack[0]]
+        # 即使正文为空，也用标题生成摘要
+        content = item.raw_item.content or item.raw_item.summary or item.raw_item.title
+        summary = self.summarize_single(item.raw_item.title, content, item.raw_item.language, compact)
+        if summary:
+            logger.debug(f"单条摘要完成: {item.raw_item.title[:30]}...")
+            return {pack[0]: summary}
+        return {}
+
+    def _batch_summarize(self, entries: List[str], compact: bool = False) -> Optional[list]:
+        """批量处理多条新闻（单次API调用）；compact 时截短正文、要求30-50字摘要"""
+        if compact:
+            entries = [entry[:self.COMPACT_CONTENT_PER_ITEM] for entry in entries]
+        news_texts = [f"【新闻{i + 1}】{entry}" for i, entry in enumerate(entries)]
+        length = "30-50字" if compact else "50-80字"
+
+        prompt = f"""为以下{len(entries)}条新闻各生成{length}中文摘要，英文新闻先翻译再总结，正文不足时根据标题推断，按JSON数组输出["摘要1","摘要2"]，只输出数组：
 
 {chr(10).join(news_texts)}"""
 
@@ -157,7 +194,9 @@ Content: {content}"""
             {"role": "user", "content": prompt}
         ]
 
-        response = self.client.chat(messages, temperature=0.3, max_tokens=1500)
+        max_tokens = max(600, 150 * len(entries)) if compact else max(1500, 400 * len(entries))
+        response = self.client.chat(messages, temperature=0.3, max_tokens=max_tokens,
+                                    stage="summarize", items=len(entries))
 
         if response:
             try:
@@ -172,10 +211,10 @@ Content: {content}"""
                     cleaned = json_match.group(0)
 
                 summaries = json.loads(cleaned)
-                if isinstance(summaries, list) and len(summaries) == len(batch):
+                if isinstance(summaries, list) and len(summaries) == len(entries):
                     return summaries
                 elif isinstance(summaries, list) and len(summaries) > 0:
-                    logger.warning(f"批量摘要数量不匹配: 期望{len(batch)}，得到{len(summaries)}")
+                    logger.warning(f"批量摘要数量不匹配: 期望{len(entries)}，得到{len(summaries)}")
             except Exception as e:
                 logger.warning(f"批量摘要解析失败: {e}")
 
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+标题去重基准 + 与旧实现的一致性校验
+
+旧实现（两两 SequenceMatcher）保留在本脚本中作为参照，
+逐条比较新旧输出的顺序与内容，不一致时以非零状态退出：
+    python benchmarks/bench_dedup.py                       # 合成数据，默认 2000 条
+    python benchmarks/bench_dedup.py --size 3000 --seed 7
+    python benchmarks/bench_dedup.py --archive ../ai-hourly-buzz/data/archive.json
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from crawler.models import RawNewsItem, ScoredNewsItem
+from processor.deduplicator import Deduplicator
+
+WORDS = (
+    "OpenAI Google Anthropic Meta Microsoft NVIDIA DeepSeek Qwen Claude Gemini GPT model "
+    "launches releases unveils agent reasoning open-source benchmark chip funding startup "
+    "raises billion training inference multimodal video image coding robotics safety "
+    "policy EU regulation datacenter GPU partnership API pricing update preview"
+).split()
+ZH_WORDS = "发布 推出 开源 大模型 智能体 推理 融资 芯片 算力 多模态 视频 编程 机器人 安全 监管 合作 更新 测试".split()
+SYLLABLES = "ba ce di fo gu ka le mi no pu ra se ti vo xu za ne ko ri ta lu mo".split()
+ZH_CHARS = "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可也能下过子说产种面而方后多定行学法所民得经"
+SOURCE_TYPES = ["official", "en_media", "zh_media", "shared"]
+
+
+def reference_deduplicate(news_list, threshold=0.8):
+    """改造前的 Deduplicator.deduplicate（去掉 URL 缓存部分）"""
+    sorted_news = sorted(news_list, key=lambda x: x.relevance_score, reverse=True)
+    unique = []
+    seen_titles = {}
+    for item in sorted_news:
+        title = item.raw_item.title.lower().strip()
+        is_dup = False
+        for seen_title, seen_item in seen_titles.items():
+            if SequenceMatcher(None, title, seen_title).ratio() >= threshold:
+                is_dup = True
+                if item.raw_item.source_type == "official" and seen_item.raw_item.source_type != "official":
+                    unique.remove(seen_item)
+                    del seen_titles[seen_title]
+                    unique.append(item)
+                    seen_titles[title] = item
+                break
+        if not is_dup:
+            unique.append(item)
+            seen_titles[title] = item
+    return unique
+
+
+def _mutate(title: str, rng: random.Random) -> str:
+    """制造近似重复：换词、删词、改大小写、加前后缀"""
+    words = title.split()
+    op = rng.random()
+    if op < 0.3 and len(words) > 3:
+        del words[rng.randrange(len(words))]
+    elif op < 0.6:
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+    elif op < 0.8:
+        words.append(rng.choice(["- report", "| TechCrunch", "(updated)", "今日"]))
+    else:
+        return title.upper()
+    return " ".join(words)
+
+
+def synthetic_items(size: int, seed: int):
+    rng = random.Random(seed)
+    items = []
+    base_titles = []
+    # 常见词 + 随机拼出的长尾词，接近真实标题的词汇分布
+    vocab = WORDS + ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(3000)]
+    for i in range(size):
+        if base_titles and rng.random() < 0.35:
+            title = _mutate(rng.choice(base_titles), rng)
+        else:
+            if rng.random() < 0.3:
+                title = "".join(
+                    rng.choice(ZH_WORDS) if rng.random() < 0.3 else "".join(rng.sample(ZH_CHARS, 2))
+                    for _ in range(rng.randint(6, 12))
+                )
+            else:
+                title = " ".join(
+                    rng.choice(WORDS) if rng.random() < 0.3 else rng.choice(vocab)
+                    for _ in range(rng.randint(6, 14))
+                )
+            base_titles.append(title)
+        items.append(_scored(i, title, rng.choice(SOURCE_TYPES), round(rng.random() * 10, 1)))
+    return items
+
+
+def archive_items(path: Path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    raw = data if isinstance(data, list) else data.get("items", [])
+    rng = random.Random(0)
+    items = []
+    for i, entry in enumerate(raw):
+        title = entry.get("title", "")
+        if title:
+            source_type = "official" if rng.random() < 0.15 else "shared"
+            items.append(_scored(i, title, source_type, round(rng.random() * 10, 1)))
+    return items
+
+
+def _scored(i: int, title: str, source_type: str, score: float) -> ScoredNewsItem:
+    raw = RawNewsItem(
+        id=str(i), title=title, url=f"https://example.com/{i}",
+        source_key="bench", source_name="bench", source_type=source_type,
+        language="en", pub_time=None, summary="", content="",
+    )
+    return ScoredNewsItem(raw_item=raw, relevance_score=score)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="标题去重基准")
+    parser.add_argument("--size", type=int, default=2000, help="合成数据条数")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--archive", help="改用 archive.json 中的真实标题")
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--skip-reference", action="store_true", help="只测新实现（大数据量时旧实现很慢）")
+    args = parser.parse_args()
+
+    items = archive_items(Path(args.archive)) if args.archive else synthetic_items(args.size, args.seed)
+    print(f"数据: {len(items)} 条，阈值 {args.threshold}")
+
+    start = time.perf_counter()
+    result = Deduplicator(threshold=args.threshold).deduplicate(items)
+    new_time = time.perf_counter() - start
+    print(f"新实现: {new_time:.3f}s -> {len(result)} 条")
+
+    if args.skip_reference:
+        return 0
+
+    start = time.perf_counter()
+    expected = reference_deduplicate(items, args.threshold)
+    old_time = time.perf_counter() - start
+    print(f"旧实现: {old_time:.3f}s -> {len(expected)} 条（加速 {old_time / max(new_time, 1e-9):.1f}x）")
+
+    got_ids = [item.raw_item.id for item in result]
+    expected_ids = [item.raw_item.id for item in expected]
+    if got_ids != expected_ids:
+        mismatch = next((i for i, (a, b) in enumerate(zip(got_ids, expected_ids)) if a != b),
+                        min(len(got_ids), len(expected_ids)))
+        print(f"输出不一致：第 {mismatch} 条起不同")
+        return 1
+    print("输出一致")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+关键词评分基准 + 与旧实现的一致性校验
+
+旧实现（五张表逐条 search）保留在本脚本中作为参照，
+逐条比较 check_keywords 的返回值，不一致时以非零状态退出：
+    python benchmarks/bench_keywords.py                    # 合成数据，默认各 2000 条
+    python benchmarks/bench_keywords.py --size 5000 --seed 7
+    python benchmarks/bench_keywords.py --archive ../ai-hourly-buzz/data/archive.json
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import keywords as K
+
+FILLER_EN = (
+    "the a of and to in is for on with that by from this new company said will more has its are at "
+    "as be it users data one people year time could would after before over about these their there "
+    "market product industry report week Really How Why Can Not yet"
+).split()
+FILLER_ZH = "的 一 是 在 不 了 有 和 人 这 中 大 为 上 个 国 我 以 要 他 时 来 用 们 生 到 作 地 于 出 就 分 对 成".split()
+# 大小写折叠的边界字符也混进去
+ODD_CHARS = ["İ", "ı", "ſ", "K", "Ä", "é", "ß", "ＡＩ"]
+
+
+def reference_check_keywords(text: str, language: str) -> dict:
+    """改造前的 check_keywords"""
+    if language == "zh":
+        high = [kw for kw, p in zip(K.HIGH_VALUE_ZH, K.COMPILED_HIGH_ZH) if p.search(text)]
+        core = [kw for kw, p in zip(K.CORE_KEYWORDS_ZH, K.COMPILED_CORE_ZH) if p.search(text)]
+        aux = [kw for kw, p in zip(K.AUX_KEYWORDS_ZH, K.COMPILED_AUX_ZH) if p.search(text)]
+        exclude = any(p.search(text) for p in K.COMPILED_EXCLUDE_ZH)
+        low_signals = sum(1 for p in K.COMPILED_LOW_ZH if p.search(text))
+    else:
+        t = text.lower()
+        high = [kw for kw, p in zip(K.HIGH_VALUE_EN, K.COMPILED_HIGH_EN) if p.search(t)]
+        core = [kw for kw, p in zip(K.CORE_KEYWORDS_EN, K.COMPILED_CORE_EN) if p.search(t)]
+        aux = [kw for kw, p in zip(K.AUX_KEYWORDS_EN, K.COMPILED_AUX_EN) if p.search(t)]
+        exclude = any(p.search(t) for p in K.COMPILED_EXCLUDE_EN)
+        low_signals = sum(1 for p in K.COMPILED_LOW_EN if p.search(t))
+
+    return {
+        "pass": len(core) >= 1 and not exclude,
+        "high_matched": high,
+        "core_matched": core,
+        "aux_matched": aux,
+        "has_exclude": exclude,
+        "low_signal_count": low_signals,
+    }
+
+
+def _plain(pattern: str) -> str:
+    """把正则关键词还原成能命中它的普通文本"""
+    return (pattern.replace(r"\b", "").replace(r"\s+", " ").replace(r"\s*", " ")
+            .replace(".*", " really ").replace(".?", "-").replace("[134]", "3").replace(r"\d", "4"))
+
+
+def _vary_case(word: str, rng: random.Random) -> str:
+    op = rng.random()
+    if op < 0.2:
+        return word.upper()
+    if op < 0.4:
+        return word.title()
+    return word
+
+
+def synthetic_texts(size: int, seed: int, language: str):
+    rng = random.Random(seed)
+    if language == "zh":
+        filler = FILLER_ZH
+        vocab = K.HIGH_VALUE_ZH + K.CORE_KEYWORDS_ZH + K.AUX_KEYWORDS_ZH + K.EXCLUDE_KEYWORDS_ZH + K.LOW_VALUE_SIGNALS_ZH
+        sep = ""
+    else:
+        filler = FILLER_EN
+        vocab = [_plain(p) for p in
+                 K.HIGH_VALUE_EN + K.CORE_KEYWORDS_EN + K.AUX_KEYWORDS_EN + K.EXCLUDE_KEYWORDS_EN + K.LOW_VALUE_SIGNALS_EN]
+        sep = " "
+    texts = []
+    for _ in range(size):
+        length = rng.randint(20, 400)
+        # 约一半是稀疏文本（接近真实新闻），一半是关键词密集的压力文本
+        density = 0.02 if rng.random() < 0.5 else 0.3
+        words = []
+        for _ in range(length):
+            r = rng.random()
+            if r < density:
+                words.append(_vary_case(rng.choice(vocab), rng))
+            elif r < density + 0.002:
+                words.append(rng.choice(ODD_CHARS))
+            else:
+                words.append(rng.choice(filler))
+        texts.append(sep.join(words))
+    return texts
+
+
+def archive_texts(path: Path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    raw = data if isinstance(data, list) else data.get("items", [])
+    pairs = []
+    for entry in raw:
+        text = f"{entry.get('title', '')} {entry.get('summary', '') or entry.get('description', '')}"
+        if text.strip():
+            language = "zh" if any("一" <= c <= "鿿" for c in text) else "en"
+            pairs.append((text, language))
+    return pairs
+
+
+def _timed(func, pairs):
+    start = time.perf_counter()
+    results = [func(text, language) for text, language in pairs]
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="关键词评分基准")
+    parser.add_argument("--size", type=int, default=2000, help="每种语言的合成文本条数")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--archive", help="改用 archive.json 中的真实标题与摘要")
+    args = parser.parse_args()
+
+    if args.archive:
+        pairs = archive_texts(Path(args.archive))
+    else:
+        pairs = [(t, "en") for t in synthetic_texts(args.size, args.seed, "en")]
+        pairs += [(t, "zh") for t in synthetic_texts(args.size, args.seed + 1, "zh")]
+    print(f"数据: {len(pairs)} 条")
+
+    status = 0
+    for language in ("en", "zh"):
+        subset = [p for p in pairs if p[1] == language]
+        if not subset:
+            continue
+        got, new_time = _timed(K.check_keywords, subset)
+        expected, old_time = _timed(reference_check_keywords, subset)
+        print(f"[{language}] {len(subset)} 条  新实现 {new_time:.3f}s  旧实现 {old_time:.3f}s"
+              f"（加速 {old_time / max(new_time, 1e-9):.1f}x）")
+        for (text, _), a, b in zip(subset, got, expected):
+            if a != b:
+                print(f"[{language}] 输出不一致: {text[:80]!r}\n  新: {a}\n  旧: {b}")
+                status = 1
+                break
+    print("输出一致" if status == 0 else "存在不一致")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共享数据规模基准
+
+读取 ai-hourly-buzz 的 benchmarks/gen_archive.py 生成的各规模合成数据（每档一个目录，
+含 archive.json / title-zh-cache.json），每档在独立子进程中依次运行
+SharedDataLoader.load → KeywordFilter.filter_news → Deduplicator.deduplicate（临时 URL 缓存库），
+输出各步耗时与该进程的峰值内存：
+    python ../../ai-hourly-buzz-github/scripts/benchmarks/bench_scale.py --tiers 7,30,90   # 先生成数据
+    python benchmarks/bench_shared_scale.py --data-root /tmp/buzz-scale
+    python benchmarks/bench_shared_scale.py --data-root /tmp/buzz-scale --tiers 30d-800 --hours 48
+    python benchmarks/bench_shared_scale.py --full-scan                                  # 对照：不用按天切分
+    python benchmarks/bench_shared_scale.py --tiers 30d-800 --query-socket /tmp/q.sock   # 经由查询服务
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+_CST = timezone(timedelta(hours=8))
+
+
+def peak_rss_mb() -> float:
+    # Linux 上 ru_maxrss 单位是 KiB，macOS 上是字节
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_child(data_dir: Path, hours: int, full_scan: bool, query_socket: str) -> dict:
+    from crawler.shared_loader import SharedDataLoader
+    from processor.deduplicator import Deduplicator
+    from processor.filter import KeywordFilter
+
+    timings = {}
+    started = time.perf_counter()
+    # 指向不存在的切分目录即走全量读取
+    days_dir = data_dir / "no-archive-days" if full_scan else None
+    loader = SharedDataLoader(data_dir / "archive.json", data_dir / "title-zh-cache.json", days_dir, query_socket)
+    raw = loader.load(hours=hours)
+    timings["load"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    scored = KeywordFilter().filter_news(raw)
+    timings["filter"] = time.perf_counter() - started
+
+    with tempfile.TemporaryDirectory(prefix="bench-shared-") as tmp:
+        deduplicator = Deduplicator(cache_file=Path(tmp) / "processed_urls.sqlite3", retention_days=7)
+        # 前一天的日报已发布过一部分 URL
+        deduplicator.mark_processed(scored[::4])
+        today = datetime.now(_CST).replace(hour=0, minute=0, second=0, microsecond=0)
+        started = time.perf_counter()
+        unique = deduplicator.deduplicate(scored, processed_before=today + timedelta(days=1))
+        timings["dedupe"] = time.perf_counter() - started
+        deduplicator.url_cache.close()
+
+    return {
+        "archive_mb": (data_dir / "archive.json").stat().st_size / 1e6,
+        "loaded": len(raw),
+        "filtered": len(scored),
+        "unique": len(unique),
+        "timings": timings,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def find_tiers(data_root: Path, names: str) -> list:
+    if names:
+        return [data_root / name.strip() for name in names.split(",") if name.strip()]
+    tiers = [p.parent for p in data_root.glob("*/archive.json")]
+    return sorted(tiers, key=lambda p: p.joinpath("archive.json").stat().st_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="共享数据规模基准（加载 → 关键词筛选 → 去重）")
+    parser.add_argument("--data-root", default=str(Path(tempfile.gettempdir()) / "buzz-scale"),
+                        help="gen_archive.py / bench_scale.py 生成数据的根目录")
+    parser.add_argument("--tiers", default="", help="只跑指定的档位目录名，逗号分隔（默认全部，按大小排序）")
+    parser.add_argument("--hours", type=int, default=28, help="SharedDataLoader.load 的时间窗口")
+    parser.add_argument("--full-scan", action="store_true", help="忽略 archive-days 切分，全量读取 archive.json")
+    parser.add_argument("--query-socket", default="",
+                        help="经由 buzz 的 shared_query_server 加载（服务需以同一档位目录为 --data-dir 启动，只跑一个档位）")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(Path(args.child), args.hours, args.full_scan, args.query_socket)))
+        return 0
+
+    tiers = find_tiers(Path(args.data_root), args.tiers)
+    if not tiers:
+        print(f"{args.data_root} 下没有合成数据，先运行 ai-hourly-buzz 的 benchmarks/gen_archive.py 或 bench_scale.py")
+        return 1
+
+    ok = True
+    for data_dir in tiers:
+        command = [sys.executable, __file__, "--child", str(data_dir), "--hours", str(args.hours)]
+        if args.full_scan:
+            command.append("--full-scan")
+        if args.query_socket:
+            command += ["--query-socket", args.query_socket]
+        proc = subprocess.run(command, capture_output=True, text=True)
+        if proc.returncode != 0:
+            ok = False
+            print(f"{data_dir.name} 运行失败:\n{proc.stderr.strip()}")
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        t = r["timings"]
+        print(f"{data_dir.name:>12}  archive {r['archive_mb']:7.1f} MB | 加载 {r['loaded']} → 筛选 {r['filtered']} → "
+              f"去重 {r['unique']} | load {t['load'] * 1000:.0f}ms  filter {t['filter'] * 1000:.0f}ms  "
+              f"dedupe {t['dedupe'] * 1000:.0f}ms | 峰值内存 {r['peak_rss_mb']:.1f} MB")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
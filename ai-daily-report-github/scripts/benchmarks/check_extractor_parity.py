@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+正文提取新旧实现一致性校验
+
+旧实现（每个策略各自用 BeautifulSoup 重新解析整页）保留在本脚本中作为参照，
+逐页比较 ContentExtractor.extract_html 与旧实现的 (正文, 发布时间)，不一致时以非零状态退出。
+默认使用合成页面（覆盖 readability / 自定义选择器 / 通用提取三条路径和各种发布时间写法），
+也可以附带 bench_extractor.py 的语料目录：
+    python benchmarks/check_extractor_parity.py                  # 合成 60 页
+    python benchmarks/check_extractor_parity.py --pages 200 --seed 7
+    python benchmarks/check_extractor_parity.py --corpus /tmp/extract-corpus
+
+_TreeDocument 依赖 readability 的私有方法 _parse 接受 lxml 树，升级 readability-lxml 前先跑本脚本。
+"""
+
+import argparse
+import random
+import re
+import sys
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup
+
+from config.settings import REQUEST_HEADERS
+from crawler.content_extractor import ContentExtractor
+
+WORDS = (
+    "model training inference agent benchmark open-source release dataset GPU cluster "
+    "reasoning multimodal safety evaluation latency throughput startup funding partnership "
+    "research paper team developers API pricing preview update robotics video coding"
+).split()
+ZH_CHARS = "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可也能下过子说产种面而方后多定行学法所民得经"
+URLS = [
+    "https://techcrunch.com/2026/01/01/post",
+    "https://www.theverge.com/ai/123/post",
+    "https://36kr.com/p/123456",
+    "https://example.com/news/1",
+    "",
+]
+
+
+class ReferenceExtractor:
+    """改造前 ContentExtractor 的提取部分（不含下载）"""
+
+    def __init__(self, max_length: int = 3000):
+        self.max_length = max_length
+
+    def extract_html(self, html: str, url: str = "") -> Tuple[str, Optional[str]]:
+        content, pub_time = self._try_readability(html)
+        if not content or len(content) < 100:
+            content, pub_time = self._try_custom(html, url)
+        if not content or len(content) < 100:
+            content, pub_time = self._try_generic(html)
+
+        if content and len(content) > self.max_length:
+            content = content[:self.max_length] + "..."
+
+        return content or "", pub_time
+
+    def _try_readability(self, html: str) -> Tuple[str, Optional[str]]:
+        try:
+            from readability import Document
+            doc = Document(html)
+            content_html = doc.summary()
+            soup = BeautifulSoup(content_html, "lxml")
+            content = soup.get_text(separator="\n", strip=True)
+            pub_time = self._extract_time(html)
+            return content, pub_time
+        except Exception:
+            return "", None
+
+    def _try_custom(self, html: str, url: str) -> Tuple[str, Optional[str]]:
+        soup = BeautifulSoup(html, "lxml")
+        content_elem = None
+        if "techcrunch.com" in url:
+            content_elem = soup.select_one(".article-content") or soup.select_one(".entry-content")
+        elif "theverge.com" in url:
+            content_elem = soup.select_one(".duet--article--article-body-component") or soup.select_one("article")
+        elif "36kr.com" in url:
+            content_elem = soup.select_one(".article-content") or soup.select_one(".common-width")
+        else:
+            content_elem = soup.select_one("article") or soup.select_one(".article-content") or soup.select_one("main")
+
+        if content_elem:
+            return content_elem.get_text(separator="\n", strip=True), self._extract_time(html)
+        return "", None
+
+    def _try_generic(self, html: str) -> Tuple[str, Optional[str]]:
+        soup = BeautifulSoup(html, "lxml")
+        for tag in soup.select("script, style, nav, header, footer, aside"):
+            tag.decompose()
+        for sel in ["article", "main", ".content", "#content"]:
+            elem = soup.select_one(sel)
+            if elem:
+                text = elem.get_text(separator="\n", strip=True)
+                if len(text) > 200:
+                    return text, self._extract_time(str(soup))
+        return "", None
+
+    def _extract_time(self, html: str) -> Optional[str]:
+        soup = BeautifulSoup(html, "lxml")
+        time_elem = soup.select_one("time")
+        if time_elem:
+            return time_elem.get("datetime") or time_elem.get_text(strip=True)
+        meta = soup.select_one('meta[property="article:published_time"]')
+        if meta:
+            return meta.get("content")
+        match = re.search(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}', html)
+        return match.group() if match else None
+
+
+def sentence(rng: random.Random) -> str:
+    if rng.random() < 0.3:
+        return "".join(rng.choice(ZH_CHARS) for _ in range(rng.randint(15, 60))) + "。"
+    words = [rng.choice(WORDS) for _ in range(rng.randint(6, 20))]
+    return " ".join(words).capitalize() + "."
+
+
+def paragraphs(rng: random.Random, count: int) -> str:
+    parts = []
+    for _ in range(count):
+        text = " ".join(sentence(rng) for _ in range(rng.randint(1, 5)))
+        if rng.random() < 0.2:
+            text += f' <a href="/link/{rng.randint(1, 999)}">{rng.choice(WORDS)}</a> {sentence(rng)}'
+        if rng.random() < 0.1:
+            text += f" <!-- {rng.choice(WORDS)} -->"
+        if rng.random() < 0.1:
+            text = f"<strong>{rng.choice(WORDS)}</strong> " + text
+        parts.append(f"<p>{text}</p>")
+    return "\n".join(parts)
+
+
+def time_markup(rng: random.Random) -> Tuple[str, str]:
+    """返回 (head 片段, body 片段)"""
+    stamp = f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00"
+    kind = rng.choice(["time-attr", "time-text", "meta", "inline", "none"])
+    if kind == "time-attr":
+        return "", f'<time datetime="{stamp}+08:00">{stamp[:10]}</time>'
+    if kind == "time-text":
+        return "", f"<time> {stamp[:10]} </time>"
+    if kind == "meta":
+        return f'<meta property="article:published_time" content="{stamp}Z">', ""
+    if kind == "inline":
+        return "", f'<script>var published = "{stamp.replace("T", " ")}";</script>'
+    return "", ""
+
+
+def chrome(rng: random.Random) -> Tuple[str, str]:
+    nav = "<nav>" + "".join(f'<a href="/{w}">{w}</a>' for w in rng.sample(WORDS, 6)) + "</nav>"
+    header = f"<header><h1>{sentence(rng)}</h1>{nav if rng.random() < 0.5 else ''}</header>"
+    footer = f"<footer>{sentence(rng)} <a href='/about'>about</a></footer>"
+    aside = f"<aside class='sidebar'>{paragraphs(rng, 2)}</aside>" if rng.random() < 0.5 else ""
+    return header + (nav if rng.random() < 0.3 else ""), aside + footer
+
+
+def synthetic_page(rng: random.Random) -> Tuple[str, str]:
+    """返回 (html, url)；正文长度与容器随机，覆盖三条提取路径"""
+    url = rng.choice(URLS)
+    head_time, body_time = time_markup(rng)
+    top, bottom = chrome(rng)
+    size = rng.choice([0, 1, 3, 8, 30])
+    body = paragraphs(rng, size)
+    wrapper = rng.choice([
+        "<article>{}</article>",
+        "<div class='article-content'>{}</div>",
+        "<div class='entry-content'>{}</div>",
+        "<div class='duet--article--article-body-component'>{}</div>",
+        "<div class='common-width'>{}</div>",
+        "<main>{}</main>",
+        "<div class='content'>{}</div>",
+        "<div id='content'>{}</div>",
+        "<div class='post'><div>{}</div></div>",
+        "<table><tr><td>{}</td></tr></table>",
+    ])
+    extras = ""
+    if rng.random() < 0.3:
+        extras += "<style>.x { color: red }</style>"
+    if rng.random() < 0.3:
+        extras += "<div hidden>" + sentence(rng) + "</div>"
+    if rng.random() < 0.2:
+        extras += "<div style='display:none'>" + sentence(rng) + "</div>"
+    html = (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>{sentence(rng)}</title>{head_time}"
+        f"<meta name='description' content='{rng.choice(WORDS)}'></head>"
+        f"<body>{top}{extras}{body_time}{wrapper.format(body)}{bottom}</body></html>"
+    )
+    return html, url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="正文提取新旧实现一致性校验")
+    parser.add_argument("--pages", type=int, default=60, help="合成页面数")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--corpus", help="附加校验的 HTML 目录（bench_extractor.py 的语料）")
+    parser.add_argument("--show", type=int, default=3, help="最多打印几处不一致")
+    args = parser.parse_args()
+
+    try:
+        print(f"readability-lxml {version('readability-lxml')}")
+    except PackageNotFoundError:
+        pass
+
+    rng = random.Random(args.seed)
+    pages = [synthetic_page(rng) for _ in range(args.pages)]
+    if args.corpus:
+        for path in sorted(Path(args.corpus).glob("*.html")):
+            pages.append((path.read_text(encoding="utf-8", errors="replace"), ""))
+
+    extractor = ContentExtractor(headers=REQUEST_HEADERS)
+    reference = ReferenceExtractor(max_length=extractor.max_length)
+    mismatches = 0
+    paths = {"前两级命中": 0, "通用提取或为空": 0}
+    for i, (html, url) in enumerate(pages):
+        expected = reference.extract_html(html, url)
+        actual = extractor.extract_html(html, url)
+        paths["前两级命中" if len(expected[0]) >= 100 else "通用提取或为空"] += 1
+        if actual == expected:
+            continue
+        mismatches += 1
+        if mismatches <= args.show:
+            print(f"  第 {i} 页不一致 (url={url or '-'})")
+            print(f"    旧: {expected[1]!r} {expected[0][:120]!r}")
+            print(f"    新: {actual[1]!r} {actual[0][:120]!r}")
+
+    print(f"页面 {len(pages)} 篇: " + " / ".join(f"{k} {v}" for k, v in paths.items()))
+    print(f"不一致 {mismatches} 篇")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
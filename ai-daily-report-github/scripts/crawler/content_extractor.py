@@ -4,115 +4,314 @@
 三级提取：readability → 自定义选择器 → 通用提取
 """
 
-import requests
-from bs4 import BeautifulSoup
+import copy
 import logging
 import re
 import time
-from typing import Optional, Tuple, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple, List
+from urllib.parse import urlparse
 import urllib3
+from requests.compat import chardet
+import lxml.html
+from lxml import etree
+from readability import Document
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+from crawler.content_cache import ContentCache
+from crawler.http_utils import DomainLimiter, pooled_session
 from crawler.models import RawNewsItem
 
 logger = logging.getLogger(__name__)
 
 
+_SKIP_TEXT_TAGS = {"script", "style", "template"}
+_META_PUBLISHED_TIME = etree.XPath('//meta[@property="article:published_time"]')
+_META_DESCRIPTIONS = (
+    etree.XPath('//meta[@name="description" or @name="Description"]/@content'),
+    etree.XPath('//meta[@property="og:description"]/@content'),
+)
+_XPATH_CACHE: Dict[str, etree.XPath] = {}
+
+
+def _selector_xpath(selector: str) -> etree.XPath:
+    """把提取用到的简单 CSS 选择器（tag / .class / #id）编译为 XPath"""
+    xpath = _XPATH_CACHE.get(selector)
+    if xpath is None:
+        if selector.startswith("."):
+            expr = f"//*[contains(concat(' ', normalize-space(@class), ' '), ' {selector[1:]} ')]"
+        elif selector.startswith("#"):
+            expr = f"//*[@id='{selector[1:]}']"
+        else:
+            expr = f"//{selector}"
+        xpath = _XPATH_CACHE[selector] = etree.XPath(expr)
+    return xpath
+
+
+def _select_all(tree, selector: str) -> list:
+    return _selector_xpath(selector)(tree)
+
+
+def _select_one(tree, selector: str):
+    found = _select_all(tree, selector)
+    return found[0] if found else None
+
+
+def _node_text(elem, separator: str = "\n") -> str:
+    """等价于 BeautifulSoup get_text(separator, strip=True)：跳过注释和脚本样式文本"""
+    parts = []
+    for node in elem.iter():
+        tag = node.tag if isinstance(node.tag, str) else None
+        if tag is not None and tag.lower() not in _SKIP_TEXT_TAGS and node.text and node.text.strip():
+            parts.append(node.text.strip())
+        if node is not elem and node.tail and node.tail.strip():
+            parts.append(node.tail.strip())
+    return separator.join(parts)
+
+
+def _meta_description(tree) -> str:
+    """meta description 优先，其次 og:description"""
+    for xpath in _META_DESCRIPTIONS:
+        for value in xpath(tree):
+            if value and value.strip():
+                return value.strip()
+    return ""
+
+
+def _parse_html(html: str):
+    try:
+        parser = lxml.html.HTMLParser(encoding="utf-8")
+        return lxml.html.document_fromstring(html.encode("utf-8", errors="replace"), parser=parser)
+    except Exception:
+        return None
+
+
+class _TreeDocument(Document):
+    """
+    readability 会原地修改 DOM，且重试时会再次 _parse 输入；每次都交给它一份树拷贝
+    依赖 readability-lxml 0.9 的私有 _parse 直接接受 lxml 树（requirements.txt 已锁定版本，
+    升级前先跑 benchmarks/check_extractor_parity.py）
+    """
+
+    def _parse(self, input):
+        return super()._parse(copy.deepcopy(input))
+
+
 class ContentExtractor:
     """正文提取器"""
 
-    def __init__(self, headers: dict, timeout: int = 30, max_length: int = 3000):
-        self.session = requests.Session()
-        self.session.headers.update(headers)
+    def __init__(self, headers: dict, timeout: int = 30, max_length: int = 3000,
+                 max_workers: int = None, per_domain_concurrency: int = None,
+                 per_domain_delay: float = None, item_deadline: float = None,
+                 cache: ContentCache = None):
+        from config.settings import (
+            EXTRACT_MAX_WORKERS, EXTRACT_PER_DOMAIN_CONCURRENCY,
+            EXTRACT_PER_DOMAIN_DELAY, EXTRACT_ITEM_DEADLINE,
+        )
+        self.max_workers = max(1, max_workers or EXTRACT_MAX_WORKERS)
+        self.per_domain_concurrency = per_domain_concurrency or EXTRACT_PER_DOMAIN_CONCURRENCY
+        self.per_domain_delay = EXTRACT_PER_DOMAIN_DELAY if per_domain_delay is None else per_domain_delay
+        self.item_deadline = item_deadline or EXTRACT_ITEM_DEADLINE
+
+        self.session = pooled_session(headers, self.max_workers)
         self.session.verify = False
         self.timeout = timeout
         self.max_length = max_length
+        self.cache = cache
+
+    def extract_batch(self, items: List[RawNewsItem], delay: float = None):
+        """
+        并发批量提取正文，结果写回 item.content / item.pub_time
 
-    def extract_batch(self, items: List[RawNewsItem], delay: float = 1):
-        """批量提取正文"""
-        for item in items:
-            if item.content and len(item.content) >= 100:
-                continue
-            content, pub_time = self.extract(item.url, item.source_key)
-            item.content = content
-            if not item.pub_time and pub_time:
-                try:
-                    from dateutil import parser
-                    item.pub_time = parser.parse(pub_time)
-                except Exception:
-                    pass
-            logger.debug(f"提取: {item.title[:30]}... ({len(content)} 字符)")
-            time.sleep(delay)
-
-    def extract(self, url: str, source_key: str = "") -> Tuple[str, Optional[str]]:
+        Args:
+            items: 待提取的新闻
+            delay: 同一域名两次请求的最小间隔，默认取配置
+        """
+        todo = [item for item in items if not (item.content and len(item.content) >= 100)]
+        if not todo:
+            return
         try:
-            resp = self.session.get(url, timeout=self.timeout, verify=False)
-            resp.raise_for_status()
-            resp.encoding = resp.apparent_encoding or "utf-8"
-            html = resp.text
+            self._extract_all(todo, delay)
+        finally:
+            self.save_cache()
+
+    def new_limiter(self, delay: float = None) -> DomainLimiter:
+        """同一批提取共用的域名限速器"""
+        return DomainLimiter(
+            self.per_domain_concurrency,
+            self.per_domain_delay if delay is None else delay,
+        )
+
+    def _extract_all(self, todo: List[RawNewsItem], delay: float = None):
+        limiter = self.new_limiter(delay)
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(todo))) as executor:
+            list(executor.map(lambda item: self.extract_item(item, limiter), todo))
+
+    def extract_item(self, item: RawNewsItem, limiter: DomainLimiter) -> bool:
+        """
+        提取单条正文并写回 item（已有足够正文时跳过），供流式处理逐条调用
+        不保存缓存文件，调用方结束后调用 save_cache()
+        """
+        if item.content and len(item.content) >= 100:
+            return True
+        try:
+            cached = self._from_cache(item.url)
+            if cached is not None:
+                content, pub_time = cached
+            else:
+                domain = urlparse(item.url).netloc.lower()
+                with limiter.slot(domain):
+                    content, pub_time = self._download(item.url, deadline=time.monotonic() + self.item_deadline)
+        except Exception as e:
+            logger.debug(f"提取失败 {item.url}: {e}")
+            return False
+        item.content = content
+        if not item.pub_time and pub_time:
+            try:
+                from dateutil import parser
+                item.pub_time = parser.parse(pub_time)
+            except Exception:
+                pass
+        logger.debug(f"提取: {item.title[:30]}... ({len(content)} 字符)")
+        return True
 
-            content, pub_time = self._try_readability(html)
-            if not content or len(content) < 100:
-                content, pub_time = self._try_custom(html, url)
-            if not content or len(content) < 100:
-                content, pub_time = self._try_generic(html)
+    def save_cache(self):
+        if self.cache:
+            self.cache.save()
 
-            if content and len(content) > self.max_length:
-                content = content[:self.max_length] + "..."
+    def extract(self, url: str, source_key: str = "", deadline: float = None) -> Tuple[str, Optional[str]]:
+        cached = self._from_cache(url)
+        if cached is not None:
+            return cached
+        return self._download(url, deadline)
 
-            return content or "", pub_time
+    def _download(self, url: str, deadline: float = None) -> Tuple[str, Optional[str]]:
+        """下载并提取；有过期缓存时带条件请求头，304 直接复用缓存正文"""
+        try:
+            validators = self.cache.validators(url) if self.cache else None
+            html, headers = self._fetch(url, deadline, validators)
+            if html is None:
+                entry = self.cache.revalidate(url)
+                if entry and entry.get("text"):
+                    return self._truncate(entry["text"]), entry.get("pub_time")
+                html, headers = self._fetch(url, deadline)
+            content, pub_time, description = self._extract_page(html, url)
+            if self.cache and content:
+                self.cache.put(
+                    url, text=content, pub_time=pub_time, description=description,
+                    etag=headers.get("ETag"), last_modified=headers.get("Last-Modified"),
+                )
+            return content, pub_time
         except Exception as e:
             logger.debug(f"提取失败 {url}: {e}")
             return "", None
 
-    def _try_readability(self, html: str) -> Tuple[str, Optional[str]]:
+    def _from_cache(self, url: str) -> Optional[Tuple[str, Optional[str]]]:
+        if not self.cache:
+            return None
+        entry = self.cache.get(url)
+        if entry is None or not entry.get("text"):
+            return None
+        return self._truncate(entry["text"]), entry.get("pub_time")
+
+    def _truncate(self, content: str) -> str:
+        if content and len(content) > self.max_length:
+            return content[:self.max_length] + "..."
+        return content
+
+    def _fetch(self, url: str, deadline: float = None,
+               validators: Dict[str, str] = None) -> Tuple[Optional[str], dict]:
+        """
+        下载页面；deadline 为 time.monotonic() 时间点，超过则放弃本条
+        带条件请求头且服务端返回 304 时，正文返回 None
+        """
+        timeout = self.timeout
+        if deadline is not None:
+            timeout = max(1.0, min(timeout, deadline - time.monotonic()))
+        with self.session.get(url, timeout=timeout, verify=False, stream=True, headers=validators) as resp:
+            if validators and resp.status_code == 304:
+                return None, resp.headers
+            resp.raise_for_status()
+            chunks = []
+            for chunk in resp.iter_content(chunk_size=64 * 1024):
+                chunks.append(chunk)
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeoutError(f"超过单条提取时限 {self.item_deadline}s")
+        raw = b"".join(chunks)
+        # 与 resp.apparent_encoding 相同的编码探测
+        encoding = chardet.detect(raw)["encoding"] or "utf-8"
+        return raw.decode(encoding, errors="replace"), resp.headers
+
+    def extract_html(self, html: str, url: str = "") -> Tuple[str, Optional[str]]:
+        """从已下载的 HTML 提取正文和发布时间；整页只解析一次，各策略共享同一棵 lxml 树"""
+        content, pub_time, _ = self._extract_page(html, url)
+        return content, pub_time
+
+    def _extract_page(self, html: str, url: str = "") -> Tuple[str, Optional[str], str]:
+        """返回 (正文, 发布时间, meta 描述)"""
+        tree = _parse_html(html)
+        if tree is None:
+            return "", None, ""
+        description = _meta_description(tree)
+
+        # readability 与自定义选择器都不修改原树，发布时间只需算一次
+        content = self._try_readability(tree)
+        if not content or len(content) < 100:
+            content = self._try_custom(tree, url)
+        if content is not None and len(content) >= 100:
+            pub_time = self._extract_time(tree, html)
+        else:
+            # 通用提取会原地删除导航等节点，必须放在最后
+            content = self._try_generic(tree)
+            pub_time = self._extract_time(tree) if content else None
+
+        return self._truncate(content) or "", pub_time, description
+
+    def _try_readability(self, tree) -> Optional[str]:
         try:
-            from readability import Document
-            doc = Document(html)
-            content_html = doc.summary()
-            soup = BeautifulSoup(content_html, "lxml")
-            content = soup.get_text(separator="\n", strip=True)
-            pub_time = self._extract_time(html)
-            return content, pub_time
+            content_html = _TreeDocument(tree).summary()
+            return _node_text(lxml.html.fromstring(content_html))
         except Exception:
-            return "", None
+            return None
 
-    def _try_custom(self, html: str, url: str) -> Tuple[str, Optional[str]]:
-        soup = BeautifulSoup(html, "lxml")
-        content_elem = None
+    def _try_custom(self, tree, url: str) -> Optional[str]:
         if "techcrunch.com" in url:
-            content_elem = soup.select_one(".article-content") or soup.select_one(".entry-content")
+            selectors = (".article-content", ".entry-content")
         elif "theverge.com" in url:
-            content_elem = soup.select_one(".duet--article--article-body-component") or soup.select_one("article")
+            selectors = (".duet--article--article-body-component", "article")
         elif "36kr.com" in url:
-            content_elem = soup.select_one(".article-content") or soup.select_one(".common-width")
+            selectors = (".article-content", ".common-width")
         else:
-            content_elem = soup.select_one("article") or soup.select_one(".article-content") or soup.select_one("main")
+            selectors = ("article", ".article-content", "main")
 
-        if content_elem:
-            return content_elem.get_text(separator="\n", strip=True), self._extract_time(html)
-        return "", None
+        for sel in selectors:
+            content_elem = _select_one(tree, sel)
+            if content_elem is not None:
+                return _node_text(content_elem)
+        return None
 
-    def _try_generic(self, html: str) -> Tuple[str, Optional[str]]:
-        soup = BeautifulSoup(html, "lxml")
-        for tag in soup.select("script, style, nav, header, footer, aside"):
-            tag.decompose()
+    def _try_generic(self, tree) -> Optional[str]:
+        for sel in ("script", "style", "nav", "header", "footer", "aside"):
+            for elem in _select_all(tree, sel):
+                elem.drop_tree()
         for sel in ["article", "main", ".content", "#content"]:
-            elem = soup.select_one(sel)
-            if elem:
-                text = elem.get_text(separator="\n", strip=True)
+            elem = _select_one(tree, sel)
+            if elem is not None:
+                text = _node_text(elem)
                 if len(text) > 200:
-                    return text, self._extract_time(str(soup))
-        return "", None
-
-    def _extract_time(self, html: str) -> Optional[str]:
-        soup = BeautifulSoup(html, "lxml")
-        time_elem = soup.select_one("time")
-        if time_elem:
-            return time_elem.get("datetime") or time_elem.get_text(strip=True)
-        meta = soup.select_one('meta[property="article:published_time"]')
+                    return text
+        return None
+
+    def _extract_time(self, tree, html: str = None) -> Optional[str]:
+        """html 为空时（树已被修改）按需序列化当前树做正则兜底"""
+        time_elem = _select_one(tree, "time")
+        if time_elem is not None:
+            return time_elem.get("datetime") or _node_text(time_elem, separator="")
+        meta = _META_PUBLISHED_TIME(tree)
         if meta:
-            return meta.get("content")
+            return meta[0].get("content")
+        if html is None:
+            html = lxml.html.tostring(tree, encoding="unicode")
         match = re.search(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}', html)
         return match.group() if match else None
@@ -1,29 +1,78 @@
 # -*- coding: utf-8 -*-
 """
 共享数据加载器
-从 ai-hourly-buzz 的 archive.json 读取已采集数据
+从 ai-hourly-buzz 的 archive.json 读取已采集数据，
+英文标题带上 buzz 已有的中文翻译（条目自带的 title_zh 或 title-zh-cache.json）
+
+buzz 同时写出按天切分的归档（archive-days/YYYY-MM-DD.json + index.json，
+按条目最晚的时间戳分天），加载最近 N 小时只需读覆盖到的那一两天；
+没有切分或切分早于 archive.json（旧版 buzz）时回退到全量读取。
+配置了 SHARED_QUERY_SOCKET 时先问 buzz 的本机查询服务，服务不可用再读文件
 """
 
 import json
 import logging
 import hashlib
 from datetime import datetime, timedelta, timezone
-from typing import List
+from typing import Dict, List, Optional
 from pathlib import Path
 
 from crawler.models import RawNewsItem
+from crawler.shared_query_client import query_shared_data
 
 logger = logging.getLogger(__name__)
 
 _CST = timezone(timedelta(hours=8))
+_UNDATED_SHARD = "undated"
+# archive.json 比 index.json 新出这么多秒，说明切分没跟着更新（旧版 buzz 写的），不能用
+_SHARD_STALE_SLACK = 60
+
+
+def _has_cjk(text: str) -> bool:
+    return any('\u4e00' <= c <= '\u9fff' for c in text)
 
 
 class SharedDataLoader:
     """从 ai-hourly-buzz 共享数据加载新闻"""
 
-    def __init__(self, archive_path: Path = None):
-        from config.settings import SHARED_ARCHIVE_FILE
+    def __init__(self, archive_path: Path = None, title_cache_path: Path = None, archive_days_dir: Path = None,
+                 query_socket: str = None):
+        from config.settings import (SHARED_ARCHIVE_FILE, SHARED_ARCHIVE_DAYS_DIR, SHARED_QUERY_SOCKET,
+                                     SHARED_QUERY_TIMEOUT, SHARED_TITLE_ZH_CACHE_FILE)
         self.archive_path = archive_path or SHARED_ARCHIVE_FILE
+        self.title_cache_path = title_cache_path or SHARED_TITLE_ZH_CACHE_FILE
+        # 只传了 archive_path 时，切分目录跟着它走，也不去问配置里的查询服务（那是另一份数据）
+        self.archive_days_dir = archive_days_dir or (
+            Path(archive_path).parent / SHARED_ARCHIVE_DAYS_DIR.name if archive_path else SHARED_ARCHIVE_DAYS_DIR
+        )
+        if query_socket is None:
+            query_socket = "" if archive_path else SHARED_QUERY_SOCKET
+        self.query_socket = query_socket
+        self.query_timeout = SHARED_QUERY_TIMEOUT
+        self._title_cache = None
+
+    def title_zh_cache(self) -> Dict[str, str]:
+        """buzz 的标题翻译缓存（英文原标题 -> 中文），首次调用时读取"""
+        if self._title_cache is None:
+            # 读完再赋值，并发查询时不会看到读了一半的空表
+            cache = {}
+            if self.title_cache_path.exists():
+                try:
+                    with open(self.title_cache_path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    if isinstance(data, dict):
+                        cache = {
+                            str(k).strip(): str(v).strip() for k, v in data.items()
+                            if str(k).strip() and _has_cjk(str(v))
+                        }
+                except Exception as e:
+                    logger.warning(f"读取标题翻译缓存失败，忽略: {e}")
+            self._title_cache = cache
+        return self._title_cache
+
+    def lookup_title_zh(self, title: str) -> str:
+        """查 buzz 已有的中文标题，没有返回空串"""
+        return self.title_zh_cache().get((title or "").strip(), "")
 
     def load(self, hours: int = 28) -> List[RawNewsItem]:
         """
@@ -35,82 +84,160 @@ class SharedDataLoader:
         Returns:
             RawNewsItem 列表
         """
-        if not self.archive_path.exists():
-            logger.warning(f"共享数据文件不存在: {self.archive_path}")
-            return []
-
-        try:
-            with open(self.archive_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception as e:
-            logger.error(f"读取共享数据失败: {e}")
-            return []
+        now = datetime.now(_CST)
+        cutoff = now - timedelta(hours=hours)
 
-        items = data if isinstance(data, list) else data.get("items", [])
+        items = self._read_service(cutoff)
+        if items is None:
+            items = self._read_day_shards(cutoff)
+        if items is None:
+            items = self._read_archive()
+            if items is None:
+                return []
         if not items:
             logger.warning("共享数据为空")
             return []
 
-        now = datetime.now(_CST)
-        cutoff = now - timedelta(hours=hours)
-
         results = []
         for item in items:
             try:
-                # 解析时间 — 兼容多种字段名
-                pub_time = None
-                ts = (item.get("published_at")
-                      or item.get("first_seen_at")
-                      or item.get("timestamp")
-                      or item.get("pubDate")
-                      or item.get("pub_time"))
-                if ts:
-                    try:
-                        if isinstance(ts, (int, float)):
-                            pub_time = datetime.fromtimestamp(ts, tz=_CST)
-                        else:
-                            from dateutil import parser
-                            pub_time = parser.parse(str(ts))
-                            if pub_time.tzinfo is None:
-                                pub_time = pub_time.replace(tzinfo=_CST)
-                    except Exception:
-                        pass
-
-                # 时间过滤
-                if pub_time and pub_time < cutoff:
-                    continue
-
-                url = item.get("url", "") or item.get("link", "")
-                title = item.get("title", "")
-                if not url or not title:
-                    continue
-
-                item_id = item.get("id") or hashlib.md5(url.encode()).hexdigest()
-
-                # 检测语言
-                cn_chars = sum(1 for c in title if '\u4e00' <= c <= '\u9fff')
-                language = "zh" if cn_chars / max(len(title), 1) > 0.3 else "en"
-
-                # 来源信息 — 兼容 site_name/source 字段
-                source = item.get("source", "") or item.get("site_name", "")
-                source_key = item.get("site_id", "") or f"shared_{source}" if source else "shared"
-                raw = RawNewsItem(
-                    id=item_id,
-                    title=title,
-                    url=url,
-                    source_key=source_key,
-                    source_name=source or "AI热讯",
-                    source_type="shared",
-                    language=language,
-                    pub_time=pub_time,
-                    summary=item.get("summary", "") or item.get("description", ""),
-                    content="",
-                )
-                results.append(raw)
-
+                raw = self._to_raw_item(item, cutoff)
             except Exception as e:
                 logger.debug(f"解析共享数据条目失败: {e}")
                 continue
+            if raw is not None:
+                results.append(raw)
 
-        logger.info(f"从共享数据加载: {len(results)} 条（{hours}小时内）")
+        with_zh = sum(1 for r in results if r.title_zh)
+        logger.info(f"从共享数据加载: {len(results)} 条（{hours}小时内），其中 {with_zh} 条带上游中文标题")
         return results
+
+    def _read_service(self, cutoff: datetime) -> Optional[list]:
+        """问 buzz 的查询服务要窗口内的归档条目（超集，逐条过滤照旧），不可用返回 None"""
+        if not self.query_socket:
+            return None
+        result = query_shared_data(self.query_socket, "archive", since=cutoff.timestamp(), timeout=self.query_timeout)
+        if result is None:
+            return None
+        header, items = result
+        logger.info(f"共享数据查询服务: {len(items)} 条（数据生成于 {header.get('generated_at')}）")
+        return items
+
+    def _read_archive(self) -> Optional[list]:
+        """全量读取 archive.json，失败返回 None"""
+        if not self.archive_path.exists():
+            logger.warning(f"共享数据文件不存在: {self.archive_path}")
+            return None
+
+        try:
+            with open(self.archive_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"读取共享数据失败: {e}")
+            return None
+
+        return data if isinstance(data, list) else data.get("items", [])
+
+    def _read_day_shards(self, cutoff: datetime) -> Optional[list]:
+        """
+        只读 cutoff 当天（UTC）及之后的切分文件，顺序与 archive.json 一致（新的在前，无时间的最后）
+
+        Returns:
+            条目列表；没有可用的切分时返回 None，由调用方回退全量读取
+        """
+        index_path = self.archive_days_dir / "index.json"
+        if not index_path.exists():
+            return None
+        try:
+            if (self.archive_path.exists()
+                    and self.archive_path.stat().st_mtime > index_path.stat().st_mtime + _SHARD_STALE_SLACK):
+                logger.info("按天归档早于 archive.json，回退全量读取")
+                return None
+            with open(index_path, "r", encoding="utf-8") as f:
+                days = json.load(f).get("days") or {}
+
+            # 切分按条目最晚的时间戳分天，发布时间在窗口内的条目不会落在更早的文件里
+            first_day = cutoff.astimezone(timezone.utc).date().isoformat()
+            wanted = sorted((d for d in days if d != _UNDATED_SHARD and d >= first_day), reverse=True)
+            if _UNDATED_SHARD in days:
+                wanted.append(_UNDATED_SHARD)
+
+            items = []
+            for day in wanted:
+                with open(self.archive_days_dir / f"{day}.json", "r", encoding="utf-8") as f:
+                    items.extend(json.load(f).get("items", []))
+        except Exception as e:
+            logger.warning(f"读取按天归档失败，回退全量读取: {e}")
+            return None
+
+        logger.info(f"按天归档: 读取 {len(wanted)}/{len(days)} 个文件，共 {len(items)} 条")
+        return items
+
+    @staticmethod
+    def _parse_time(ts) -> Optional[datetime]:
+        if isinstance(ts, (int, float)):
+            return datetime.fromtimestamp(ts, tz=_CST)
+        text = str(ts)
+        try:
+            # buzz 写的都是 ISO 格式，先走标准库；其他格式再交给 dateutil
+            pub_time = datetime.fromisoformat(text[:-1] + "+00:00" if text.endswith("Z") else text)
+        except ValueError:
+            from dateutil import parser
+            pub_time = parser.parse(text)
+        if pub_time.tzinfo is None:
+            pub_time = pub_time.replace(tzinfo=_CST)
+        return pub_time
+
+    def _to_raw_item(self, item: dict, cutoff: datetime) -> Optional[RawNewsItem]:
+        """单条共享数据 -> RawNewsItem，时间早于 cutoff 或缺字段的返回 None"""
+        # 解析时间 — 兼容多种字段名
+        pub_time = None
+        ts = (item.get("published_at")
+              or item.get("first_seen_at")
+              or item.get("timestamp")
+              or item.get("pubDate")
+              or item.get("pub_time"))
+        if ts:
+            try:
+                pub_time = self._parse_time(ts)
+            except Exception:
+                pass
+
+        # 时间过滤
+        if pub_time and pub_time < cutoff:
+            return None
+
+        url = item.get("url", "") or item.get("link", "")
+        title = item.get("title", "")
+        if not url or not title:
+            return None
+
+        item_id = item.get("id") or hashlib.md5(url.encode()).hexdigest()
+
+        # 检测语言
+        cn_chars = sum(1 for c in title if '\u4e00' <= c <= '\u9fff')
+        language = "zh" if cn_chars / max(len(title), 1) > 0.3 else "en"
+
+        # 复用上游翻译：条目自带的优先，其次查 buzz 的标题缓存
+        title_zh = ""
+        if language == "en":
+            title_zh = str(item.get("title_zh") or "").strip()
+            if not _has_cjk(title_zh):
+                title_zh = self.lookup_title_zh(title)
+
+        # 来源信息 — 兼容 site_name/source 字段
+        source = item.get("source", "") or item.get("site_name", "")
+        source_key = item.get("site_id", "") or f"shared_{source}" if source else "shared"
+        return RawNewsItem(
+            id=item_id,
+            title=title,
+            url=url,
+            source_key=source_key,
+            source_name=source or "AI热讯",
+            source_type="shared",
+            language=language,
+            pub_time=pub_time,
+            summary=item.get("summary", "") or item.get("description", ""),
+            content="",
+            title_zh=title_zh,
+        )
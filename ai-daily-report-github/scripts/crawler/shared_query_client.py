@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+共享数据查询服务客户端
+同机部署时 ai-hourly-buzz 的 shared_query_server 在 Unix socket 上提供内存中的数据窗口，
+服务没开、超时或拒绝请求（比如窗口超出它常驻的范围）都返回 None，调用方回退到读文件
+"""
+
+import json
+import logging
+import socket
+from typing import Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def query_shared_data(socket_path, dataset: str = "archive", since: float = None, sites: Iterable[str] = None,
+                      ai: bool = None, timeout: float = 5.0) -> Optional[Tuple[dict, List[dict]]]:
+    """
+    Args:
+        socket_path: 服务的 socket 路径，为空表示未启用
+        dataset: archive（归档窗口）/ latest（latest-24h.json）
+        since: 只要最晚时间戳不早于此（epoch 秒）的条目
+        sites: 只要这些 site_id
+        ai: True / False 按 buzz 的 AI 话题判定过滤；latest 数据集 ai=True 即 items_ai
+
+    Returns:
+        (头部, 条目列表)；不可用时返回 None
+    """
+    if not socket_path or not hasattr(socket, "AF_UNIX"):
+        return None
+
+    request = {"op": "query", "dataset": dataset}
+    if since is not None:
+        request["since"] = since
+    if sites:
+        request["sites"] = list(sites)
+    if ai is not None:
+        request["ai"] = ai
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(socket_path))
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as stream:
+                header = json.loads(stream.readline() or b"null")
+                if not isinstance(header, dict) or not header.get("ok"):
+                    error = header.get("error") if isinstance(header, dict) else "连接被关闭"
+                    logger.info(f"共享数据服务未返回 {dataset}，回退读文件: {error}")
+                    return None
+                lines = stream.read().splitlines()
+            if len(lines) != int(header["count"]):
+                raise ValueError(f"应答不完整: {len(lines)}/{header['count']} 行")
+            # 逐行 json.loads 在几千条时比一次解析慢好几倍，拼成数组一次解析
+            items = json.loads(b"[" + b",".join(lines) + b"]")
+    except FileNotFoundError:
+        logger.debug(f"共享数据服务未启动: {socket_path}")
+        return None
+    except (OSError, ValueError, KeyError) as e:
+        logger.info(f"共享数据服务不可用，回退读文件: {e}")
+        return None
+    return header, items
@@ -1,17 +1,20 @@
 # -*- coding: utf-8 -*-
 """
 网页爬虫
-爬取36氪AI频道和Techmeme
+并发爬取36氪AI频道和Techmeme
 """
 
 import requests
 from bs4 import BeautifulSoup
 import logging
 import hashlib
-import time
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict
+from urllib.parse import urlparse
 
+from crawler.feed_cache import FeedCache
+from crawler.http_utils import DomainLimiter, pooled_session
 from crawler.models import RawNewsItem
 
 logger = logging.getLogger(__name__)
@@ -20,39 +23,62 @@ logger = logging.getLogger(__name__)
 class WebScraper:
     """网页爬虫"""
 
-    def __init__(self, sources: list, headers: dict, timeout: int = 30, delay: float = 1):
+    def __init__(self, sources: list, headers: dict, timeout: int = 30, delay: float = 1,
+                 session: requests.Session = None, limiter: DomainLimiter = None,
+                 feed_cache: FeedCache = None, max_workers: int = None):
+        from config.settings import FETCH_MAX_WORKERS, FETCH_PER_HOST_CONCURRENCY
         self.sources = [s for s in sources if s.get("extraction_method") == "web_scrape"]
         self.headers = headers
         self.timeout = timeout
         self.delay = delay
-        self.session = requests.Session()
-        self.session.headers.update(headers)
+        self.max_workers = max(1, max_workers or FETCH_MAX_WORKERS)
+        self.session = session or pooled_session(headers, self.max_workers)
+        self.limiter = limiter or DomainLimiter(FETCH_PER_HOST_CONCURRENCY, delay)
+        self.feed_cache = feed_cache
 
     def scrape_all(self) -> List[RawNewsItem]:
-        all_news = []
-        for source in self.sources:
-            try:
-                logger.info(f"爬取网页: {source['name']}")
-                news = self._scrape(source)
-                all_news.extend(news)
-                logger.info(f"  -> {len(news)} 条")
-                time.sleep(self.delay)
-            except Exception as e:
-                logger.error(f"爬取 {source['name']} 失败: {e}")
-        return all_news
+        if not self.sources:
+            return []
+        results: List[List[RawNewsItem]] = [[] for _ in self.sources]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(self.sources))) as executor:
+            futures = {executor.submit(self._scrape, source): i for i, source in enumerate(self.sources)}
+            for future in as_completed(futures):
+                source = self.sources[futures[future]]
+                try:
+                    news = future.result()
+                except Exception as e:
+                    logger.error(f"爬取 {source['name']} 失败: {e}")
+                    continue
+                results[futures[future]] = news
+                logger.info(f"爬取网页: {source['name']} -> {len(news)} 条")
+        if self.feed_cache:
+            self.feed_cache.save()
+        return [item for news in results for item in news]
 
     def _scrape(self, source: Dict) -> List[RawNewsItem]:
         try:
-            resp = self.session.get(source["url"], timeout=self.timeout)
+            url = source["url"]
+            headers = self.feed_cache.validators(source["key"], url) if self.feed_cache else {}
+            with self.limiter.slot(urlparse(url).netloc.lower()):
+                resp = self.session.get(url, timeout=self.timeout, headers=headers)
+                if resp.status_code == 304 and headers:
+                    cached = self.feed_cache.items(source["key"])
+                    if cached is not None:
+                        return cached
+                    resp = self.session.get(url, timeout=self.timeout)
             resp.raise_for_status()
             resp.encoding = resp.apparent_encoding or "utf-8"
             soup = BeautifulSoup(resp.text, "lxml")
 
             if source["key"] == "36kr_ai":
-                return self._parse_36kr(soup, source)
+                news = self._parse_36kr(soup, source)
             elif source["key"] == "techmeme":
-                return self._parse_techmeme(soup, source)
-            return []
+                news = self._parse_techmeme(soup, source)
+            else:
+                news = []
+            if self.feed_cache:
+                self.feed_cache.store(source["key"], url, resp.headers, news)
+            return news
         except Exception as e:
             logger.error(f"爬取 {source['name']}: {e}")
             return []
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+运行检查点
+每个阶段的输出存为 <runs_dir>/<日期>/<阶段>.json，并记录输入的哈希；
+下一阶段的输入就是上一阶段的输出，上游重跑且结果变化时下游检查点自动失效；
+输出为空或阶段内标记了降级（调用失败后的兜底结果）时不写检查点，resume 时该阶段重新执行
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import asdict, fields
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from crawler.models import RawNewsItem, ScoredNewsItem
+
+logger = logging.getLogger(__name__)
+
+STAGES = ["collect", "filter", "dedupe", "extract", "summarize", "translate", "classify", "render"]
+
+# 序列化格式或有效性规则变化时递增，旧检查点随之失效
+_FORMAT_VERSION = 2
+
+
+def _encode(value: Any) -> Any:
+    """把新闻条目转换为可 JSON 序列化的结构（带类型标记）"""
+    if isinstance(value, ScoredNewsItem):
+        data = {f.name: getattr(value, f.name) for f in fields(value)}
+        data["raw_item"] = _encode(value.raw_item)
+        return {"__scored__": data}
+    if isinstance(value, RawNewsItem):
+        data = asdict(value)
+        data["pub_time"] = value.pub_time.isoformat() if value.pub_time else None
+        return {"__raw__": data}
+    if isinstance(value, dict):
+        return {key: _encode(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    return value
+
+
+def _decode_hook(obj: dict) -> Any:
+    if "__raw__" in obj:
+        data = obj["__raw__"]
+        if data.get("pub_time"):
+            data["pub_time"] = datetime.fromisoformat(data["pub_time"])
+        return RawNewsItem(**data)
+    if "__scored__" in obj:
+        return ScoredNewsItem(**obj["__scored__"])
+    return obj
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(_encode(value), ensure_ascii=False, sort_keys=True)
+
+
+def input_hash(stage: str, inputs: Any) -> str:
+    payload = f"{_FORMAT_VERSION}\n{stage}\n{_dumps(inputs)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RunCheckpoint:
+    """
+    单次日报运行的阶段检查点
+    - 默认：每个阶段照常执行并写检查点
+    - resume：检查点有效（输入哈希一致）的阶段直接读取输出
+    - from_stage：该阶段之前的尽量复用，该阶段及之后强制重跑
+    """
+
+    def __init__(self, runs_dir: Path, run_date: str, resume: bool = False,
+                 from_stage: Optional[str] = None, retention_days: int = 7):
+        if from_stage is not None and from_stage not in STAGES:
+            raise ValueError(f"未知阶段: {from_stage}（可选: {', '.join(STAGES)}）")
+        self.runs_dir = Path(runs_dir)
+        self.run_dir = self.runs_dir / run_date
+        self.resume = resume
+        self.from_stage = from_stage
+        self.timings = {}  # 阶段 -> {"seconds": 耗时, "reused": 是否复用检查点[, "degraded": 降级原因]}，写入运行报告
+        self._running: Optional[str] = None
+        self._degraded: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        self._prune(run_date, retention_days)
+
+    def _prune(self, run_date: str, retention_days: int):
+        """删除超过保留天数的运行目录"""
+        try:
+            cutoff = (datetime.strptime(run_date, "%Y-%m-%d") - timedelta(days=retention_days)).strftime("%Y-%m-%d")
+        except ValueError:
+            return
+        for path in self.runs_dir.iterdir():
+            if path.is_dir() and path.name < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _may_skip(self, stage: str) -> bool:
+        if self.from_stage is not None:
+            return STAGES.index(stage) < STAGES.index(self.from_stage)
+        return self.resume
+
+    def path(self, stage: str) -> Path:
+        return self.run_dir / f"{stage}.json"
+
+    def load(self, stage: str, key: str) -> Optional[Any]:
+        """读取输入哈希一致的检查点；不存在或已失效时返回 None"""
+        path = self.path(stage)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f, object_hook=_decode_hook)
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"检查点损坏，重新执行 {stage}: {e}")
+            return None
+        if data.get("input_hash") != key:
+            logger.info(f"检查点已失效（输入变化）: {stage}")
+            return None
+        return data
+
+    def save(self, stage: str, key: str, output: Any):
+        """原子写入，进程中断时不会留下半个检查点"""
+        payload = {
+            "stage": stage,
+            "input_hash": key,
+            "created": datetime.now().isoformat(),
+            "output": _encode(output),
+        }
+        path = self.path(stage)
+        fd, tmp = tempfile.mkstemp(dir=str(self.run_dir), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"写入检查点失败 {stage}: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def degrade(self, reason: str):
+        """
+        阶段内调用（可在工作线程中）：本次输出含兜底结果，不作为有效检查点
+        流式模式下提取、摘要、翻译同属 translate 检查点，标记记在正在执行的阶段上
+        """
+        with self._lock:
+            if self._running is not None:
+                self._degraded.setdefault(self._running, []).append(reason)
+
+    def run(self, stage: str, inputs: Any, func: Callable[[], Any]) -> Any:
+        """执行一个阶段：可复用时读取检查点，否则执行 func，输出有效时保存"""
+        # 哈希在执行前计算，阶段内对输入的原地修改不影响键
+        started = time.monotonic()
+        key = input_hash(stage, inputs)
+        if self._may_skip(stage):
+            data = self.load(stage, key)
+            if data is not None:
+                logger.info(f"⏭️ 复用检查点: {stage}（{self.path(stage)}）")
+                self.timings[stage] = {"seconds": round(time.monotonic() - started, 3), "reused": True}
+                return data["output"]
+        with self._lock:
+            self._running = stage
+            self._degraded.pop(stage, None)
+        try:
+            output = func()
+        finally:
+            with self._lock:
+                self._running = None
+                degraded = self._degraded.get(stage)
+        self.timings[stage] = {"seconds": round(time.monotonic() - started, 3), "reused": False}
+        if degraded:
+            self.timings[stage]["degraded"] = degraded
+            logger.warning(f"{stage} 含兜底结果，不写检查点: {'；'.join(degraded)}")
+        elif not output:
+            logger.info(f"{stage} 输出为空，不写检查点")
+        else:
+            self.save(stage, key, output)
+        return output
+
+    def write_report(self, report: dict) -> Path:
+        """运行报告（阶段耗时、LLM 用量等）写到运行目录的 run_report.json"""
+        path = self.run_dir / "run_report.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return path
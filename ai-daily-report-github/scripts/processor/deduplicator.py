@@ -2,88 +2,229 @@
 """
 去重器
 基于标题相似度和URL去重
+
+标题相似度仍以 SequenceMatcher.ratio() 为准，但只对候选对计算：
+用字符二元组倒排索引 + 前缀过滤挑出候选，结果与两两比较完全一致。
 """
 
 import logging
-import json
-from typing import List, Dict, Set
+import math
+from collections import Counter
+from typing import List, Dict, Set, Tuple
 from difflib import SequenceMatcher
 from pathlib import Path
 from datetime import datetime
 
 from crawler.models import ScoredNewsItem
+from processor.url_cache import ProcessedUrlCache
 
 logger = logging.getLogger(__name__)
 
 
+_Q = 2  # 倒排索引使用字符二元组
+
+
+def _qgram_tokens(title: str) -> List[Tuple[str, int]]:
+    """二元组按出现次数编号，集合交集即多重集交集"""
+    seen = Counter()
+    tokens = []
+    for i in range(len(title) - _Q + 1):
+        gram = title[i:i + _Q]
+        tokens.append((gram, seen[gram]))
+        seen[gram] += 1
+    return tokens
+
+
+class _TitleIndex:
+    """
+    相似标题候选索引（无漏检）
+
+    SequenceMatcher 的匹配块数 k ≤ 1 + (la+lb-2M)，块内共享二元组 ≥ M - k(q-1)；
+    ratio = 2M/(la+lb) ≥ t 时推出共享二元组下界，再结合长度下界得到只依赖
+    单侧长度的最小重叠 τ(l)。按全局频率从低到高排序后，只需索引/探查前
+    |tokens| - τ + 1 个二元组，高频二元组（空格、常见字母组合）基本被跳过；
+    首次命中时再用位置上界（PPJoin 位置过滤）和长度下界剪掉不可能的候选。
+    阈值 ≤ 2/3 时下界失效，退化为逐一比较。
+    """
+
+    def __init__(self, titles: List[str], threshold: float):
+        self.threshold = threshold
+        self._coef = threshold * (2 * _Q - 1) / 2 - (_Q - 1)
+        freq = Counter()
+        for title in set(titles):
+            freq.update(_qgram_tokens(title))
+        self._rank = {token: rank for rank, (token, _) in
+                      enumerate(sorted(freq.items(), key=lambda kv: (kv[1], kv[0])))}
+        self._postings: Dict[Tuple[str, int], List[Tuple[str, int]]] = {}
+        self._unfiltered: List[str] = []  # 过短、无法用前缀过滤的标题
+        self._indexed: Set[str] = set()
+        self._token_sets: Dict[str, frozenset] = {}
+        self._char_masks: Dict[str, Dict[str, int]] = {}
+        # 已见标题固定为 seq2，b 侧的预处理（__chain_b）只做一次
+        self._matchers: Dict[str, SequenceMatcher] = {}
+
+    def _tokens(self, title: str) -> frozenset:
+        tokens = self._token_sets.get(title)
+        if tokens is None:
+            tokens = self._token_sets[title] = frozenset(_qgram_tokens(title))
+        return tokens
+
+    def _prefix(self, title: str):
+        """返回可用于过滤的前缀；None 表示该标题必须与所有标题比较"""
+        if self._coef <= 0:
+            return None
+        tau = self._min_overlap(len(title) * 2 / (2 - self.threshold))
+        tokens = sorted(self._tokens(title), key=lambda token: self._rank.get(token, -1))
+        if tau <= 0 or not tokens:
+            return None
+        return tokens[:max(0, len(tokens) - tau + 1)]
+
+    def _min_overlap(self, total_length: float) -> int:
+        """两标题总长为 total_length 且 ratio ≥ 阈值时，共享二元组数的下界"""
+        return math.ceil(self._coef * total_length - (_Q - 1) - 1e-9)
+
+    def add(self, title: str):
+        if title in self._indexed:
+            return
+        self._indexed.add(title)
+        prefix = self._prefix(title)
+        if prefix is None:
+            self._unfiltered.append(title)
+            return
+        for position, token in enumerate(prefix):
+            self._postings.setdefault(token, []).append((title, position))
+
+    def candidates(self, title: str, live: Dict[str, int]) -> List[str]:
+        """可能相似的已见标题，按 live 中的插入顺序返回"""
+        prefix = self._prefix(title)
+        if prefix is None:
+            found = set(live)
+        else:
+            found = {t for t in self._unfiltered if t in live}
+            checked = set()
+            size = len(title)
+            remaining = size - _Q + 1
+            for i, token in enumerate(prefix):
+                for other, j in self._postings.get(token, ()):
+                    if other in checked or other not in live:
+                        continue
+                    # 按全局顺序首次命中：此前没有公共二元组，之后最多还有 min(剩余) 个
+                    checked.add(other)
+                    total = size + len(other)
+                    if 2 * min(size, len(other)) / total < self.threshold:
+                        continue
+                    bound = 1 + min(remaining - i - 1, len(other) - _Q - j)
+                    if bound >= self._min_overlap(total):
+                        found.add(other)
+        return sorted(found, key=live.__getitem__)
+
+    def _lcs_length(self, a: str, b: str) -> int:
+        """位并行 LCS 长度（Hyyrö）；SequenceMatcher 的匹配字符数不会超过它"""
+        masks = self._char_masks.get(b)
+        if masks is None:
+            masks = {}
+            for i, ch in enumerate(b):
+                masks[ch] = masks.get(ch, 0) | (1 << i)
+            self._char_masks[b] = masks
+        full = (1 << len(b)) - 1
+        row = full
+        for ch in a:
+            matched = row & masks.get(ch, 0)
+            row = ((row + matched) | (row - matched)) & full
+        return len(b) - bin(row).count("1")
+
+    def similar(self, title: str, seen_title: str) -> bool:
+        """与 SequenceMatcher(None, title, seen_title).ratio() >= 阈值 等价，先用上界快速排除"""
+        total = len(title) + len(seen_title)
+        if not total:
+            return True
+        if 2 * min(len(title), len(seen_title)) / total < self.threshold:
+            return False
+        if self._coef > 0 and len(self._tokens(title) & self._tokens(seen_title)) < self._min_overlap(total):
+            return False
+        if 2 * self._lcs_length(title, seen_title) / total < self.threshold:
+            return False
+        matcher = self._matchers.get(seen_title)
+        if matcher is None:
+            matcher = self._matchers[seen_title] = SequenceMatcher(None, "", seen_title)
+        matcher.set_seq1(title)
+        return matcher.ratio() >= self.threshold
+
+
 class Deduplicator:
     """去重器"""
 
-    def __init__(self, threshold: float = 0.8, cache_file: Path = None):
+    def __init__(self, threshold: float = 0.8, cache_file: Path = None, retention_days: int = 7):
+        """
+        Args:
+            cache_file: 已发布 URL 缓存（SQLite），为空则不跨天过滤
+            retention_days: 缓存保留天数
+        """
         self.threshold = threshold
-        self.cache_file = cache_file
-        self.processed_urls: Set[str] = set()
-        if cache_file:
-            self._load_cache()
-
-    def _load_cache(self):
-        try:
-            if self.cache_file and self.cache_file.exists():
-                with open(self.cache_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    self.processed_urls = set(data.get("processed_urls", []))
-                    logger.info(f"缓存加载: {len(self.processed_urls)} 个URL")
-        except Exception as e:
-            logger.warning(f"加载缓存失败: {e}")
-
-    def _save_cache(self):
-        if not self.cache_file:
-            return
-        try:
-            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.cache_file, "w", encoding="utf-8") as f:
-                json.dump({
-                    "processed_urls": list(self.processed_urls),
-                    "last_update": datetime.now().isoformat()
-                }, f, ensure_ascii=False)
-        except Exception as e:
-            logger.warning(f"保存缓存失败: {e}")
-
-    def deduplicate(self, news_list: List[ScoredNewsItem]) -> List[ScoredNewsItem]:
+        self.url_cache = ProcessedUrlCache(cache_file, retention_days) if cache_file else None
+
+    def deduplicate(self, news_list: List[ScoredNewsItem],
+                    processed_before: datetime = None) -> List[ScoredNewsItem]:
+        """
+        Args:
+            processed_before: 只跳过在此时间之前记录的 URL（通常为当天零点，当天重跑不互相影响）
+        """
         if not news_list:
             return []
 
-        sorted_news = sorted(news_list, key=lambda x: x.relevance_score, reverse=True)
-        unique = []
-        seen_titles: Dict[str, ScoredNewsItem] = {}
+        processed: Set[str] = set()
+        if self.url_cache is not None:
+            processed = self.url_cache.seen((item.raw_item.url for item in news_list), before=processed_before)
+            if processed:
+                logger.info(f"跳过此前日报已发布的新闻: {len(processed)} 条")
 
-        for item in sorted_news:
-            url = item.raw_item.url
-            title = item.raw_item.title.lower().strip()
+        sorted_news = sorted(news_list, key=lambda x: x.relevance_score, reverse=True)
+        titles = [item.raw_item.title.lower().strip() for item in sorted_news]
+        index = _TitleIndex(titles, self.threshold)
 
-            if url in self.processed_urls:
+        # unique 中被替换的位置置为 None，避免 list.remove 的线性查找
+        unique: List = []
+        position: Dict[int, int] = {}
+        seen_titles: Dict[str, ScoredNewsItem] = {}
+        order: Dict[str, int] = {}  # 与 seen_titles 的插入顺序一致，用于按原顺序检查候选
+        counter = 0
+
+        def remember(title: str, item: ScoredNewsItem):
+            nonlocal counter
+            if title not in seen_titles:
+                order[title] = counter
+                counter += 1
+                index.add(title)
+            seen_titles[title] = item
+            position[id(item)] = len(unique)
+            unique.append(item)
+
+        for item, title in zip(sorted_news, titles):
+            if item.raw_item.url in processed:
                 continue
 
             is_dup = False
-            for seen_title, seen_item in seen_titles.items():
-                if SequenceMatcher(None, title, seen_title).ratio() >= self.threshold:
+            for seen_title in index.candidates(title, order):
+                if index.similar(title, seen_title):
                     is_dup = True
+                    seen_item = seen_titles[seen_title]
                     # 官方源替换非官方源
                     if item.raw_item.source_type == "official" and seen_item.raw_item.source_type != "official":
-                        unique.remove(seen_item)
+                        unique[position.pop(id(seen_item))] = None
                         del seen_titles[seen_title]
-                        unique.append(item)
-                        seen_titles[title] = item
+                        del order[seen_title]
+                        remember(title, item)
                     break
 
             if not is_dup:
-                unique.append(item)
-                seen_titles[title] = item
+                remember(title, item)
 
-        # 更新缓存
-        for item in unique:
-            self.processed_urls.add(item.raw_item.url)
-        self._save_cache()
+        unique = [item for item in unique if item is not None]
 
         logger.info(f"去重: {len(news_list)} -> {len(unique)} 条")
         return unique
+
+    def mark_processed(self, news_list: List[ScoredNewsItem]):
+        """日报生成后记录已发布的 URL，之后的日报不再重复收录"""
+        if self.url_cache is not None:
+            self.url_cache.add(item.raw_item.url for item in news_list)
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+预摘要缓存
+buzz 每小时采集后由 main.py --presummarize 增量写入：按条目 ID 存放提取好的正文、中文摘要与中文标题；
+7:00 的日报先从这里补齐，只对未命中的条目提取、摘要、翻译
+"""
+
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from crawler.models import ScoredNewsItem
+from processor.sqlite_store import SqliteStore
+
+logger = logging.getLogger(__name__)
+
+_MIN_CONTENT = 100  # 与正文提取的判断一致：不足该长度视为没有正文
+
+
+class PresummaryCache:
+    """条目 ID -> 预处理结果（正文 / 摘要 / 中文标题）"""
+
+    def __init__(self, db_path: Path, ttl_hours: float = 36):
+        self.db_path = Path(db_path)
+        self._store = SqliteStore(
+            self.db_path, "presummary",
+            "id TEXT PRIMARY KEY, url TEXT NOT NULL, content TEXT NOT NULL,"
+            " summary_cn TEXT NOT NULL, title_cn TEXT NOT NULL, created REAL NOT NULL",
+            max_age=ttl_hours * 3600,
+        )
+        self.evict()
+
+    def evict(self) -> int:
+        """删除超过有效期的记录"""
+        return self._store.evict()
+
+    def get_many(self, ids: Iterable[str]) -> Dict[str, dict]:
+        rows = self._store.select_many(ids, "id, url, content, summary_cn, title_cn")
+        return {
+            row[0]: {"url": row[1], "content": row[2], "summary_cn": row[3], "title_cn": row[4]}
+            for row in rows
+        }
+
+    def missing(self, items: List[ScoredNewsItem]) -> List[ScoredNewsItem]:
+        """还没有预摘要的条目"""
+        cached = self.get_many(item.raw_item.id for item in items)
+        missing = []
+        for item in items:
+            entry = cached.get(item.raw_item.id)
+            if not entry or entry["url"] != item.raw_item.url or not entry["summary_cn"]:
+                missing.append(item)
+        return missing
+
+    def apply(self, items: List[ScoredNewsItem]) -> int:
+        """用缓存补齐条目的空字段（URL 变化的视为不同条目），返回补上摘要的条数"""
+        cached = self.get_many(item.raw_item.id for item in items)
+        hits = 0
+        for item in items:
+            entry = cached.get(item.raw_item.id)
+            if not entry or entry["url"] != item.raw_item.url:
+                continue
+            raw = item.raw_item
+            if entry["content"] and len(raw.content or "") < _MIN_CONTENT:
+                raw.content = entry["content"]
+            if entry["title_cn"] and not item.title_cn:
+                item.title_cn = entry["title_cn"]
+            if entry["summary_cn"] and not item.summary_cn:
+                item.summary_cn = entry["summary_cn"]
+                hits += 1
+        return hits
+
+    def put(self, items: List[ScoredNewsItem]):
+        """
+        保存预处理结果；摘要退化为原始简介的不存，日报运行时会再试一次；
+        标题与原文相同（中文标题或翻译失败）的也不存
+        """
+        now = time.time()
+        rows = []
+        for item in items:
+            raw = item.raw_item
+            content = raw.content if raw.content and len(raw.content) >= _MIN_CONTENT else ""
+            summary = item.summary_cn if item.summary_cn != (raw.summary or "") else ""
+            title = item.title_cn if item.title_cn != raw.title else ""
+            if content or summary:
+                rows.append((raw.id, raw.url, content, summary, title, now))
+        self._store.write_many(("id", "url", "content", "summary_cn", "title_cn", "created"), rows)
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def close(self):
+        self._store.close()
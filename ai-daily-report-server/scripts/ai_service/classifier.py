@@ -9,12 +9,15 @@
 5. 行业新闻：不属于以上四类，但仍具行业意义
 """
 
+import asyncio
 import logging
-from typing import List, Dict
+import time
+from typing import List, Dict, Optional
 import json
 import re
 
-from ai_service.deepseek_client import get_client
+from ai_service.deepseek_client import get_client, run_sync
+from config.settings import CLASSIFY_BATCH_SIZE, CLASSIFY_AI_DEADLINE
 from crawler.models import ScoredNewsItem
 
 logger = logging.getLogger(__name__)
@@ -43,119 +46,212 @@ CATEGORY_DEFINITIONS = {
 }
 
 
-class Classifier:
-    """新闻分类器"""
+# ============== 规则分类 ==============
+BIG_TECH_SOURCES = {
+    "claude_anthropic", "google_blog", "google_workspace",
+    "google_deepmind", "google_research"
+}
+TECH_SOURCES = {"hackernews", "v2ex"}
+
+GAMING_KEYWORDS = [
+    "游戏", "game", "gaming", "npc", "手游", "端游",
+    "电竞", "esport", "玩家", "player", "买量", "获客",
+    "游戏发行", "app store", "google play", "游戏公司",
+    "游戏开发", "虚拟人", "数字人", "ugc", "unity", "unreal"
+]
+BIG_TECH_COMPANIES = ["openai", "google", "meta", "microsoft", "anthropic", "deepmind", "facebook"]
+BIG_TECH_KEYWORDS = ["收购", "并购", "merger", "acquisition", "战略", "策略", "投资", "融资", "funding", "ipo", "上市", "估值", "valuation"]
+PRODUCT_KEYWORDS = [
+    "发布", "launch", "推出", "release", "上线", "工具", "tool",
+    "平台", "platform", "产品", "product", "应用", "app", "application",
+    "功能", "feature", "服务", "service", "api", "插件", "plugin",
+    "更新", "update", "升级", "upgrade"
+]
+TECH_KEYWORDS = [
+    "模型", "model", "gpt", "llm", "大模型", "算法", "algorithm",
+    "训练", "training", "推理", "inference", "参数", "parameter",
+    "transformer", "diffusion", "gan", "技术突破", "breakthrough",
+    "benchmark", "性能", "performance", "架构", "architecture"
+]
+
+
+class RuleMatcher:
+    """
+    规则分类的关键词表预编译为正则，每组一次扫描代替逐词 in 判断；
+    各组仍分开编译：不同组的关键词可能从同一位置开始（google / google play），
+    合成一个交替式会只报告其中一个
+    """
 
     def __init__(self):
-        self.client = get_client()
-
-    def classify_single(self, title: str, summary: str, source_key: str = None) -> str:
-        """基于规则的快速分类"""
+        def compile_group(words):
+            # 长词在前，与子串判断等价（只关心是否命中）
+            return re.compile("|".join(re.escape(w) for w in sorted(words, key=len, reverse=True)))
+
+        self.gaming = compile_group(GAMING_KEYWORDS)
+        self.company = compile_group(BIG_TECH_COMPANIES)
+        self.action = compile_group(BIG_TECH_KEYWORDS)
+        self.product = compile_group(PRODUCT_KEYWORDS)
+        self.tech = compile_group(TECH_KEYWORDS)
+
+    def classify(self, text: str, source_key: str = None) -> str:
+        """text 需已转小写；判断顺序与原规则一致"""
         if source_key:
-            big_tech_sources = [
-                "claude_anthropic", "google_blog", "google_workspace",
-                "google_deepmind", "google_research"
-            ]
-            if source_key in big_tech_sources:
+            if source_key in BIG_TECH_SOURCES:
                 return "big_tech"
-
             if source_key == "producthunt":
                 return "ai_products"
-
-            tech_sources = ["hackernews", "v2ex"]
-            if source_key in tech_sources:
+            if source_key in TECH_SOURCES:
                 return "ai_tech"
 
-        text = f"{title} {summary}".lower()
-
-        gaming_keywords = [
-            "游戏", "game", "gaming", "npc", "手游", "端游",
-            "电竞", "esport", "玩家", "player", "买量", "获客",
-            "游戏发行", "app store", "google play", "游戏公司",
-            "游戏开发", "虚拟人", "数字人", "ugc", "unity", "unreal"
-        ]
-        if any(kw in text for kw in gaming_keywords):
+        if self.gaming.search(text):
             return "ai_gaming"
+        if self.company.search(text) and self.action.search(text):
+            return "big_tech"
+        if self.product.search(text):
+            return "ai_products"
+        if self.tech.search(text):
+            return "ai_tech"
+        return "industry_news"
 
-        big_tech_companies = ["openai", "google", "meta", "microsoft", "anthropic", "deepmind", "facebook"]
-        big_tech_keywords = ["收购", "并购", "merger", "acquisition", "战略", "策略", "投资", "融资", "funding", "ipo", "上市", "估值", "valuation"]
 
-        has_company = any(company in text for company in big_tech_companies)
-        has_action = any(kw in text for kw in big_tech_keywords)
+RULE_MATCHER = RuleMatcher()
 
-        if has_company and has_action:
-            return "big_tech"
 
-        product_keywords = [
-            "发布", "launch", "推出", "release", "上线", "工具", "tool",
-            "平台", "platform", "产品", "product", "应用", "app", "application",
-            "功能", "feature", "服务", "service", "api", "插件", "plugin",
-            "更新", "update", "升级", "upgrade"
-        ]
-        if any(kw in text for kw in product_keywords):
-            return "ai_products"
+def _empty_result() -> Dict[str, List[ScoredNewsItem]]:
+    return {key: [] for key in CATEGORY_DEFINITIONS}
 
-        tech_keywords = [
-            "模型", "model", "gpt", "llm", "大模型", "算法", "algorithm",
-            "训练", "training", "推理", "inference", "参数", "parameter",
-            "transformer", "diffusion", "gan", "技术突破", "breakthrough",
-            "benchmark", "性能", "performance", "架构", "architecture"
-        ]
-        if any(kw in text for kw in tech_keywords):
-            return "ai_tech"
 
-        return "industry_news"
+class Classifier:
+    """新闻分类器"""
+
+    def __init__(self, cache=None):
+        """cache: 可选的按条目 ID 缓存（get_many / put_many），只存 AI 分类结果"""
+        self.client = get_client()
+        self.cache = cache
+
+    def classify_single(self, title: str, summary: str, source_key: str = None) -> str:
+        """基于规则的快速分类"""
+        return RULE_MATCHER.classify(f"{title} {summary}".lower(), source_key)
+
+    def _classify_rule(self, item: ScoredNewsItem) -> str:
+        summary = item.summary_cn or item.raw_item.summary
+        return self.classify_single(item.raw_item.title, summary, item.raw_item.source_key)
 
     def classify_batch(
         self,
         news_list: List[ScoredNewsItem],
-        use_ai: bool = False
+        use_ai: bool = False,
+        fallback: Optional[List[ScoredNewsItem]] = None
     ) -> Dict[str, List[ScoredNewsItem]]:
-        """批量分类新闻"""
+        """
+        批量分类新闻
+        fallback: 传入列表时，AI 分类失败或超时、改用规则分类的条目追加到其中（预算用尽的不算）
+        """
         if use_ai:
-            return self._classify_with_ai(news_list)
+            return self._classify_with_ai(news_list, fallback=fallback)
 
-        result = {
-            "big_tech": [],
-            "ai_products": [],
-            "ai_tech": [],
-            "ai_gaming": [],
-            "industry_news": []
-        }
+        categories = [self._classify_rule(item) for item in news_list]
+        result = self._group(news_list, categories)
+        logger.info("分类完成:")
+        self._log_result(result)
+        return result
 
-        for item in news_list:
-            summary = item.summary_cn or item.raw_item.summary
-            source_key = item.raw_item.source_key
-            category = self.classify_single(item.raw_item.title, summary, source_key)
+    @staticmethod
+    def _group(news_list: List[ScoredNewsItem], categories: List[str]) -> Dict[str, List[ScoredNewsItem]]:
+        result = _empty_result()
+        for item, category in zip(news_list, categories):
             item.category = category
             result[category].append(item)
+        return result
 
-        logger.info("分类完成:")
+    @staticmethod
+    def _log_result(result: Dict[str, List[ScoredNewsItem]]):
         for cat_key, cat_items in result.items():
             cat_name = CATEGORY_DEFINITIONS[cat_key]["name"]
             logger.info(f"  {cat_name}: {len(cat_items)} 条")
 
+    def _classify_with_ai(self, news_list: List[ScoredNewsItem], deadline: float = CLASSIFY_AI_DEADLINE,
+                          fallback: Optional[List[ScoredNewsItem]] = None) -> Dict[str, List[ScoredNewsItem]]:
+        """
+        AI分类：命中缓存的直接用，其余按批并发请求（共用客户端的并发上限与限流器）；
+        批次失败、返回缺项或非法类别、超过截止时间仍未返回的条目，一律改用规则分类；
+        截止时间到时未完成的请求被取消（连接中断、排队的不再发出），不会在后台继续消耗 token
+        """
+        categories: List[Optional[str]] = [None] * len(news_list)
+        cached_count = 0
+        if self.cache is not None:
+            cached = self.cache.get_many(item.raw_item.id for item in news_list)
+            for i, item in enumerate(news_list):
+                category = cached.get(item.raw_item.id)
+                if category in CATEGORY_DEFINITIONS:
+                    categories[i] = category
+                    cached_count += 1
+
+        pending = [i for i, category in enumerate(categories) if category is None]
+        batches = [pending[start:start + CLASSIFY_BATCH_SIZE] for start in range(0, len(pending), CLASSIFY_BATCH_SIZE)]
+        ai_results: Dict[int, str] = {}
+        over_budget = set()
+        timed_out = 0
+        if batches:
+            started = time.monotonic()
+            outcomes = run_sync(self._run_ai_batches(news_list, batches, deadline))
+            for batch, outcome in zip(batches, outcomes):
+                if isinstance(outcome, asyncio.CancelledError):
+                    timed_out += len(batch)
+                elif isinstance(outcome, Exception):
+                    logger.warning(f"AI分类批次失败: {outcome}")
+                elif outcome is None:
+                    over_budget.update(batch)
+                else:
+                    ai_results.update(outcome)
+            if timed_out:
+                logger.warning(f"AI分类超过 {deadline:.0f}s 截止时间，{timed_out} 条改用规则分类")
+            logger.info(f"AI分类: {len(batches)} 批并发，耗时 {time.monotonic() - started:.1f}s")
+
+        fallback_count = 0
+        for i in pending:
+            categories[i] = ai_results.get(i)
+            if categories[i] is None:
+                categories[i] = self._classify_rule(news_list[i])
+                fallback_count += 1
+                if fallback is not None and i not in over_budget:
+                    fallback.append(news_list[i])
+        if self.cache is not None and ai_results:
+            self.cache.put_many({news_list[i].raw_item.id: category for i, category in ai_results.items()})
+
+        result = self._group(news_list, categories)
+        logger.info(f"AI分类完成（缓存 {cached_count}，AI {len(ai_results)}，规则兜底 {fallback_count}）:")
+        self._log_result(result)
         return result
 
-    def _classify_with_ai(self, news_list: List[ScoredNewsItem]) -> Dict[str, List[ScoredNewsItem]]:
-        """使用AI模型进行更精确的分类"""
-        news_to_classify = []
-        for i, item in enumerate(news_list):
-            title_cn = item.title_cn or item.raw_item.title
+    async def _run_ai_batches(self, news_list: List[ScoredNewsItem], batches: List[List[int]],
+                              deadline: float) -> list:
+        """
+        在客户端的事件循环上并发执行各批，按批次顺序返回结果或异常；
+        超过截止时间的批次取消并等取消完成，超时的批次对应 CancelledError
+        """
+        tasks = [asyncio.ensure_future(self._classify_ai_batch(news_list, batch)) for batch in batches]
+        _, not_done = await asyncio.wait(tasks, timeout=deadline)
+        for task in not_done:
+            task.cancel()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _classify_ai_batch(self, news_list: List[ScoredNewsItem], batch: List[int]) -> Optional[Dict[int, str]]:
+        """一批新闻一次请求，返回 {下标: 类别}；只保留合法类别，预算用尽时返回 None（不发请求）"""
+        if self.client.usage.over_budget("classify"):
+            return None
+
+        batch_data = []
+        for j, i in enumerate(batch):
+            item = news_list[i]
             summary = item.summary_cn or item.raw_item.summary
-            news_to_classify.append({
-                "index": i,
-                "title": title_cn,
+            batch_data.append({
+                "index": j,
+                "title": item.title_cn or item.raw_item.title,
                 "summary": summary[:200]
             })
 
-        batch_size = 10
-        results = {}
-
-        for start in range(0, len(news_to_classify), batch_size):
-            batch = news_to_classify[start:start + batch_size]
-
-            prompt = f"""请对以下新闻进行分类，从五个类别中选择一个最合适的：
+        prompt = f"""请对以下新闻进行分类，从五个类别中选择一个最合适的：
 
 1. big_tech - 大厂动态：OpenAI、Google、Meta、Microsoft等外部公司的重大动作
 2. ai_products - AI应用与产品：AI工具、平台、商业化产品发布
@@ -164,54 +260,35 @@ class Classifier:
 5. industry_news - 行业新闻：不属于以上四类，但仍具行业意义
 
 新闻列表：
-{json.dumps(batch, ensure_ascii=False, indent=2)}
+{json.dumps(batch_data, ensure_ascii=False, indent=2)}
 
 请按JSON格式输出，如: {{"0": "big_tech", "1": "ai_products", ...}}
 只输出JSON，不要其他内容。"""
 
-            messages = [
-                {
-                    "role": "system",
-                    "content": "你是一位专业的科技新闻编辑，擅长对新闻进行准确分类。"
-                },
-                {"role": "user", "content": prompt}
-            ]
+        messages = [
+            {
+                "role": "system",
+                "content": "你是一位专业的科技新闻编辑，擅长对新闻进行准确分类。"
+            },
+            {"role": "user", "content": prompt}
+        ]
 
-            try:
-                response = self.client.chat(messages, temperature=0.1, max_tokens=500)
-
-                if response:
-                    cleaned = response.strip()
-                    if cleaned.startswith("```"):
-                        cleaned = re.sub(r'^```\w*\n?', '', cleaned)
-                        cleaned = re.sub(r'\n?```$', '', cleaned)
-
-                    batch_results = json.loads(cleaned)
-                    for idx, cat in batch_results.items():
-                        results[int(idx) + start] = cat
-            except Exception as e:
-                logger.warning(f"AI分类批次失败: {e}")
-                for i, item_data in enumerate(batch):
-                    idx = start + i
-                    category = self.classify_single(item_data["title"], item_data["summary"])
-                    results[idx] = category
-
-        result = {
-            "big_tech": [],
-            "ai_products": [],
-            "ai_tech": [],
-            "ai_gaming": [],
-            "industry_news": []
-        }
-
-        for i, item in enumerate(news_list):
-            category = results.get(i, "industry_news")
-            item.category = category
-            result[category].append(item)
+        response = await self.client.aclient.chat(messages, temperature=0.1, max_tokens=500,
+                                                  stage="classify", items=len(batch))
+        if not response:
+            return {}
 
-        logger.info("AI分类完成:")
-        for cat_key, cat_items in result.items():
-            cat_name = CATEGORY_DEFINITIONS[cat_key]["name"]
-            logger.info(f"  {cat_name}: {len(cat_items)} 条")
+        cleaned = response.strip()
+        if cleaned.startswith("```"):
+            cleaned = re.sub(r'^```\w*\n?', '', cleaned)
+            cleaned = re.sub(r'\n?```$', '', cleaned)
 
-        return result
+        results = {}
+        for idx, cat in json.loads(cleaned).items():
+            try:
+                j = int(idx)
+            except (TypeError, ValueError):
+                continue
+            if 0 <= j < len(batch) and cat in CATEGORY_DEFINITIONS:
+                results[batch[j]] = cat
+        return results
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+API 限流
+滑动 60 秒窗口内同时限制请求数（RPM）与 token 数（TPM），多线程共用一个实例
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Optional, Tuple
+
+_WINDOW = 60.0
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：中文约 1 字 1 token，其余约 4 字符 1 token"""
+    if not text:
+        return 0
+    cjk = sum(1 for c in text if '一' <= c <= '鿿')
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def estimate_messages_tokens(messages: list) -> int:
+    return sum(estimate_tokens(m.get("content") or "") + 4 for m in messages)
+
+
+class RateLimiter:
+    """RPM / TPM 限流器，limit 为 0 表示不限"""
+
+    def __init__(self, rpm: int = 0, tpm: int = 0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._cond = threading.Condition()
+        self._events = deque()  # [时间戳, token 数, 是否仍在窗口内]
+        self._tokens = 0
+
+    def _expire(self, now: float):
+        while self._events and now - self._events[0][0] >= _WINDOW:
+            event = self._events.popleft()
+            event[2] = False
+            self._tokens -= event[1]
+
+    def _wait_time(self, now: float, tokens: int) -> float:
+        """距离可以放行还需等待的秒数"""
+        wait = 0.0
+        if self.rpm and len(self._events) >= self.rpm:
+            wait = self._events[len(self._events) - self.rpm][0] + _WINDOW - now
+        if self.tpm and self._events and self._tokens + tokens > self.tpm:
+            # 单次请求超过整个 TPM 时，等窗口清空后放行，避免永远阻塞
+            excess = self._tokens + min(tokens, self.tpm) - self.tpm
+            freed = 0
+            for ts, used, _ in self._events:
+                freed += used
+                if freed >= excess:
+                    wait = max(wait, ts + _WINDOW - now)
+                    break
+            else:
+                wait = max(wait, self._events[-1][0] + _WINDOW - now)
+        return max(wait, 0.0)
+
+    def _try_register(self, tokens: int) -> Tuple[Optional[list], float]:
+        now = time.monotonic()
+        self._expire(now)
+        wait = self._wait_time(now, tokens)
+        if wait > 0:
+            return None, wait
+        event = [now, tokens, True]
+        self._events.append(event)
+        self._tokens += tokens
+        return event, 0.0
+
+    def acquire(self, tokens: int = 0) -> list:
+        """阻塞直到窗口内有余量，登记本次请求的预估 token，返回用于 adjust 的句柄"""
+        with self._cond:
+            while True:
+                event, wait = self._try_register(tokens)
+                if event is not None:
+                    return event
+                self._cond.wait(wait)
+
+    def try_acquire(self, tokens: int = 0) -> Tuple[Optional[list], float]:
+        """不阻塞：有余量时登记并返回 (句柄, 0)，否则返回 (None, 需等待秒数)；供协程自行 sleep，取消时不留登记"""
+        with self._cond:
+            return self._try_register(tokens)
+
+    def adjust(self, event: list, actual: int):
+        """请求完成后按实际用量修正登记的 token；已滑出窗口的不再计入"""
+        with self._cond:
+            if event[2]:
+                self._tokens += actual - event[1]
+                event[1] = actual
+                self._cond.notify_all()
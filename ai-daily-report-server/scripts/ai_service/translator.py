@@ -5,18 +5,21 @@
 """
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 import requests
 
 from ai_service.deepseek_client import get_client
+from config.settings import LLM_MAX_CONCURRENCY, TRANSLATE_MAX_WORKERS, TRANSLATE_FREE_ENABLED
+from crawler.http_utils import pooled_session
 
 logger = logging.getLogger(__name__)
 
 
-def _translate_free(text: str) -> Optional[str]:
+def _translate_free(text: str, session: Optional[requests.Session] = None) -> Optional[str]:
     """Google Translate 免费接口，失败返回 None"""
     try:
-        r = requests.get(
+        r = (session or requests).get(
             "https://translate.googleapis.com/translate_a/single",
             params={"client": "gtx", "sl": "auto", "tl": "zh-CN", "dt": "t", "q": text},
             timeout=8,
@@ -63,7 +66,7 @@ class Translator:
             {"role": "user", "content": prompt}
         ]
 
-        response = self.client.chat(messages, temperature=0.2, max_tokens=500)
+        response = self.client.chat(messages, temperature=0.2, max_tokens=500, stage="translate")
 
         if response:
             return response.strip().strip('"\'')
@@ -75,9 +78,7 @@ class Translator:
         if not titles:
             return []
 
-        results = {}
-        need_ai = []  # (original_index, title) 免费接口失败的条目
-
+        pending = []  # (original_index, title) 需要翻译的条目
         for i, title in enumerate(titles):
             if not title:
                 continue
@@ -85,30 +86,50 @@ class Translator:
             chinese_ratio = sum(1 for c in t if '\u4e00' <= c <= '\u9fff') / len(t)
             if chinese_ratio > 0.3:
                 continue  # 已是中文，不需翻译
+            pending.append((i, t))
+        if not pending:
+            return list(titles)
 
-            zh = _translate_free(t)
+        # 免费接口逐条请求，并发执行；结果按下标回填
+        results = {}
+        free = [None] * len(pending)
+        if TRANSLATE_FREE_ENABLED:
+            with pooled_session({}, TRANSLATE_MAX_WORKERS) as session, \
+                    ThreadPoolExecutor(max_workers=min(TRANSLATE_MAX_WORKERS, len(pending))) as pool:
+                free = list(pool.map(lambda entry: _translate_free(entry[1], session), pending))
+        need_ai = []  # 免费接口失败的条目
+        for (i, t), zh in zip(pending, free):
             if zh:
                 results[i] = zh[:80]
             else:
                 need_ai.append((i, t))
 
-        # 免费接口失败的批量交给 DeepSeek
+        # 免费接口失败的分批交给 DeepSeek，批次间并发（客户端限流）
         if need_ai:
             MAX_PER_BATCH = 5
-            for start in range(0, len(need_ai), MAX_PER_BATCH):
-                batch = need_ai[start:start + MAX_PER_BATCH]
-                news_texts = [f"{j+1}. {t}" for j, (_, t) in enumerate(batch)]
-                prompt = f"将以下{len(batch)}条英文新闻标题译成中文，每行一条，只输出译文：\n\n" + "\n".join(news_texts)
-                messages = [{"role": "user", "content": prompt}]
-                response = self.client.chat(messages, temperature=0.2, max_tokens=400)
-                if response:
-                    lines = [l.strip() for l in response.strip().split('\n') if l.strip()]
-                    for j, (orig_idx, orig_title) in enumerate(batch):
-                        if j < len(lines):
-                            results[orig_idx] = lines[j][:80]
+            batches = [need_ai[start:start + MAX_PER_BATCH] for start in range(0, len(need_ai), MAX_PER_BATCH)]
+            with ThreadPoolExecutor(max_workers=min(LLM_MAX_CONCURRENCY, len(batches))) as pool:
+                for batch_result in pool.map(self._translate_titles_ai, batches):
+                    results.update(batch_result)
 
         return [results.get(i, title) for i, title in enumerate(titles)]
 
+    def _translate_titles_ai(self, batch: list) -> dict:
+        """一次 DeepSeek 调用翻译一批标题，返回 {原下标: 译文}；翻译预算用尽时保留原标题"""
+        if self.client.usage.over_budget("translate"):
+            return {}
+        news_texts = [f"{j+1}. {t}" for j, (_, t) in enumerate(batch)]
+        prompt = f"将以下{len(batch)}条英文新闻标题译成中文，每行一条，只输出译文：\n\n" + "\n".join(news_texts)
+        messages = [{"role": "user", "content": prompt}]
+        response = self.client.chat(messages, temperature=0.2, max_tokens=400, stage="translate", items=len(batch))
+        results = {}
+        if response:
+            lines = [l.strip() for l in response.strip().split('\n') if l.strip()]
+            for j, (orig_idx, orig_title) in enumerate(batch):
+                if j < len(lines):
+                    results[orig_idx] = lines[j][:80]
+        return results
+
     def translate_title(self, title: str) -> Optional[str]:
         """翻译单条新闻标题，优先用免费接口，失败时降级到 DeepSeek"""
         if not title:
@@ -118,14 +139,14 @@ class Translator:
         if chinese_ratio > 0.3:
             return title
 
-        zh = _translate_free(t)
+        zh = _translate_free(t) if TRANSLATE_FREE_ENABLED else None
         if zh:
             return zh[:80]
 
         # 降级到 DeepSeek
         prompt = f"将以下英文新闻标题译成中文，只输出译文：\n\n{t}"
         messages = [{"role": "user", "content": prompt}]
-        response = self.client.chat(messages, temperature=0.2, max_tokens=80)
+        response = self.client.chat(messages, temperature=0.2, max_tokens=80, stage="translate_fallback")
         if response:
             return response.strip().strip('"\'')[:80]
         return title
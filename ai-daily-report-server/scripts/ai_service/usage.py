@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+LLM 用量统计
+每次调用按阶段打标签（条目数、输入/输出 token、耗时、重试次数、是否命中缓存），
+汇总进运行报告；各阶段可配置 token 预算，超出后由调用方改用更省的做法
+"""
+
+import logging
+import threading
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CallRecord:
+    """一次 LLM 调用"""
+    stage: str
+    items: int
+    prompt_tokens: int
+    completion_tokens: int
+    latency: float       # 含限流等待与重试的总耗时（秒）
+    retries: int
+    cached: bool = False
+    ok: bool = True
+
+
+class UsageTracker:
+    """按阶段累计用量并检查预算（线程安全）"""
+
+    def __init__(self, budgets: Optional[Dict[str, int]] = None):
+        self.budgets = dict(budgets or {})
+        self.calls = []
+        self.fallbacks: Dict[str, int] = {}
+        self._tokens: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, record: CallRecord):
+        with self._lock:
+            self.calls.append(record)
+            self._tokens[record.stage] = (self._tokens.get(record.stage, 0)
+                                          + record.prompt_tokens + record.completion_tokens)
+
+    def used(self, stage: str) -> int:
+        with self._lock:
+            return self._tokens.get(stage, 0)
+
+    def over_budget(self, stage: str) -> bool:
+        """阶段用量已达预算时返回 True 并计一次降级；未配置预算（或为 0）的阶段不限"""
+        budget = self.budgets.get(stage, 0)
+        if not budget:
+            return False
+        with self._lock:
+            if self._tokens.get(stage, 0) < budget:
+                return False
+            first = stage not in self.fallbacks
+            self.fallbacks[stage] = self.fallbacks.get(stage, 0) + 1
+        if first:
+            logger.warning(f"{stage} 阶段 token 用量已达预算 {budget}，后续改用降级方案")
+        return True
+
+    def report(self) -> dict:
+        """运行报告中的 llm 部分：按阶段汇总 + 逐次调用明细"""
+        with self._lock:
+            calls = list(self.calls)
+            fallbacks = dict(self.fallbacks)
+        stages: Dict[str, dict] = {}
+        for call in calls:
+            s = stages.setdefault(call.stage, {
+                "calls": 0, "items": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0,
+                "latency_seconds": 0.0, "max_latency_seconds": 0.0, "retries": 0, "cache_hits": 0, "failures": 0,
+            })
+            s["calls"] += 1
+            s["items"] += call.items
+            s["prompt_tokens"] += call.prompt_tokens
+            s["completion_tokens"] += call.completion_tokens
+            s["total_tokens"] += call.prompt_tokens + call.completion_tokens
+            s["latency_seconds"] = round(s["latency_seconds"] + call.latency, 3)
+            s["max_latency_seconds"] = round(max(s["max_latency_seconds"], call.latency), 3)
+            s["retries"] += call.retries
+            s["cache_hits"] += call.cached
+            s["failures"] += not call.ok
+        for stage, s in stages.items():
+            s["budget"] = self.budgets.get(stage, 0)
+            s["fallbacks"] = fallbacks.get(stage, 0)
+        return {
+            "total_tokens": sum(s["total_tokens"] for s in stages.values()),
+            "stages": stages,
+            "calls": [asdict(call) for call in calls],
+        }
+
+    def summary(self) -> str:
+        stages = self.report()["stages"]
+        return "，".join(
+            f"{stage} {s['calls']}次/{s['total_tokens']}tokens/{s['latency_seconds']:.1f}s"
+            for stage, s in stages.items()
+        ) or "无调用"
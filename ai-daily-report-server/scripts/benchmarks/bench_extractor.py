@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+正文提取 CPU 基准
+
+只测解析与提取（ContentExtractor.extract_html），不含网络耗时。
+语料为一个目录下保存的文章 HTML（*.html），仓库不附带真实网页：
+    python benchmarks/bench_extractor.py --corpus /tmp/extract-corpus --fetch 50
+    python benchmarks/bench_extractor.py --corpus /tmp/extract-corpus --repeat 5
+--fetch N 会从共享 archive.json 取最近 N 条 URL 下载到语料目录（已存在的跳过）。
+"""
+
+import argparse
+import hashlib
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config.settings import REQUEST_HEADERS, SHARED_ARCHIVE_FILE
+from crawler.content_extractor import ContentExtractor
+
+
+def fetch_corpus(extractor: ContentExtractor, corpus: Path, limit: int):
+    if not SHARED_ARCHIVE_FILE.exists():
+        print(f"共享数据不存在: {SHARED_ARCHIVE_FILE}")
+        return
+    with open(SHARED_ARCHIVE_FILE, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    items = data if isinstance(data, list) else data.get("items", [])
+
+    saved = 0
+    for item in items:
+        if saved >= limit:
+            break
+        url = item.get("url", "") or item.get("link", "")
+        if not url.startswith("http"):
+            continue
+        path = corpus / f"{hashlib.md5(url.encode()).hexdigest()}.html"
+        if path.exists():
+            saved += 1
+            continue
+        try:
+            html, _ = extractor._fetch(url)
+        except Exception as e:
+            print(f"  跳过 {url}: {e}")
+            continue
+        path.write_text(html, encoding="utf-8")
+        saved += 1
+    print(f"语料目录 {corpus}: 已有 {saved} 篇")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="正文提取 CPU 基准")
+    parser.add_argument("--corpus", required=True, help="保存文章 HTML 的目录")
+    parser.add_argument("--fetch", type=int, default=0, help="先从 archive.json 下载 N 篇到语料目录")
+    parser.add_argument("--repeat", type=int, default=3, help="每篇重复提取次数")
+    args = parser.parse_args()
+
+    corpus = Path(args.corpus)
+    corpus.mkdir(parents=True, exist_ok=True)
+    extractor = ContentExtractor(headers=REQUEST_HEADERS)
+    if args.fetch > 0:
+        fetch_corpus(extractor, corpus, args.fetch)
+
+    pages = [p.read_text(encoding="utf-8", errors="replace") for p in sorted(corpus.glob("*.html"))]
+    if not pages:
+        print("语料为空，请先用 --fetch 下载或放入 *.html")
+        return 1
+
+    timings = []
+    extracted = 0
+    for html in pages:
+        best = None
+        for _ in range(max(1, args.repeat)):
+            start = time.perf_counter()
+            content, _ = extractor.extract_html(html)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings.append(best * 1000)
+        if content:
+            extracted += 1
+
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"页面 {len(pages)} 篇，成功提取 {extracted} 篇")
+    print(f"每页耗时 ms: 平均 {statistics.mean(timings):.2f} / 中位 {statistics.median(timings):.2f} / P95 {p95:.2f}")
+    print(f"总 CPU 时间 {sum(timings):.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
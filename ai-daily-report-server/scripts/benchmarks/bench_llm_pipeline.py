@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LLM 阶段离线压测
+
+在进程内启动 llm_stub_server 桩服务，把 scripts 目录复制到临时沙箱（data / output / logs 都落在沙箱里，
+不碰真实的去重库与缓存），写入合成的共享数据与正文缓存（提取阶段全部命中，不走网络），
+然后以子进程运行完整的 main.py --no-publish，按并发度与模式（批量 / 流式）逐组测量：
+总耗时、各阶段耗时、LLM 调用数 / 重试 / token（来自 run_report.json）、桩服务观测到的并发峰值与注入错误数。
+
+    python benchmarks/bench_llm_pipeline.py --items 80 --concurrency 1,4,8 --modes batch,stream
+    python benchmarks/bench_llm_pipeline.py --latency fixed:0.5 --error-rate 0.05 --rate-limit-rate 0.05
+"""
+
+import argparse
+import json
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from crawler.content_cache import CACHE_VERSION, normalize_url
+from llm_stub_server import add_stub_arguments, stub_from_args
+
+_COMPANIES = ["OpenAI", "Google DeepMind", "Anthropic", "Meta", "Microsoft", "NVIDIA", "Mistral", "xAI",
+              "Tencent", "ByteDance", "Alibaba", "Baidu", "Unity", "Epic Games", "Roblox", "Stability AI"]
+_ACTIONS = ["launches", "open-sources", "releases", "unveils", "raises funding for", "benchmarks",
+            "ships an API for", "previews"]
+_OBJECTS = ["a reasoning model", "an AI agent platform", "a multimodal LLM", "a game NPC toolkit",
+            "an inference accelerator", "a coding assistant", "a video generation model", "an AI search product"]
+_DETAILS = ["with longer context", "for enterprise developers", "trained on synthetic data",
+            "for mobile games", "with lower token prices", "after a safety review", "in 40 languages",
+            "for on-device inference"]
+_ZH_TITLES = ["{c}发布新一代大模型，推理能力大幅提升", "{c}推出 AI 智能体平台，开放给开发者",
+              "{c}完成新一轮融资，加码大模型训练", "{c}上线游戏 AI 工具，助力 NPC 对话生成"]
+
+
+def make_items(count: int, seed: int = 0) -> list:
+    """合成最近 20 小时内的共享数据条目（中英文混合，标题互不相似，都能通过关键词筛选）"""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    items = []
+    for i in range(count):
+        company = _COMPANIES[i % len(_COMPANIES)]
+        if i % 5 == 4:
+            title = _ZH_TITLES[(i // 5) % len(_ZH_TITLES)].format(c=company) + f"（第{i}期）"
+        else:
+            title = (f"{company} {rng.choice(_ACTIONS)} {rng.choice(_OBJECTS)} "
+                     f"{rng.choice(_DETAILS)} (v{i}.{rng.randint(0, 9)})")
+        published = now - timedelta(minutes=rng.randint(5, 20 * 60))
+        items.append({
+            "id": f"bench-{i}",
+            "site_id": rng.choice(["aibase", "techcrunch", "theverge", "jiqizhixin", "hackernews"]),
+            "site_name": "Bench",
+            "title": title,
+            "url": f"https://bench.example.com/{i}/article",
+            "published_at": published.isoformat(),
+            "summary": f"{title}. The model improves reasoning and lowers inference cost for developers.",
+        })
+    return items
+
+
+def write_shared_data(shared_dir: Path, items: list):
+    """archive.json + 正文缓存（提取阶段直接命中）"""
+    shared_dir.mkdir(parents=True, exist_ok=True)
+    with open(shared_dir / "archive.json", "w", encoding="utf-8") as f:
+        json.dump({"items": items}, f, ensure_ascii=False)
+
+    fetched_at = datetime.now(timezone.utc).isoformat()
+    entries = {}
+    for item in items:
+        text = " ".join([item["summary"]] * 12)
+        entries[normalize_url(item["url"])] = {
+            "url": item["url"], "text": text, "pub_time": item["published_at"], "description": item["summary"],
+            "fetched_at": fetched_at, "etag": None, "last_modified": None, "partial": False,
+        }
+    with open(shared_dir / "content-cache.json", "w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "entries": entries}, f, ensure_ascii=False)
+
+
+def make_sandbox(root: Path, items: list) -> Path:
+    scripts = root / "scripts"
+    shutil.copytree(SCRIPTS_DIR, scripts, ignore=shutil.ignore_patterns("__pycache__", "benchmarks"))
+    write_shared_data(root / "shared", items)
+    return scripts
+
+
+def run_once(server, items: list, concurrency: int, stream: bool, args) -> dict:
+    root = Path(tempfile.mkdtemp(prefix="bench-llm-"))
+    try:
+        scripts = make_sandbox(root, items)
+        env = {
+            "PATH": "/usr/bin:/bin", "HOME": str(root), "PYTHONIOENCODING": "utf-8",
+            "DEEPSEEK_API_KEY": "stub", "DEEPSEEK_BASE_URL": server.base_url,
+            "SHARED_DATA_DIR": str(root / "shared"),
+            "LLM_CACHE_ENABLED": "0", "TRANSLATE_FREE_ENABLED": "0",
+            "LLM_MAX_CONCURRENCY": str(concurrency),
+            "LLM_RPM_LIMIT": str(args.client_rpm), "LLM_TPM_LIMIT": "0",
+            "LOG_LEVEL": "WARNING",
+        }
+        command = [sys.executable, "main.py", "--no-publish"] + (["--stream"] if stream else [])
+        server.stats.reset()
+        started = time.perf_counter()
+        proc = subprocess.run(command, cwd=scripts, env=env, capture_output=True, text=True, timeout=args.timeout)
+        elapsed = time.perf_counter() - started
+
+        reports = sorted((root / "data" / "runs").glob("*/run_report.json"))
+        report = json.loads(reports[-1].read_text(encoding="utf-8")) if reports else {}
+        if proc.returncode != 0 or not report:
+            tail = "\n".join(proc.stderr.strip().splitlines()[-10:])
+            print(f"  运行失败（退出码 {proc.returncode}）:\n{tail}")
+        return {"elapsed": elapsed, "report": report, "stub": server.stats.snapshot(), "ok": proc.returncode == 0}
+    finally:
+        if args.keep:
+            print(f"  沙箱保留在 {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def print_result(mode: str, concurrency: int, result: dict):
+    report, stub = result["report"], result["stub"]
+    stages = report.get("stages", {})
+    llm = report.get("llm", {}).get("stages", {})
+    stage_text = " ".join(f"{name} {info['seconds']:.1f}s" for name, info in stages.items()
+                          if name not in ("collect", "filter", "dedupe") and info["seconds"] >= 0.05)
+    calls = sum(s["calls"] for s in llm.values())
+    retries = sum(s["retries"] for s in llm.values())
+    failures = sum(s["failures"] for s in llm.values())
+    items = llm.get("summarize", {}).get("items", 0)
+    llm_seconds = sum(stages.get(name, {}).get("seconds", 0) for name in ("extract", "summarize", "translate", "classify"))
+    throughput = items / llm_seconds if llm_seconds else 0.0
+    print(f"{mode:>6} 并发{concurrency:<3} 总耗时 {result['elapsed']:6.1f}s | {stage_text}")
+    print(f"{'':>6} {'':<6} 调用 {calls} 次（重试 {retries}，失败 {failures}），"
+          f"token {report.get('llm', {}).get('total_tokens', 0)}，摘要 {items} 条 / {throughput:.1f} 条每秒，"
+          f"服务端并发峰值 {stub['max_in_flight']}，注入 500×{stub['errors']} 429×{stub['rate_limited']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM 阶段离线压测（完整日报流水线 + 桩服务）")
+    parser.add_argument("--items", type=int, default=80, help="合成条目数（去重后最多 50 条进入 LLM 阶段）")
+    parser.add_argument("--concurrency", default="1,4,8", help="LLM_MAX_CONCURRENCY，逗号分隔逐组运行")
+    parser.add_argument("--modes", default="batch,stream", help="batch（分阶段）/ stream（--stream 流式）")
+    parser.add_argument("--client-rpm", type=int, default=0, help="客户端 LLM_RPM_LIMIT（0 表示不限）")
+    parser.add_argument("--timeout", type=float, default=600, help="单次运行超时（秒）")
+    parser.add_argument("--keep", action="store_true", help="保留沙箱目录（查看日志与输出）")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    items = make_items(args.items, args.seed)
+    server = stub_from_args(args).start()
+    print(f"桩服务 {server.base_url}，延迟 {args.latency}，生成速度 {args.tokens_per_second} token/s，"
+          f"500 注入 {args.error_rate:.0%}，429 注入 {args.rate_limit_rate:.0%}，合成条目 {len(items)} 条")
+    ok = True
+    try:
+        for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+            for concurrency in [int(c) for c in args.concurrency.split(",") if c.strip()]:
+                result = run_once(server, items, concurrency, mode == "stream", args)
+                ok = ok and result["ok"]
+                print_result(mode, concurrency, result)
+    finally:
+        server.stop()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,7 @@
 支持环境变量覆盖，适合 GitHub Actions 部署
 """
 
+import json
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -24,6 +25,13 @@ SHARED_DATA_DIR = Path(os.environ.get(
     str(PROJECT_ROOT.parent / "ai-hourly-buzz" / "data")
 ))
 SHARED_ARCHIVE_FILE = SHARED_DATA_DIR / "archive.json"
+# buzz 按天切分的归档（YYYY-MM-DD.json + index.json），加载最近几小时时只读覆盖到的那几天
+SHARED_ARCHIVE_DAYS_DIR = SHARED_DATA_DIR / "archive-days"
+# buzz 的本机查询服务（shared_query_server.py）socket，为空不启用；服务没开时自动回退读文件
+SHARED_QUERY_SOCKET = os.environ.get("SHARED_QUERY_SOCKET", "")
+SHARED_QUERY_TIMEOUT = float(os.environ.get("SHARED_QUERY_TIMEOUT", "5"))
+# buzz 翻译过的标题（英文原标题 -> 中文），日报先查这里，未命中才翻译
+SHARED_TITLE_ZH_CACHE_FILE = SHARED_DATA_DIR / "title-zh-cache.json"
 
 # ============== DeepSeek API 配置 ==============
 DEEPSEEK_API_KEY = os.environ.get("DEEPSEEK_API_KEY", "")
@@ -35,6 +43,28 @@ API_MAX_RETRIES = 3
 API_RETRY_DELAY = 2
 API_TIMEOUT = 60
 API_BATCH_SIZE = 5
+# 并发调度：同时在途的请求数（在客户端内统一限制，各阶段线程池叠加也不超出）/ 每分钟请求数与 token 数上限（0 表示不限）
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "4"))
+LLM_RPM_LIMIT = int(os.environ.get("LLM_RPM_LIMIT", "60"))
+LLM_TPM_LIMIT = int(os.environ.get("LLM_TPM_LIMIT", "120000"))
+# 摘要打包：每批输入的预估 token 上限 / 每批最多条数
+SUMMARY_BATCH_TOKENS = 1200
+SUMMARY_BATCH_MAX_ITEMS = 4
+# LLM 响应缓存：按请求内容哈希存放在共享数据目录，与 ai-deep-column 共用；--no-llm-cache 可临时关闭
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "1") != "0"
+LLM_CACHE_FILE = Path(os.environ.get("LLM_CACHE_FILE", str(SHARED_DATA_DIR / "llm-cache.sqlite3")))
+LLM_CACHE_TTL_HOURS = float(os.environ.get("LLM_CACHE_TTL_HOURS", "72"))
+# 分阶段 token 预算（0 表示不限），用量写入运行报告 data/runs/<日期>/run_report.json；
+# 达到预算后：summarize 改为短摘要，translate 不再调用模型，translate_fallback 跳过逐条兜底，
+# classify 改用规则分类，lede 使用模板导语。可用 LLM_STAGE_BUDGETS='{"summarize": 30000}' 覆盖
+LLM_STAGE_BUDGETS = {
+    "summarize": 80000,
+    "translate": 10000,
+    "translate_fallback": 4000,
+    "classify": 20000,
+    "lede": 2000,
+}
+LLM_STAGE_BUDGETS.update(json.loads(os.environ.get("LLM_STAGE_BUDGETS", "{}")))
 
 # ============== 微信公众号配置 ==============
 WECHAT_APP_ID = os.environ.get("WECHAT_APP_ID", "")
@@ -68,11 +98,64 @@ REQUEST_HEADERS = {
 REQUEST_TIMEOUT = 30
 REQUEST_DELAY = 1
 
+# 独立采集（共享数据不足时）：全局线程数 / 单域名并发数；同域名请求间隔沿用 REQUEST_DELAY
+FETCH_MAX_WORKERS = int(os.environ.get("FETCH_MAX_WORKERS", "8"))
+FETCH_PER_HOST_CONCURRENCY = 2
+# 各源上次的 ETag / Last-Modified 与解析结果，用于条件请求
+FEED_CACHE_FILE = DATA_DIR / "feed_cache.json"
+
+# 正文提取并发：全局线程数 / 单域名并发数 / 单域名请求间隔（秒）/ 单条总耗时上限（秒）
+EXTRACT_MAX_WORKERS = int(os.environ.get("EXTRACT_MAX_WORKERS", "8"))
+EXTRACT_PER_DOMAIN_CONCURRENCY = 2
+EXTRACT_PER_DOMAIN_DELAY = 1.0
+EXTRACT_ITEM_DEADLINE = 20
+
+# 正文缓存：按规范化 URL 存放在共享数据目录，与 ai-deep-column 共用
+CONTENT_CACHE_FILE = Path(os.environ.get("CONTENT_CACHE_FILE", str(SHARED_DATA_DIR / "content-cache.json")))
+CONTENT_CACHE_TTL_HOURS = float(os.environ.get("CONTENT_CACHE_TTL_HOURS", "72"))
+CONTENT_CACHE_MAX_ENTRIES = 3000
+
+# 标题翻译（免费接口）并发数；TRANSLATE_FREE_ENABLED=0 时全部交给 DeepSeek（离线压测用）
+TRANSLATE_MAX_WORKERS = int(os.environ.get("TRANSLATE_MAX_WORKERS", "8"))
+TRANSLATE_FREE_ENABLED = os.environ.get("TRANSLATE_FREE_ENABLED", "1") != "0"
+
 # ============== 日志配置 ==============
 LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 LOG_FILE = LOGS_DIR / "daily_report.log"
 
 # ============== 缓存配置 ==============
-NEWS_CACHE_FILE = DATA_DIR / "news_cache.json"
+# 已发布新闻 URL（SQLite），次日日报跳过；超过保留天数自动清理
+PROCESSED_URL_DB = DATA_DIR / "processed_urls.sqlite3"
 CACHE_RETENTION_DAYS = 7
+# 默认只在发布到微信成功后记录；只产出本地文件、从不发布的部署设为 1，--no-publish 时也记录
+MARK_PROCESSED_WITHOUT_PUBLISH = os.environ.get("MARK_PROCESSED_WITHOUT_PUBLISH", "0") == "1"
+
+# ============== 运行检查点 ==============
+# 每个阶段的输出按日期存到 data/runs/<日期>/<阶段>.json，--resume / --from-stage 时复用
+RUNS_DIR = DATA_DIR / "runs"
+RUN_CHECKPOINT_RETENTION_DAYS = 7
+
+# ============== 流式处理 ==============
+# 正文提取 → 摘要 → 标题翻译 用有界队列衔接、重叠执行（--stream 或 STREAMING_PIPELINE=1 开启）
+STREAMING_PIPELINE = os.environ.get("STREAMING_PIPELINE", "0") == "1"
+STREAM_QUEUE_SIZE = 16
+STREAM_BATCH_LINGER = 1.0       # 摘要/翻译攒批最多等待的秒数
+STREAM_TRANSLATE_BATCH = 10
+STREAM_TRANSLATE_WORKERS = 2
+
+# ============== 增量预摘要 ==============
+# buzz 每小时采集后运行 main.py --presummarize，对评分靠前的新条目预先提取正文、生成摘要和中文标题，
+# 按条目 ID 存入 SQLite；7:00 的日报直接复用，只处理未命中的条目
+PRESUMMARY_DB = Path(os.environ.get("PRESUMMARY_DB", str(DATA_DIR / "presummary.sqlite3")))
+PRESUMMARY_TTL_HOURS = 36
+PRESUMMARY_TOP_N = int(os.environ.get("PRESUMMARY_TOP_N", "80"))  # 日报最多取 50 条，多留余量
+
+# ============== 分类 ==============
+# AI 分类：批次并发（共用 DeepSeek 限流器），结果按条目 ID 缓存；
+# 超过截止时间（秒）仍未返回、失败或返回非法类别的条目改用规则分类
+CLASSIFY_USE_AI = os.environ.get("CLASSIFY_USE_AI", "1") == "1"
+CLASSIFY_BATCH_SIZE = 10
+CLASSIFY_AI_DEADLINE = float(os.environ.get("CLASSIFY_AI_DEADLINE", "60"))
+CLASSIFY_CACHE_DB = DATA_DIR / "categories.sqlite3"
+CLASSIFY_CACHE_TTL_HOURS = 72
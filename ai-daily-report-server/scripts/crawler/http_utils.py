@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP 公共工具
+连接池会话与按域名限速，供 RSS 解析、网页爬取、正文提取共用
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def pooled_session(headers: dict, pool_size: int) -> requests.Session:
+    """按并发数配置连接池的 Session，避免多线程下连接被反复丢弃重建"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(headers)
+    return session
+
+
+class DomainLimiter:
+    """单域名并发数 + 请求间隔限制，替代全局 sleep；可在多个采集器间共享"""
+
+    def __init__(self, concurrency: int, delay: float):
+        self.concurrency = max(1, concurrency)
+        self.delay = max(0.0, delay)
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.Semaphore] = {}
+        self._next_slot: Dict[str, float] = {}
+
+    @contextmanager
+    def slot(self, domain: str):
+        with self._lock:
+            sem = self._semaphores.setdefault(domain, threading.Semaphore(self.concurrency))
+        with sem:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_slot.get(domain, 0.0))
+                self._next_slot[domain] = start + self.delay
+            if start > now:
+                time.sleep(start - now)
+            yield
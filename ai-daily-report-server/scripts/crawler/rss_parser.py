@@ -1,18 +1,23 @@
 # -*- coding: utf-8 -*-
 """
 RSS解析器
-从RSS源获取新闻列表
+从RSS源并发获取新闻列表：连接池复用、按域名限速、条件请求、RSSHub 镜像竞速
 """
 
 import feedparser
 import requests
 import logging
 import hashlib
-import time
 import ssl
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from urllib.parse import urlparse
 
+from config.rss_sources import RSSHUB_MIRRORS
+from crawler.feed_cache import FeedCache
+from crawler.http_utils import DomainLimiter, pooled_session
 from crawler.models import RawNewsItem
 
 logger = logging.getLogger(__name__)
@@ -22,40 +27,152 @@ ssl._create_default_https_context = ssl._create_unverified_context
 class RSSParser:
     """RSS源解析器"""
 
-    def __init__(self, sources: list, headers: dict, timeout: int = 30, delay: float = 1):
+    def __init__(self, sources: list, headers: dict, timeout: int = 30, delay: float = 1,
+                 session: requests.Session = None, limiter: DomainLimiter = None,
+                 feed_cache: FeedCache = None, max_workers: int = None):
+        """
+        Args:
+            delay: 同一域名两次请求的最小间隔（不同域名并发抓取）
+            session / limiter / feed_cache: 可与 WebScraper 共用
+        """
+        from config.settings import FETCH_MAX_WORKERS, FETCH_PER_HOST_CONCURRENCY
         self.sources = [s for s in sources if s.get("extraction_method") != "web_scrape"]
         self.headers = headers
         self.timeout = timeout
         self.delay = delay
+        self.max_workers = max(1, max_workers or FETCH_MAX_WORKERS)
+        self.session = session or pooled_session(headers, self.max_workers)
+        self.limiter = limiter or DomainLimiter(FETCH_PER_HOST_CONCURRENCY, delay)
+        self.feed_cache = feed_cache
 
     def parse_all(self) -> List[RawNewsItem]:
-        all_news = []
-        for source in self.sources:
-            try:
-                logger.info(f"解析RSS: {source['name']}")
-                news = self._parse_single(source)
-                all_news.extend(news)
-                logger.info(f"  -> {len(news)} 条")
-                time.sleep(self.delay)
-            except Exception as e:
-                logger.error(f"解析 {source['name']} 失败: {e}")
-        return all_news
+        if not self.sources:
+            return []
+        results: List[List[RawNewsItem]] = [[] for _ in self.sources]
+        workers = min(self.max_workers, len(self.sources))
+        # 镜像竞速共用一个线程池，整次 parse_all 结束时一并回收，不为每个源单独开池
+        with ThreadPoolExecutor(max_workers=workers) as executor, \
+                ThreadPoolExecutor(max_workers=workers * len(RSSHUB_MIRRORS)) as mirror_pool:
+            futures = {
+                executor.submit(self._parse_single, source, mirror_pool): i
+                for i, source in enumerate(self.sources)
+            }
+            for future in as_completed(futures):
+                source = self.sources[futures[future]]
+                try:
+                    news = future.result()
+                except Exception as e:
+                    logger.error(f"解析 {source['name']} 失败: {e}")
+                    continue
+                results[futures[future]] = news
+                logger.info(f"解析RSS: {source['name']} -> {len(news)} 条")
+        if self.feed_cache:
+            self.feed_cache.save()
+        # 按配置顺序合并，结果与抓取完成先后无关
+        return [item for news in results for item in news]
 
-    def _parse_single(self, source: Dict) -> List[RawNewsItem]:
+    def _parse_single(self, source: Dict, mirror_pool: ThreadPoolExecutor = None) -> List[RawNewsItem]:
         news_list = []
         try:
-            resp = requests.get(source["url"], headers=self.headers, timeout=self.timeout)
-            resp.raise_for_status()
-            feed = feedparser.parse(resp.content)
+            url, resp, feed = self._fetch_feed(source, mirror_pool=mirror_pool)
+            if resp.status_code == 304:
+                cached = self.feed_cache.items(source["key"])
+                if cached is not None:
+                    logger.debug(f"RSS {source['name']}: 未更新，复用上次结果")
+                    return cached
+                url, resp, feed = self._fetch_feed(source, conditional=False, mirror_pool=mirror_pool)
 
             for entry in feed.entries:
                 item = self._parse_entry(entry, source)
                 if item:
                     news_list.append(item)
+            if self.feed_cache:
+                self.feed_cache.store(source["key"], url, resp.headers, news_list)
         except Exception as e:
             logger.error(f"RSS {source['name']}: {e}")
         return news_list
 
+    @staticmethod
+    def _candidate_urls(url: str) -> List[str]:
+        """RSSHub 源展开为所有镜像上的同一路径"""
+        for mirror in RSSHUB_MIRRORS:
+            if url.startswith(mirror):
+                path = url[len(mirror):]
+                return [m + path for m in RSSHUB_MIRRORS]
+        return [url]
+
+    def _get(self, source: Dict, url: str, conditional: bool = True,
+             abandoned: threading.Event = None) -> Tuple[str, requests.Response, object]:
+        """请求单个 URL；304 时 feed 为 None。abandoned 已置位（竞速已有结果）时不再发出请求"""
+        headers = {}
+        if conditional and self.feed_cache:
+            headers = self.feed_cache.validators(source["key"], url)
+        with self.limiter.slot(urlparse(url).netloc.lower()):
+            if abandoned is not None and abandoned.is_set():
+                raise RuntimeError("其他镜像已返回，放弃请求")
+            resp = self.session.get(url, timeout=self.timeout, headers=headers)
+        if resp.status_code == 304 and headers:
+            return url, resp, None
+        resp.raise_for_status()
+        return url, resp, feedparser.parse(resp.content)
+
+    @staticmethod
+    def _usable(feed) -> bool:
+        return feed is None or bool(feed.entries)
+
+    def _fetch_feed(self, source: Dict, conditional: bool = True,
+                    mirror_pool: ThreadPoolExecutor = None) -> Tuple[str, requests.Response, object]:
+        urls = self._candidate_urls(source["url"])
+        if len(urls) == 1:
+            return self._get(source, urls[0], conditional)
+
+        # 先只请求上次胜出的镜像；失败或没有记录时才让其余镜像竞速
+        last_error: Exception = RuntimeError("所有 RSSHub 镜像均不可用")
+        preferred = self.feed_cache.url(source["key"]) if self.feed_cache else None
+        if preferred in urls:
+            try:
+                url, resp, feed = self._get(source, preferred, conditional)
+                if self._usable(feed):
+                    return url, resp, feed
+                last_error = ValueError(f"镜像 {urlparse(url).netloc} 返回空 feed")
+            except Exception as e:
+                last_error = e
+            logger.info(f"RSS {source['name']}: 镜像 {urlparse(preferred).netloc} 不可用（{last_error}），改为竞速")
+            urls = [u for u in urls if u != preferred]
+
+        if mirror_pool is None:
+            # 不在 parse_all 内调用时按顺序逐个尝试
+            for url in urls:
+                try:
+                    url, resp, feed = self._get(source, url, conditional)
+                except Exception as e:
+                    last_error = e
+                    continue
+                if self._usable(feed):
+                    return url, resp, feed
+                last_error = ValueError(f"镜像 {urlparse(url).netloc} 返回空 feed")
+            raise last_error
+
+        # 取第一个返回有效 feed 的；尚未发出的请求随之取消，不再占用域名并发名额
+        abandoned = threading.Event()
+        futures = [mirror_pool.submit(self._get, source, url, conditional, abandoned) for url in urls]
+        try:
+            for future in as_completed(futures):
+                try:
+                    url, resp, feed = future.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+                if self._usable(feed):
+                    logger.debug(f"RSS {source['name']}: 采用镜像 {urlparse(url).netloc}")
+                    return url, resp, feed
+                last_error = ValueError(f"镜像 {urlparse(url).netloc} 返回空 feed")
+        finally:
+            abandoned.set()
+            for future in futures:
+                future.cancel()
+        raise last_error
+
     def _parse_entry(self, entry, source: Dict) -> Optional[RawNewsItem]:
         title = entry.get("title", "").strip()
         url = entry.get("link", "").strip()
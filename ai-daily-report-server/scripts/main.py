@@ -9,29 +9,44 @@ AI资讯日报自动化系统 - 主程序
 - 回退到独立 RSS 采集
 - 深度处理：关键词筛选 → 去重 → 正文提取 → AI摘要翻译 → 5类分类
 - 双输出：HTML存档 + 微信公众号草稿
+- 阶段检查点：各阶段输出写入 data/runs/<日期>/，--resume / --from-stage 从中断处继续
 """
 
 import logging
 import sys
 import json
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 PROJECT_ROOT = Path(__file__).parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 from config.settings import (
     LOG_LEVEL, LOG_FORMAT, LOG_FILE, LOGS_DIR,
-    MAX_NEWS_PER_CATEGORY
+    MAX_NEWS_PER_CATEGORY, PROCESSED_URL_DB, CACHE_RETENTION_DAYS, MARK_PROCESSED_WITHOUT_PUBLISH,
+    RUNS_DIR, RUN_CHECKPOINT_RETENTION_DAYS,
+    STREAMING_PIPELINE, STREAM_QUEUE_SIZE, STREAM_BATCH_LINGER,
+    STREAM_TRANSLATE_BATCH, STREAM_TRANSLATE_WORKERS,
+    EXTRACT_MAX_WORKERS, LLM_MAX_CONCURRENCY, SUMMARY_BATCH_MAX_ITEMS,
+    PRESUMMARY_DB, PRESUMMARY_TTL_HOURS, PRESUMMARY_TOP_N,
+    CLASSIFY_USE_AI, CLASSIFY_CACHE_DB, CLASSIFY_CACHE_TTL_HOURS,
 )
 from crawler.models import RawNewsItem, ScoredNewsItem
 from crawler.shared_loader import SharedDataLoader
 from crawler.rss_parser import RSSParser
 from crawler.web_scraper import WebScraper
 from crawler.content_extractor import ContentExtractor
+from crawler.content_cache import ContentCache
+from crawler.feed_cache import FeedCache
+from crawler.http_utils import DomainLimiter, pooled_session
+from processor.category_cache import CategoryCache
+from processor.checkpoint import RunCheckpoint, STAGES
 from processor.filter import KeywordFilter
+from processor.presummary_cache import PresummaryCache
+from processor.streaming import Stage, run_stream
 from processor.deduplicator import Deduplicator
 from processor.time_handler import TimeHandler
 from ai_service.summarizer import Summarizer
@@ -71,106 +86,134 @@ class DailyReportPipeline:
 
         # 数据采集
         from config.rss_sources import RSS_SOURCES
-        from config.settings import REQUEST_HEADERS, REQUEST_TIMEOUT, REQUEST_DELAY
+        from config.settings import (
+            REQUEST_HEADERS, REQUEST_TIMEOUT, REQUEST_DELAY,
+            FETCH_MAX_WORKERS, FETCH_PER_HOST_CONCURRENCY, FEED_CACHE_FILE,
+            CONTENT_CACHE_FILE, CONTENT_CACHE_TTL_HOURS, CONTENT_CACHE_MAX_ENTRIES,
+        )
         self.shared_loader = SharedDataLoader()
-        self.rss_parser = RSSParser(sources=RSS_SOURCES, headers=REQUEST_HEADERS, timeout=REQUEST_TIMEOUT, delay=REQUEST_DELAY)
-        self.web_scraper = WebScraper(sources=RSS_SOURCES, headers=REQUEST_HEADERS, timeout=REQUEST_TIMEOUT, delay=REQUEST_DELAY)
-        self.content_extractor = ContentExtractor(headers=REQUEST_HEADERS)
+        # RSS 与网页爬取共用连接池、域名限速和条件请求缓存
+        fetch_session = pooled_session(REQUEST_HEADERS, FETCH_MAX_WORKERS)
+        fetch_limiter = DomainLimiter(FETCH_PER_HOST_CONCURRENCY, REQUEST_DELAY)
+        feed_cache = FeedCache(FEED_CACHE_FILE)
+        self.rss_parser = RSSParser(
+            sources=RSS_SOURCES, headers=REQUEST_HEADERS, timeout=REQUEST_TIMEOUT, delay=REQUEST_DELAY,
+            session=fetch_session, limiter=fetch_limiter, feed_cache=feed_cache,
+        )
+        self.web_scraper = WebScraper(
+            sources=RSS_SOURCES, headers=REQUEST_HEADERS, timeout=REQUEST_TIMEOUT, delay=REQUEST_DELAY,
+            session=fetch_session, limiter=fetch_limiter, feed_cache=feed_cache,
+        )
+        content_cache = ContentCache(CONTENT_CACHE_FILE, CONTENT_CACHE_TTL_HOURS, CONTENT_CACHE_MAX_ENTRIES)
+        self.content_extractor = ContentExtractor(headers=REQUEST_HEADERS, cache=content_cache)
 
         # 数据处理
         self.keyword_filter = KeywordFilter()
-        self.deduplicator = Deduplicator()
+        self.deduplicator = Deduplicator(cache_file=PROCESSED_URL_DB, retention_days=CACHE_RETENTION_DAYS)
         self.time_handler = TimeHandler()
+        self.presummary_cache = PresummaryCache(PRESUMMARY_DB, PRESUMMARY_TTL_HOURS)
 
         # AI服务
         self.summarizer = Summarizer()
         self.translator = Translator()
-        self.classifier = Classifier()
+        self.classifier = Classifier(cache=CategoryCache(CLASSIFY_CACHE_DB, CLASSIFY_CACHE_TTL_HOURS))
 
         # 发布
         self.html_generator = HTMLGenerator()
         self.markdown_generator = MarkdownGenerator()
         self.wechat_publisher = WeChatPublisher()
 
-    def run(self, publish_to_wechat: bool = True) -> bool:
-        """执行完整的日报生成流程"""
+        # 当前运行的检查点（run 期间有效），阶段内降级时据此跳过写检查点
+        self.checkpoint: Optional[RunCheckpoint] = None
+
+    def run(self, publish_to_wechat: bool = True, resume: bool = False, from_stage: str = None,
+            streaming: bool = STREAMING_PIPELINE) -> bool:
+        """
+        执行完整的日报生成流程
+        每个阶段的输出写入当日运行目录；resume 时复用有效检查点，from_stage 指定从哪个阶段起重跑
+        streaming 时 提取 → 摘要 → 翻译 流式重叠执行，作为一个整体写入 translate 检查点
+        已收录 URL 只在发布到微信成功后记录（次日日报跳过）；不发布或发布失败时不记录，
+        除非部署本就不发布（MARK_PROCESSED_WITHOUT_PUBLISH=1），此时生成日报即记录
+        """
         start_time = datetime.now()
         self.logger.info("=" * 50)
         self.logger.info("开始生成AI资讯日报")
         self.logger.info("=" * 50)
 
+        checkpoint = None
+        success = False
         try:
+            run_date = self.time_handler.get_now().strftime("%Y-%m-%d")
+            checkpoint = RunCheckpoint(
+                RUNS_DIR, run_date, resume=resume, from_stage=from_stage,
+                retention_days=RUN_CHECKPOINT_RETENTION_DAYS,
+            )
+            self.checkpoint = checkpoint
+
             # 1. 采集新闻（优先共享数据）
             self.logger.info("\n📥 步骤1: 采集新闻...")
-            raw_news = self._collect_news()
+            raw_news = checkpoint.run("collect", run_date, self._collect_news)
             if not raw_news:
                 self.logger.warning("未获取到任何新闻，流程终止")
                 return False
 
-            # 2. 时间过滤
-            self.logger.info("\n📅 步骤2: 筛选过去24小时新闻...")
-            recent_news = self._filter_by_time(raw_news)
-            if not recent_news:
-                self.logger.warning("未找到过去24小时的新闻，使用所有新闻")
-                recent_news = raw_news[:50]
-
-            # 3. 关键词筛选
-            self.logger.info("\n🔍 步骤3: 筛选相关新闻...")
-            filtered_news = self._filter_news(recent_news)
+            # 2. 时间过滤 + 关键词筛选
+            self.logger.info("\n🔍 步骤2: 筛选过去24小时的相关新闻...")
+            filtered_news = checkpoint.run("filter", raw_news, lambda: self._filter_stage(raw_news))
             if not filtered_news:
                 self.logger.warning("筛选后无相关新闻，流程终止")
                 return False
 
-            # 4. 去重
-            self.logger.info("\n🔄 步骤4: 去重处理...")
-            unique_news = self._deduplicate(filtered_news)
+            # 3. 去重，按评分取Top N
+            self.logger.info("\n🔄 步骤3: 去重处理...")
+            unique_news = checkpoint.run("dedupe", filtered_news, lambda: self._dedupe_stage(filtered_news))
             if not unique_news:
                 self.logger.warning("去重后无新闻，流程终止")
                 return False
 
-            # 4.5 按评分排序，取Top N
-            unique_news.sort(key=lambda x: x.relevance_score, reverse=True)
-            MAX_TOTAL = 50  # 最多处理50条高质量新闻
-            if len(unique_news) > MAX_TOTAL:
-                self.logger.info(f"按评分取前 {MAX_TOTAL} 条 (共 {len(unique_news)} 条)")
-                unique_news = unique_news[:MAX_TOTAL]
-
-            # 打印Top10标题和评分供调试
-            self.logger.info("Top-10 新闻:")
-            for i, item in enumerate(unique_news[:10]):
-                title = item.raw_item.title[:60]
-                self.logger.info(f"  {i+1}. [{item.relevance_score:.1f}分] {title}")
-
-            # 5. 提取正文
-            self.logger.info("\n📄 步骤5: 提取新闻正文...")
-            self._extract_content(unique_news)
-
-            # 6. AI处理（摘要+翻译）
-            self.logger.info("\n🤖 步骤6: AI生成摘要和翻译...")
-            processed_news = self._ai_process(unique_news)
-
-            # 7. 分类（五个类别）
+            if streaming:
+                # 4-6. 提取正文、AI摘要、标题翻译流式重叠执行
+                self.logger.info("\n🚰 步骤4-6: 流式提取正文 → 生成摘要 → 翻译标题...")
+                processed_news = checkpoint.run("translate", unique_news, lambda: self._stream_process(unique_news))
+            else:
+                # 4. 提取正文
+                self.logger.info("\n📄 步骤4: 提取新闻正文...")
+                extracted_news = checkpoint.run("extract", unique_news, lambda: self._extract_content(unique_news))
+
+                # 5. AI摘要
+                self.logger.info("\n🤖 步骤5: AI生成摘要...")
+                summarized_news = checkpoint.run(
+                    "summarize", extracted_news, lambda: self._summarize(extracted_news)
+                )
+
+                # 6. 标题翻译
+                self.logger.info("\n🌐 步骤6: 翻译标题...")
+                processed_news = checkpoint.run(
+                    "translate", summarized_news, lambda: self._translate_titles(summarized_news)
+                )
+
+            # 7. 分类（五个类别），限制每个类别的数量
             self.logger.info("\n📊 步骤7: 新闻分类...")
-            categorized_news = self._classify_news(processed_news)
-
-            # 8. 限制每个类别的数量
-            for category in categorized_news:
-                categorized_news[category] = categorized_news[category][:MAX_NEWS_PER_CATEGORY]
+            categorized_news = checkpoint.run("classify", processed_news, lambda: self._classify_news(processed_news))
 
             total_count = sum(len(items) for items in categorized_news.values())
 
-            # 9. 生成HTML和Markdown
+            # 8. 生成HTML和Markdown
             self.logger.info("\n📝 步骤8: 生成日报...")
-            daily_summary = self._generate_daily_summary(categorized_news)
-            html_content = self.html_generator.generate(categorized_news, daily_summary)
+            rendered = checkpoint.run("render", categorized_news, lambda: self._render(categorized_news))
 
-            token_usage = get_client().get_total_tokens()
-            self.markdown_generator.generate(categorized_news, daily_summary, token_usage)
-
-            # 10. 发布到微信
+            # 9. 发布到微信
             if publish_to_wechat:
                 self.logger.info("\n📤 步骤9: 发布到微信公众号...")
-                self._publish_to_wechat(html_content)
+                published = self._publish_to_wechat(rendered["html"])
+            else:
+                published = MARK_PROCESSED_WITHOUT_PUBLISH
+            if published:
+                self.deduplicator.mark_processed(
+                    [item for items in categorized_news.values() for item in items]
+                )
+            else:
+                self.logger.info("日报未发布，不记录已收录 URL")
 
             # 统计
             end_time = datetime.now()
@@ -185,13 +228,80 @@ class DailyReportPipeline:
             self.logger.info(f"   - 总计: {total_count} 条")
             self.logger.info(f"   - 耗时: {duration:.1f} 秒")
             self.logger.info(f"   - Token消耗: {get_client().get_total_tokens()}")
+            if get_client().cache:
+                self.logger.info(f"   - {get_client().cache.summary()}")
+            self.logger.info(f"   - LLM用量: {get_client().usage.summary()}")
+            self.logger.info(f"   - 检查点: {checkpoint.run_dir}")
             self.logger.info("=" * 50)
 
+            success = True
             return True
 
         except Exception as e:
             self.logger.error(f"日报生成失败: {e}", exc_info=True)
             return False
+        finally:
+            self.checkpoint = None
+            if checkpoint is not None:
+                self._write_run_report(checkpoint, start_time, success)
+
+    def _write_run_report(self, checkpoint: RunCheckpoint, start_time: datetime, success: bool):
+        """运行报告：各阶段耗时、是否复用检查点，以及按阶段汇总的 LLM token / 耗时 / 重试与预算降级"""
+        client = get_client()
+        report = {
+            "date": checkpoint.run_dir.name,
+            "started": start_time.isoformat(),
+            "finished": datetime.now().isoformat(),
+            "duration_seconds": round((datetime.now() - start_time).total_seconds(), 3),
+            "success": success,
+            "stages": checkpoint.timings,
+            "llm": client.usage.report(),
+            "llm_cache": dict(client.cache.stats) if client.cache else None,
+        }
+        try:
+            path = checkpoint.write_report(report)
+            self.logger.info(f"运行报告: {path}")
+        except OSError as e:
+            self.logger.warning(f"写入运行报告失败: {e}")
+
+    def presummarize(self) -> bool:
+        """
+        增量预摘要（buzz 每小时采集后运行）：对共享数据评分、去重，
+        评分前 PRESUMMARY_TOP_N 条中尚未预处理的提取正文、生成摘要、翻译标题，按条目 ID 缓存
+        """
+        start_time = datetime.now()
+        try:
+            raw_news = self.shared_loader.load()
+            if not raw_news:
+                self.logger.info("预摘要: 共享数据为空，跳过")
+                return True
+
+            filtered_news = self._filter_stage(raw_news)
+            # 已被日报发布过的不会再入选，不用预处理
+            candidates = self.deduplicator.deduplicate(filtered_news)
+            candidates.sort(key=lambda x: x.relevance_score, reverse=True)
+            candidates = candidates[:PRESUMMARY_TOP_N]
+
+            todo = self.presummary_cache.missing(candidates)
+            self.logger.info(f"预摘要: 候选 {len(candidates)} 条，待处理 {len(todo)} 条")
+            if not todo:
+                return True
+
+            self.content_extractor.extract_batch([item.raw_item for item in todo])
+            todo = self._summarize(todo)
+            todo = self._translate_titles(todo)
+            self.presummary_cache.put(todo)
+            if CLASSIFY_USE_AI:
+                # 顺带写入分类缓存，日报运行时这些条目不用再请求
+                self.classifier.classify_batch(todo, use_ai=True)
+
+            duration = (datetime.now() - start_time).total_seconds()
+            self.logger.info(f"预摘要完成: {len(todo)} 条，缓存共 {len(self.presummary_cache)} 条，"
+                             f"耗时 {duration:.1f} 秒，Token消耗 {get_client().get_total_tokens()}")
+            return True
+        except Exception as e:
+            self.logger.error(f"预摘要失败: {e}", exc_info=True)
+            return False
 
     def _collect_news(self) -> List[RawNewsItem]:
         """采集新闻 — 优先从 ai-hourly-buzz 共享数据读取"""
@@ -208,13 +318,14 @@ class DailyReportPipeline:
         if len(all_news) < 10:
             self.logger.info("共享数据不足，启动独立采集...")
 
-            self.logger.info("从RSS源采集...")
-            rss_news = self.rss_parser.parse_all()
+            self.logger.info("从RSS源和网页并发采集...")
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                rss_future = executor.submit(self.rss_parser.parse_all)
+                web_future = executor.submit(self.web_scraper.scrape_all)
+                rss_news = rss_future.result()
+                web_news = web_future.result()
             all_news.extend(rss_news)
             self.logger.info(f"RSS源获取: {len(rss_news)} 条")
-
-            self.logger.info("从网页采集...")
-            web_news = self.web_scraper.scrape_all()
             all_news.extend(web_news)
             self.logger.info(f"网页爬取: {len(web_news)} 条")
 
@@ -244,15 +355,48 @@ class DailyReportPipeline:
         self.logger.info(f"时间过滤: {len(news_list)} -> {len(filtered)} 条 (无时间戳: {no_time_count})")
         return filtered
 
+    def _filter_stage(self, raw_news: List[RawNewsItem]) -> List[ScoredNewsItem]:
+        """时间过滤 + 关键词筛选"""
+        recent_news = self._filter_by_time(raw_news)
+        if not recent_news:
+            self.logger.warning("未找到过去24小时的新闻，使用所有新闻")
+            recent_news = raw_news[:50]
+        return self._filter_news(recent_news)
+
+    def _dedupe_stage(self, news_list: List[ScoredNewsItem]) -> List[ScoredNewsItem]:
+        """去重后按评分排序，取Top N"""
+        unique_news = self._deduplicate(news_list)
+        unique_news.sort(key=lambda x: x.relevance_score, reverse=True)
+        MAX_TOTAL = 50  # 最多处理50条高质量新闻
+        if len(unique_news) > MAX_TOTAL:
+            self.logger.info(f"按评分取前 {MAX_TOTAL} 条 (共 {len(unique_news)} 条)")
+            unique_news = unique_news[:MAX_TOTAL]
+
+        # 打印Top10标题和评分供调试
+        self.logger.info("Top-10 新闻:")
+        for i, item in enumerate(unique_news[:10]):
+            title = item.raw_item.title[:60]
+            self.logger.info(f"  {i+1}. [{item.relevance_score:.1f}分] {title}")
+        return unique_news
+
     def _filter_news(self, news_list: List[RawNewsItem]) -> List[ScoredNewsItem]:
         """关键词筛选"""
         return self.keyword_filter.filter_news(news_list)
 
     def _deduplicate(self, news_list: List[ScoredNewsItem]) -> List[ScoredNewsItem]:
-        return self.deduplicator.deduplicate(news_list)
-
-    def _extract_content(self, news_list: List[ScoredNewsItem]):
-        """提取正文"""
+        # 同一天重跑时不跳过本日已记录的 URL
+        today_start = self.time_handler.get_now().replace(hour=0, minute=0, second=0, microsecond=0)
+        return self.deduplicator.deduplicate(news_list, processed_before=today_start)
+
+    def _apply_presummary(self, news_list: List[ScoredNewsItem]):
+        """用每小时预处理好的正文、摘要、中文标题补齐条目，后续阶段只处理未命中的"""
+        hits = self.presummary_cache.apply(news_list)
+        if hits:
+            self.logger.info(f"复用预摘要: {hits}/{len(news_list)} 条")
+
+    def _extract_content(self, news_list: List[ScoredNewsItem]) -> List[ScoredNewsItem]:
+        """提取正文（原地补全 raw_item.content）"""
+        self._apply_presummary(news_list)
         items_to_extract = []
         for item in news_list:
             if not item.raw_item.content or len(item.raw_item.content) < 100:
@@ -261,11 +405,19 @@ class DailyReportPipeline:
         if items_to_extract:
             self.logger.info(f"需要提取正文: {len(items_to_extract)} 条")
             self.content_extractor.extract_batch(items_to_extract)
+        return news_list
 
-    def _ai_process(self, news_list: List[ScoredNewsItem]) -> List[ScoredNewsItem]:
-        """AI处理：生成摘要和翻译标题"""
-        from ai_service.summarizer import Summarizer
-        news_list = self.summarizer.summarize_batch(news_list)
+    def _degrade(self, reason: str):
+        """阶段输出含调用失败后的兜底结果，本阶段不写检查点（resume 时重新执行）"""
+        if self.checkpoint is not None:
+            self.checkpoint.degrade(reason)
+
+    def _summarize(self, news_list: List[ScoredNewsItem]) -> List[ScoredNewsItem]:
+        """AI生成摘要"""
+        failed = []
+        news_list = self.summarizer.summarize_batch(news_list, fallback=failed)
+        if failed:
+            self._degrade(f"{len(failed)} 条摘要调用失败，使用原摘要兜底或被过滤")
 
         # 过滤掉无效摘要的新闻（模型声称"内容为空/缺失"等）
         before_count = len(news_list)
@@ -273,19 +425,33 @@ class DailyReportPipeline:
         filtered = before_count - len(news_list)
         if filtered:
             self.logger.info(f"过滤掉 {filtered} 条无效摘要的新闻，剩余 {len(news_list)} 条")
+        return news_list
 
+    def _translate_titles(self, news_list: List[ScoredNewsItem]) -> List[ScoredNewsItem]:
+        """翻译标题"""
         # 收集所有需要翻译的英文标题（基于实际内容检测，而非 language 字段）
+        # buzz 已翻译过的（条目自带或标题缓存）直接复用，只翻译真正未命中的
         en_indices = []
         en_titles = []
+        reused = 0
         for i, item in enumerate(news_list):
+            if item.title_cn:  # 预摘要时已翻译
+                continue
             title = item.raw_item.title
             cn_ratio = sum(1 for c in title if '\u4e00' <= c <= '\u9fff') / max(len(title), 1)
             if cn_ratio < 0.3:  # 中文字符不足30%，视为英文标题需翻译
-                en_indices.append(i)
-                en_titles.append(title)
+                upstream = item.raw_item.title_zh or self.shared_loader.lookup_title_zh(title)
+                if upstream:
+                    item.title_cn = upstream[:80]
+                    reused += 1
+                else:
+                    en_indices.append(i)
+                    en_titles.append(title)
             else:
                 # 中文标题直接设置
                 item.title_cn = title
+        if reused:
+            self.logger.info(f"复用上游中文标题: {reused} 个")
 
         if en_titles:
             self.logger.info(f"批量翻译 {len(en_titles)} 个英文标题...")
@@ -297,29 +463,86 @@ class DailyReportPipeline:
 
         # 兜底：对仍无中文标题的英文新闻逐条翻译
         untranslated = 0
+        failed = 0
         for item in news_list:
             if not item.title_cn:
                 title = item.raw_item.title
                 cn_ratio = sum(1 for c in title if '\u4e00' <= c <= '\u9fff') / max(len(title), 1)
-                if cn_ratio < 0.3:
+                # 逐条兜底预算用尽时保留原标题
+                if cn_ratio < 0.3 and not get_client().usage.over_budget("translate_fallback"):
                     translated = self.translator.translate_title(title)
                     if translated:
                         item.title_cn = translated
                         untranslated += 1
                     else:
                         item.title_cn = title
+                        failed += 1
                 else:
                     item.title_cn = title
         if untranslated:
             self.logger.info(f"逐条翻译兜底: {untranslated} 个标题")
+        if failed:
+            self._degrade(f"{failed} 个标题翻译失败，保留原标题")
 
         return news_list
 
-    def _classify_news(self, news_list: List[ScoredNewsItem]) -> dict:
-        return self.classifier.classify_batch(news_list, use_ai=False)
+    def _stream_process(self, news_list: List[ScoredNewsItem]) -> List[ScoredNewsItem]:
+        """
+        流式处理：提取 → 摘要 → 翻译 之间用有界队列衔接，每条提取完就进入摘要批次，
+        摘要完成的批次随即翻译标题；最终仍按原有顺序（相关度从高到低）输出
+        """
+        self._apply_presummary(news_list)
+        limiter = self.content_extractor.new_limiter()
+
+        def extract(batch):
+            for item in batch:
+                self.content_extractor.extract_item(item.raw_item, limiter)
+            return batch
+
+        stages = [
+            Stage("extract", extract, workers=EXTRACT_MAX_WORKERS),
+            Stage("summarize", self._summarize, workers=LLM_MAX_CONCURRENCY,
+                  batch_size=SUMMARY_BATCH_MAX_ITEMS, linger=STREAM_BATCH_LINGER),
+            Stage("translate", self._translate_titles, workers=STREAM_TRANSLATE_WORKERS,
+                  batch_size=STREAM_TRANSLATE_BATCH, linger=STREAM_BATCH_LINGER),
+        ]
+        order = {id(item): i for i, item in enumerate(news_list)}
+
+        def on_error(stage: str, batch: list, error: Exception):
+            # 出错的批次未经处理就交给了下游，整段输出不能当作检查点
+            self._degrade(f"流式阶段 {stage} 处理失败，{len(batch)} 条未处理: {error}")
+
+        try:
+            results = run_stream(news_list, stages, queue_size=STREAM_QUEUE_SIZE, on_error=on_error)
+        finally:
+            self.content_extractor.save_cache()
+        results.sort(key=lambda item: order[id(item)])
+        return results
 
-    def _generate_daily_summary(self, categorized_news: dict) -> str:
-        """使用AI生成每日导语"""
+    def _classify_news(self, news_list: List[ScoredNewsItem]) -> dict:
+        failed = []
+        categorized_news = self.classifier.classify_batch(news_list, use_ai=CLASSIFY_USE_AI, fallback=failed)
+        if failed:
+            self._degrade(f"{len(failed)} 条 AI 分类失败，使用规则分类")
+        for category in categorized_news:
+            categorized_news[category] = categorized_news[category][:MAX_NEWS_PER_CATEGORY]
+        return categorized_news
+
+    def _render(self, categorized_news: dict) -> dict:
+        """生成导语、HTML 与 Markdown，返回导语和 HTML（发布时使用）"""
+        daily_summary = self._generate_daily_summary(categorized_news)
+        lede_fallback = daily_summary is None
+        if lede_fallback:
+            total_count = sum(len(items) for items in categorized_news.values())
+            daily_summary = f"今日AI领域共有{total_count}条动态值得关注。"
+            self._degrade("导语生成失败，使用模板导语")
+        html_content = self.html_generator.generate(categorized_news, daily_summary)
+        token_usage = get_client().get_total_tokens()
+        self.markdown_generator.generate(categorized_news, daily_summary, token_usage)
+        return {"daily_summary": daily_summary, "html": html_content, "lede_fallback": lede_fallback}
+
+    def _generate_daily_summary(self, categorized_news: dict) -> Optional[str]:
+        """使用AI生成每日导语；调用失败或预算用尽时返回 None，由调用方换成模板导语"""
         titles = []
         for category, items in categorized_news.items():
             for item in items[:2]:
@@ -341,20 +564,20 @@ class DailyReportPipeline:
 3. 语言流畅，适合作为日报开头
 4. 直接输出导语内容，不要加任何前缀"""
 
+        client = get_client()
         try:
-            client = get_client()
-            response = client.chat([
-                {"role": "system", "content": "你是一位专业的科技新闻编辑。"},
-                {"role": "user", "content": prompt}
-            ], temperature=0.5, max_tokens=200)
-
-            if response:
-                return response.strip().strip('"\'')
+            # 导语预算用尽时直接用模板
+            if not client.usage.over_budget("lede"):
+                response = client.chat([
+                    {"role": "system", "content": "你是一位专业的科技新闻编辑。"},
+                    {"role": "user", "content": prompt}
+                ], temperature=0.5, max_tokens=200, stage="lede")
+
+                if response:
+                    return response.strip().strip('"\'')
         except Exception as e:
             self.logger.warning(f"生成导语失败: {e}")
-
-        total_count = sum(len(items) for items in categorized_news.values())
-        return f"今日AI领域共有{total_count}条动态值得关注。"
+        return None
 
     def _publish_to_wechat(self, html_content: str) -> bool:
         return self.wechat_publisher.publish_daily_report(html_content)
@@ -369,8 +592,31 @@ def main():
         publish_to_wechat = False
         logging.info("仅生成本地文件，不发布到微信")
 
+    if "--no-llm-cache" in sys.argv:
+        get_client().disable_cache()
+
+    # --resume 复用当日有效的阶段检查点；--from-stage <阶段> 从指定阶段起重跑
+    resume = "--resume" in sys.argv
+    from_stage = None
+    if "--from-stage" in sys.argv:
+        idx = sys.argv.index("--from-stage")
+        from_stage = sys.argv[idx + 1] if idx + 1 < len(sys.argv) else ""
+        if from_stage not in STAGES:
+            logging.error(f"--from-stage 需要指定阶段: {', '.join(STAGES)}")
+            sys.exit(2)
+
+    # --presummarize 只做增量预摘要（每小时 buzz 采集后运行）
+    if "--presummarize" in sys.argv:
+        success = DailyReportPipeline().presummarize()
+        sys.exit(0 if success else 1)
+
+    # --stream 提取、摘要、翻译流式重叠执行
+    streaming = STREAMING_PIPELINE or "--stream" in sys.argv
+
     pipeline = DailyReportPipeline()
-    success = pipeline.run(publish_to_wechat=publish_to_wechat)
+    success = pipeline.run(
+        publish_to_wechat=publish_to_wechat, resume=resume, from_stage=from_stage, streaming=streaming,
+    )
 
     sys.exit(0 if success else 1)
 
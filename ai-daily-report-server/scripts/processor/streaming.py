@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+流式处理
+多个阶段之间用有界队列衔接，每个阶段有自己的工作线程池；
+条目处理完一个阶段立即进入下一阶段，网络抓取与 LLM 调用相互重叠，
+总耗时趋近最慢的单个阶段而非各阶段之和
+"""
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()  # 上游结束标记
+
+
+@dataclass
+class Stage:
+    """一个流水线阶段：func 接收一批条目，返回要交给下一阶段的条目（可以丢弃部分）"""
+    name: str
+    func: Callable[[list], list]
+    workers: int = 1
+    batch_size: int = 1
+    linger: float = 0.0  # 攒批时最多等待的秒数，0 表示有多少取多少
+
+
+def _take(inq: queue.Queue, batch_size: int, linger: float) -> Tuple[list, bool]:
+    """取一批条目：阻塞等待第一条，之后在 linger 内尽量凑满；返回 (批次, 上游是否已结束)"""
+    first = inq.get()
+    if first is _DONE:
+        return [], True
+    batch = [first]
+    deadline = time.monotonic() + linger
+    while len(batch) < batch_size:
+        try:
+            remaining = deadline - time.monotonic()
+            item = inq.get(timeout=remaining) if remaining > 0 else inq.get_nowait()
+        except queue.Empty:
+            break
+        if item is _DONE:
+            return batch, True
+        batch.append(item)
+    return batch, False
+
+
+def run_stream(items: list, stages: List[Stage], queue_size: int = 16,
+               on_error: Optional[Callable[[str, list, Exception], None]] = None) -> list:
+    """
+    让 items 依次流过各阶段，返回最后一个阶段输出的条目（按完成先后，调用方自行排序）
+    某一批处理出错时记录日志并原样交给下一阶段，不会卡住整条流水线；
+    on_error(阶段名, 批次, 异常) 在工作线程中调用，供调用方把输出标记为兜底结果
+    """
+    if not items:
+        return []
+    queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+    queues.append(queue.Queue())  # 末端不限长，由调用线程收集
+    lock = threading.Lock()
+    alive = [stage.workers for stage in stages]
+    busy = [0.0 for _ in stages]
+
+    def worker(index: int, stage: Stage):
+        inq, outq = queues[index], queues[index + 1]
+        while True:
+            batch, done = _take(inq, stage.batch_size, stage.linger)
+            if batch:
+                started = time.monotonic()
+                try:
+                    output = stage.func(batch)
+                except Exception as e:
+                    logger.warning(f"流式阶段 {stage.name} 处理失败，原样传递 {len(batch)} 条: {e}")
+                    output = batch
+                    if on_error is not None:
+                        on_error(stage.name, batch, e)
+                with lock:
+                    busy[index] += time.monotonic() - started
+                for item in output:
+                    outq.put(item)
+            if done:
+                # 结束标记放回去，让同阶段的其他线程也能退出
+                inq.put(_DONE)
+                break
+        with lock:
+            alive[index] -= 1
+            last = alive[index] == 0
+        if last:
+            outq.put(_DONE)
+
+    def feed():
+        for item in items:
+            queues[0].put(item)
+        queues[0].put(_DONE)
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=feed, name="stream-feed", daemon=True)]
+    for index, stage in enumerate(stages):
+        for n in range(stage.workers):
+            threads.append(threading.Thread(
+                target=worker, args=(index, stage), name=f"stream-{stage.name}-{n}", daemon=True,
+            ))
+    for thread in threads:
+        thread.start()
+
+    results = []
+    while True:
+        item = queues[-1].get()
+        if item is _DONE:
+            break
+        results.append(item)
+    for thread in threads:
+        thread.join()
+
+    elapsed = time.monotonic() - started
+    timing = "，".join(f"{stage.name} {busy[i]:.1f}s" for i, stage in enumerate(stages))
+    logger.info(f"流式处理完成: {len(items)} -> {len(results)} 条，总耗时 {elapsed:.1f}s（各阶段累计: {timing}）")
+    return results
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+已处理 URL 缓存
+SQLite 存储 URL 与首次记录时间，主键即索引，成员查询不需要整表载入；
+超过保留天数的记录在打开时清理
+"""
+
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional, Set
+
+from processor.sqlite_store import SqliteStore
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessedUrlCache:
+    """已发布新闻 URL 的持久化集合"""
+
+    def __init__(self, db_path: Path, retention_days: int = 7):
+        self.db_path = Path(db_path)
+        self.retention_days = retention_days
+        # 数据库文件随 data/ 提交进仓库（Actions 变体），不开 WAL，避免多出 -wal / -shm 文件
+        self._store = SqliteStore(
+            self.db_path, "processed_urls", "url TEXT PRIMARY KEY, first_seen REAL NOT NULL",
+            key="url", time_column="first_seen", max_age=retention_days * 86400, wal=False,
+        )
+        evicted = self.evict()
+        logger.info(f"已处理URL缓存: {len(self)} 条（清理过期 {evicted} 条）")
+
+    def evict(self) -> int:
+        """删除超过保留天数的记录"""
+        return self._store.evict()
+
+    def seen(self, urls: Iterable[str], before: Optional[datetime] = None) -> Set[str]:
+        """返回已记录的 URL；指定 before 时只算在该时间之前记录的（同一天重跑不受影响）"""
+        cutoff = before.timestamp() if before else float("inf")
+        rows = self._store.select_many(urls, "url", "first_seen < ?", (cutoff,), fresh=False)
+        return {row[0] for row in rows}
+
+    def add(self, urls: Iterable[str]):
+        """记录 URL；已存在的保留首次记录时间"""
+        now = time.time()
+        self._store.write_many(
+            ("url", "first_seen"), ((url, now) for url in dict.fromkeys(urls) if url), replace=False
+        )
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def close(self):
+        self._store.close()
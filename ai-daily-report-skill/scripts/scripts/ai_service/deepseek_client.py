@@ -1,54 +1,276 @@
 # -*- coding: utf-8 -*-
-"""DeepSeek API客户端"""
+"""
+DeepSeek API客户端
+AsyncDeepSeekClient 基于 AsyncOpenAI，所有调用共用一个连接池，抖动退避重试，可取消，支持流式；
+同时在途的请求数由客户端内的信号量统一限制为 LLM_MAX_CONCURRENCY，各阶段的线程池叠加也不会超出；
+每次调用按 stage 打标签记入 UsageTracker（token、耗时、重试），用于运行报告与分阶段预算；
+DeepSeekClient 是同步包装，把协程提交到后台事件循环执行，原有调用方式不变
+"""
 
+import asyncio
 import logging
+import random
+import threading
 import time
-from typing import Optional
-from openai import OpenAI
+from typing import Callable, Optional, Tuple
+from openai import AsyncOpenAI
 
+from ai_service.llm_cache import LLMCache, cache_key
+from ai_service.rate_limiter import RateLimiter, estimate_messages_tokens
+from ai_service.usage import CallRecord, UsageTracker
 from config.settings import (
     DEEPSEEK_API_KEY, DEEPSEEK_BASE_URL, DEEPSEEK_MODEL,
-    API_MAX_RETRIES, API_RETRY_DELAY, API_TIMEOUT
+    API_MAX_RETRIES, API_RETRY_DELAY, API_TIMEOUT,
+    LLM_MAX_CONCURRENCY, LLM_RPM_LIMIT, LLM_TPM_LIMIT,
+    LLM_CACHE_ENABLED, LLM_CACHE_FILE, LLM_CACHE_TTL_HOURS,
+    LLM_STAGE_BUDGETS,
 )
 
 logger = logging.getLogger(__name__)
 
 
-class DeepSeekClient:
-    """DeepSeek API客户端"""
+def _backoff(attempt: int) -> float:
+    """指数退避加随机抖动，避免并发请求同时重试"""
+    return API_RETRY_DELAY * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+
+class AsyncDeepSeekClient:
+    """
+    异步 DeepSeek 客户端（限流器、缓存、token 计数线程安全）
+    内部的 AsyncOpenAI 连接池绑定在首次使用它的事件循环上，
+    异步调用方应通过 run_sync() 在同一个后台循环上运行
+    """
 
     def __init__(self):
-        self.client = OpenAI(api_key=DEEPSEEK_API_KEY, base_url=DEEPSEEK_BASE_URL)
+        # 重试由本类负责（带抖动），关闭 SDK 自带的重试
+        self.client = AsyncOpenAI(
+            api_key=DEEPSEEK_API_KEY, base_url=DEEPSEEK_BASE_URL,
+            timeout=API_TIMEOUT, max_retries=0,
+        )
         self.model = DEEPSEEK_MODEL
         self.total_tokens = 0
+        self.limiter = RateLimiter(rpm=LLM_RPM_LIMIT, tpm=LLM_TPM_LIMIT)
+        # 所有调用都在 run_sync 的同一个后台循环上执行，信号量首次使用时绑定该循环
+        self._inflight = asyncio.Semaphore(max(1, LLM_MAX_CONCURRENCY))
+        self.usage = UsageTracker(LLM_STAGE_BUDGETS)
+        self._lock = threading.Lock()
+        self.cache: Optional[LLMCache] = None
+        if LLM_CACHE_ENABLED:
+            try:
+                self.cache = LLMCache(LLM_CACHE_FILE, LLM_CACHE_TTL_HOURS)
+            except Exception as e:
+                logger.warning(f"LLM缓存不可用，直接调用API: {e}")
+
+    def disable_cache(self):
+        """--no-llm-cache：本次运行不读也不写缓存"""
+        if self.cache:
+            self.cache.close()
+            self.cache = None
+        logger.info("已禁用LLM响应缓存")
+
+    def get_total_tokens(self) -> int:
+        with self._lock:
+            return self.total_tokens
+
+    def _lookup(self, messages: list, temperature: float, max_tokens: int) -> Tuple[Optional[str], Optional[str]]:
+        """返回 (缓存键, 命中的原始响应)"""
+        if not self.cache:
+            return None, None
+        key = cache_key(self.model, messages, temperature, max_tokens)
+        return key, self.cache.get(key)
 
-    def chat(self, messages: list, temperature: float = 0.3, max_tokens: int = 2000) -> Optional[str]:
+    def _record(self, reservation: list, tokens: int, key: Optional[str], content: Optional[str]):
+        """修正限流登记、累计 token、写缓存"""
+        if tokens:
+            self.limiter.adjust(reservation, tokens)
+            with self._lock:
+                self.total_tokens += tokens
+        if key and content and self.cache:
+            self.cache.put(key, self.model, content, tokens)
+
+    async def _acquire(self, estimated: int) -> list:
+        # 在事件循环上轮询等待，不占线程；协程被取消时不会留下限流登记
+        while True:
+            reservation, wait = self.limiter.try_acquire(estimated)
+            if reservation is not None:
+                return reservation
+            # 其他请求按实际用量修正后可能提前放行，等待时间封顶
+            await asyncio.sleep(min(wait, 0.5))
+
+    async def chat(self, messages: list, temperature: float = 0.3, max_tokens: int = 2000,
+                   stage: str = "other", items: int = 1) -> Optional[str]:
+        started = time.monotonic()
+        key, cached = self._lookup(messages, temperature, max_tokens)
+        if cached is not None:
+            self.usage.record(CallRecord(stage, items, 0, 0, time.monotonic() - started, 0, cached=True))
+            return cached
+
+        # TPM 按输入 + 输出上限预估，返回后按实际用量修正
+        estimated = estimate_messages_tokens(messages) + max_tokens
         for attempt in range(API_MAX_RETRIES):
             try:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    timeout=API_TIMEOUT,
-                )
-                if response.usage:
-                    self.total_tokens += response.usage.total_tokens
-                return response.choices[0].message.content
+                # 退避等待时不占并发名额
+                async with self._inflight:
+                    reservation = await self._acquire(estimated)
+                    response = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                    )
+                content = response.choices[0].message.content
+                usage = response.usage
+                self._record(reservation, usage.total_tokens if usage else 0, key, content)
+                self.usage.record(CallRecord(
+                    stage, items, usage.prompt_tokens if usage else 0, usage.completion_tokens if usage else 0,
+                    time.monotonic() - started, attempt,
+                ))
+                return content
             except Exception as e:
                 logger.warning(f"API调用失败 ({attempt+1}/{API_MAX_RETRIES}): {e}")
                 if attempt < API_MAX_RETRIES - 1:
-                    time.sleep(API_RETRY_DELAY * (attempt + 1))
+                    await asyncio.sleep(_backoff(attempt))
+        self.usage.record(CallRecord(stage, items, 0, 0, time.monotonic() - started, API_MAX_RETRIES - 1, ok=False))
         return None
 
+    async def chat_stream(self, messages: list, temperature: float = 0.3, max_tokens: int = 2000,
+                          on_text: Optional[Callable[[str], None]] = None,
+                          stage: str = "other", items: int = 1) -> Optional[str]:
+        """
+        流式调用：每收到一段文本回调 on_text，返回完整文本，首字节耗时写日志
+        已经输出过内容后中断不再重试（调用方已消费了前半段），返回 None
+        """
+        call_started = time.monotonic()
+        key, cached = self._lookup(messages, temperature, max_tokens)
+        if cached is not None:
+            if on_text:
+                on_text(cached)
+            self.usage.record(CallRecord(stage, items, 0, 0, time.monotonic() - call_started, 0, cached=True))
+            return cached
+
+        estimated = estimate_messages_tokens(messages) + max_tokens
+        for attempt in range(API_MAX_RETRIES):
+            ttfb = None
+            parts = []
+            tokens = 0
+            prompt_tokens = completion_tokens = 0
+            try:
+                async with self._inflight:
+                    reservation = await self._acquire(estimated)
+                    started = time.monotonic()
+                    stream = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        stream=True,
+                        extra_body={"stream_options": {"include_usage": True}},
+                    )
+                    async for chunk in stream:
+                        if chunk.usage:
+                            tokens = chunk.usage.total_tokens
+                            prompt_tokens = chunk.usage.prompt_tokens
+                            completion_tokens = chunk.usage.completion_tokens
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if not delta:
+                            continue
+                        if ttfb is None:
+                            ttfb = time.monotonic() - started
+                            logger.info(f"流式响应首字节: {ttfb:.2f}s")
+                        parts.append(delta)
+                        if on_text:
+                            on_text(delta)
+                content = "".join(parts)
+                logger.info(f"流式响应完成: {len(content)} 字符，用时 {time.monotonic() - started:.1f}s")
+                self._record(reservation, tokens, key, content)
+                self.usage.record(CallRecord(
+                    stage, items, prompt_tokens, completion_tokens, time.monotonic() - call_started, attempt,
+                ))
+                return content
+            except Exception as e:
+                logger.warning(f"流式API调用失败 ({attempt+1}/{API_MAX_RETRIES}): {e}")
+                if parts:
+                    break
+                if attempt < API_MAX_RETRIES - 1:
+                    await asyncio.sleep(_backoff(attempt))
+        self.usage.record(CallRecord(stage, items, 0, 0, time.monotonic() - call_started, attempt, ok=False))
+        return None
+
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def run_sync(coro):
+    """在后台事件循环上执行协程并等待结果；调用线程被中断时取消该协程"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="deepseek-loop", daemon=True).start()
+    future = asyncio.run_coroutine_threadsafe(coro, _loop)
+    try:
+        return future.result()
+    except BaseException:
+        future.cancel()
+        raise
+
+
+class DeepSeekClient:
+    """DeepSeek API客户端（同步接口，线程安全；多个线程共用同一个异步客户端和连接池）"""
+
+    def __init__(self, async_client: Optional[AsyncDeepSeekClient] = None):
+        self.aclient = async_client or AsyncDeepSeekClient()
+
+    @property
+    def model(self) -> str:
+        return self.aclient.model
+
+    @property
+    def cache(self) -> Optional[LLMCache]:
+        return self.aclient.cache
+
+    @property
+    def limiter(self) -> RateLimiter:
+        return self.aclient.limiter
+
+    @property
+    def usage(self) -> UsageTracker:
+        return self.aclient.usage
+
+    def disable_cache(self):
+        self.aclient.disable_cache()
+
+    def chat(self, messages: list, temperature: float = 0.3, max_tokens: int = 2000,
+             stage: str = "other", items: int = 1) -> Optional[str]:
+        return run_sync(self.aclient.chat(messages, temperature, max_tokens, stage, items))
+
+    def chat_stream(self, messages: list, temperature: float = 0.3, max_tokens: int = 2000,
+                    on_text: Optional[Callable[[str], None]] = None,
+                    stage: str = "other", items: int = 1) -> Optional[str]:
+        return run_sync(self.aclient.chat_stream(messages, temperature, max_tokens, on_text, stage, items))
+
     def get_total_tokens(self) -> int:
-        return self.total_tokens
+        return self.aclient.get_total_tokens()
 
 
+_async_client = None
 _client = None
+_client_lock = threading.Lock()
+
+def get_async_client() -> AsyncDeepSeekClient:
+    global _async_client
+    with _client_lock:
+        if _async_client is None:
+            _async_client = AsyncDeepSeekClient()
+    return _async_client
 
 def get_client() -> DeepSeekClient:
     global _client
-    if _client is None:
-        _client = DeepSeekClient()
+    async_client = get_async_client()
+    with _client_lock:
+        if _client is None:
+            _client = DeepSeekClient(async_client)
     return _client
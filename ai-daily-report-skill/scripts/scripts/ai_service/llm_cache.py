@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+LLM 响应缓存
+按 (模型, messages, temperature, max_tokens) 的哈希缓存原始响应，SQLite 存放在共享数据目录，
+ai-daily-report 与 ai-deep-column 共用同一文件，相同调用直接从本地返回
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from processor.sqlite_store import SqliteStore
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(model: str, messages: list, temperature: float, max_tokens: int) -> str:
+    payload = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens},
+        ensure_ascii=False, sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """响应缓存（线程安全，多进程共用同一数据库文件）"""
+
+    def __init__(self, db_path: Path, ttl_hours: float = 72):
+        self.db_path = Path(db_path)
+        self.stats = {"hit": 0, "miss": 0, "tokens_saved": 0}
+        self._lock = threading.Lock()  # 保护 stats
+        # 表结构与 ai-deep-column 的 llm_cache.py 一致，两边共用同一文件
+        self._store = SqliteStore(
+            self.db_path, "llm_cache",
+            "key TEXT PRIMARY KEY, model TEXT NOT NULL, response TEXT NOT NULL,"
+            " tokens INTEGER NOT NULL, created REAL NOT NULL",
+            key="key", max_age=ttl_hours * 3600,
+        )
+        evicted = self.evict()
+        if evicted:
+            logger.info(f"LLM缓存: 清理过期 {evicted} 条")
+
+    def evict(self) -> int:
+        """删除超过有效期的响应"""
+        return self._store.evict()
+
+    def get(self, key: str) -> Optional[str]:
+        rows = self._store.select_many([key], "response, tokens")
+        with self._lock:
+            if not rows:
+                self.stats["miss"] += 1
+                return None
+            self.stats["hit"] += 1
+            self.stats["tokens_saved"] += rows[0][1]
+            return rows[0][0]
+
+    def put(self, key: str, model: str, response: str, tokens: int = 0):
+        if not response:
+            return
+        self._store.write_many(
+            ("key", "model", "response", "tokens", "created"), [(key, model, response, tokens, time.time())]
+        )
+
+    def summary(self) -> str:
+        return (f"LLM缓存: 命中 {self.stats['hit']}，未命中 {self.stats['miss']}，"
+                f"节省tokens {self.stats['tokens_saved']}")
+
+    def close(self):
+        self._store.close()
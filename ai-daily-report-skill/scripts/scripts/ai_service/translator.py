@@ -5,9 +5,11 @@
 """
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 from ai_service.deepseek_client import get_client
+from config.settings import LLM_MAX_CONCURRENCY
 
 logger = logging.getLogger(__name__)
 
@@ -49,7 +51,7 @@ class Translator:
             {"role": "user", "content": prompt}
         ]
 
-        response = self.client.chat(messages, temperature=0.2, max_tokens=500)
+        response = self.client.chat(messages, temperature=0.2, max_tokens=500, stage="translate")
 
         if response:
             return response.strip().strip('"\'')
@@ -84,20 +86,39 @@ class Translator:
         MAX_TITLES_PER_BATCH = 5
         results = {}
 
-        for start in range(0, len(to_translate), MAX_TITLES_PER_BATCH):
-            batch = to_translate[start:start + MAX_TITLES_PER_BATCH]
-            batch_indices = indices[start:start + MAX_TITLES_PER_BATCH]
+        batches = [
+            (to_translate[start:start + MAX_TITLES_PER_BATCH], indices[start:start + MAX_TITLES_PER_BATCH])
+            for start in range(0, len(to_translate), MAX_TITLES_PER_BATCH)
+        ]
+        # 批次间并发（客户端限流），结果按下标回填
+        with ThreadPoolExecutor(max_workers=min(LLM_MAX_CONCURRENCY, len(batches))) as pool:
+            for batch_result in pool.map(lambda args: self._translate_batch(*args), batches):
+                results.update(batch_result)
 
-            news_texts = []
-            for i, title in enumerate(batch):
-                if not title:
-                    continue
-                news_texts.append(f"{i+1}. {title}")
+        final_results = []
+        for i, title in enumerate(titles):
+            if i in results:
+                final_results.append(results[i])
+            else:
+                final_results.append(title)
+
+        return final_results
 
-            if not news_texts:
+    def _translate_batch(self, batch: list, batch_indices: list) -> dict:
+        """一次 DeepSeek 调用翻译一批标题，返回 {原下标: 译文}；翻译预算用尽时保留原标题"""
+        if self.client.usage.over_budget("translate"):
+            return {}
+        results = {}
+        news_texts = []
+        for i, title in enumerate(batch):
+            if not title:
                 continue
+            news_texts.append(f"{i+1}. {title}")
 
-            prompt = f"""请将以下{len(news_texts)}条英文新闻标题翻译成中文：
+        if not news_texts:
+            return results
+
+        prompt = f"""请将以下{len(news_texts)}条英文新闻标题翻译成中文：
 
 {chr(10).join(news_texts)}
 
@@ -106,35 +127,29 @@ class Translator:
 2. 只输出翻译后的标题，不要序号
 3. 每行一个标题"""
 
-            messages = [
-                {
-                    "role": "system",
-                    "content": "你是一位专业的新闻编辑，擅长翻译新闻标题。只输出翻译结果，不要序号，每行一个标题。"
-                },
-                {"role": "user", "content": prompt}
-            ]
-
-            response = self.client.chat(messages, temperature=0.2, max_tokens=400)
-
-            if response:
-                translated_lines = [line.strip() for line in response.strip().split('\n') if line.strip()]
-                trans_idx = 0
-                for i, title in enumerate(batch):
-                    if title:
-                        if trans_idx < len(translated_lines):
-                            results[batch_indices[i]] = translated_lines[trans_idx][:80]
-                        else:
-                            results[batch_indices[i]] = title[:80]
-                        trans_idx += 1
+        messages = [
+            {
+                "role": "system",
+                "content": "你是一位专业的新闻编辑，擅长翻译新闻标题。只输出翻译结果，不要序号，每行一个标题。"
+            },
+            {"role": "user", "content": prompt}
+        ]
+
+        response = self.client.chat(messages, temperature=0.2, max_tokens=400,
+                                    stage="translate", items=len(news_texts))
 
-        final_results = []
-        for i, title in enumerate(titles):
-            if i in results:
-                final_results.append(results[i])
-            else:
-                final_results.append(title)
+        if response:
+            translated_lines = [line.strip() for line in response.strip().split('\n') if line.strip()]
+            trans_idx = 0
+            for i, title in enumerate(batch):
+                if title:
+                    if trans_idx < len(translated_lines):
+                        results[batch_indices[i]] = translated_lines[trans_idx][:80]
+                    else:
+                        results[batch_indices[i]] = title[:80]
+                    trans_idx += 1
 
-        return final_results
+        return results
 
     def translate_title(self, title: str) -> Optional[str]:
         """翻译单条新闻标题"""
@@ -165,7 +180,7 @@ class Translator:
             {"role": "user", "content": prompt}
         ]
 
-        response = self.client.chat(messages, temperature=0.2, max_tokens=80)
+        response = self.client.chat(messages, temperature=0.2, max_tokens=80, stage="translate_fallback")
 
         if response:
             return response.strip().strip('"\'')[:80]
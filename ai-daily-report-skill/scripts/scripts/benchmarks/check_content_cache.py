@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+正文缓存与深度专栏共用时的回归校验
+
+深度专栏只抓摘要，写入 partial=True 的条目（带 ETag、截断后的页面文本）。
+日报读到这种条目时不能带条件请求头，更不能在 304 时把摘要当正文返回。
+本脚本用假 session 模拟服务端（带条件头返回 304，否则返回整页），不联网：
+    python benchmarks/check_content_cache.py
+"""
+
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config.settings import REQUEST_HEADERS
+from crawler.content_cache import ContentCache
+from crawler.content_extractor import ContentExtractor
+
+URL = "https://example.com/news/partial-entry"
+ETAG = '"v1"'
+EXCERPT = "深度专栏抓到的摘要片段，只有开头几百字。"
+BODY = " ".join(f"Full article paragraph {i} with the complete body text." for i in range(40))
+PAGE = f"<html><head><title>t</title></head><body><article><p>{BODY}</p></article></body></html>"
+
+
+class _Response:
+    def __init__(self, status_code: int, body: bytes = b""):
+        self.status_code = status_code
+        self.headers = {"ETag": ETAG}
+        self._body = body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def iter_content(self, chunk_size: int = 1):
+        yield self._body
+
+
+class _StubSession:
+    """带 If-None-Match 的请求一律返回 304，否则返回整页"""
+
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append(dict(headers or {}))
+        if headers and headers.get("If-None-Match") == ETAG:
+            return _Response(304)
+        return _Response(200, PAGE.encode("utf-8"))
+
+
+def check(name: str, ok: bool) -> bool:
+    print(f"  {'OK  ' if ok else 'FAIL'} {name}")
+    return ok
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "content-cache.json"
+
+        # 深度专栏写入摘要条目，并让它过期（日报只对过期条目发条件请求）
+        writer = ContentCache(path)
+        writer.put(URL, text=EXCERPT, description=EXCERPT, etag=ETAG, partial=True)
+        key = next(iter(writer._entries))
+        writer._entries[key]["fetched_at"] = (datetime.now(timezone.utc) - timedelta(days=30)).isoformat()
+        writer._dirty.add(key)
+        writer.save()
+
+        # 日报另起进程读同一文件
+        cache = ContentCache(path)
+        results = [
+            check("摘要条目不产生条件请求头", cache.validators(URL) == {}),
+            check("摘要条目 304 时 revalidate 视为未命中", cache.revalidate(URL) is None),
+            check("深度专栏自身仍可对摘要条目做条件请求", cache.validators(URL, allow_partial=True) != {}),
+        ]
+
+        extractor = ContentExtractor(headers=REQUEST_HEADERS, cache=cache)
+        session = _StubSession()
+        extractor.session = session
+        content, _ = extractor.extract(URL)
+
+        results += [
+            check("日报请求未带 If-None-Match", all("If-None-Match" not in h for h in session.requests)),
+            check("返回整页正文而不是摘要", EXCERPT not in content and "Full article paragraph 0" in content),
+            check("整页正文覆盖摘要条目", cache.get(URL) is not None),
+        ]
+
+    print(f"通过 {sum(results)}/{len(results)}")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -125,27 +125,119 @@ COMPILED_LOW_ZH = [re.compile(kw, re.IGNORECASE) for kw in LOW_VALUE_SIGNALS_ZH]
 COMPILED_LOW_EN = [re.compile(kw, re.IGNORECASE) for kw in LOW_VALUE_SIGNALS_EN]
 
 
+# sre 在 IGNORECASE 下会把这几个字符与 ASCII 字母视为相同，而 str.lower() 不会
+_CASEFOLD_SPECIAL = ("\u0130", "\u0131", "\u017f")  # İ ı ſ
+_REGEX_META = set(".^$*+?{}[]|()")
+
+
+def _required_literal(pattern: str):
+    """
+    任何匹配都必须包含的最长小写字面量子串；无法确定时返回 None
+    只处理关键词库里用到的语法：\\b、转义、字符类、. 和量词，遇到分组/分支直接放弃
+    """
+    runs, current, i, n = [], "", 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "\\":
+            nxt = pattern[i + 1] if i + 1 < n else ""
+            i += 2
+            if nxt in ("b", "B"):
+                continue  # 零宽断言不占字符，不打断字面量
+            atom = None if nxt.isalnum() else nxt
+        elif c in "|()":
+            return None
+        elif c == "[":
+            i = pattern.index("]", i + 1) + 1
+            atom = None
+        elif c in _REGEX_META:
+            i += 1
+            atom = None
+        else:
+            i += 1
+            atom = c
+        # 有大小写的非 ASCII 字符交给正则本身判断
+        if atom is not None and not atom.isascii() and atom.lower() != atom.upper():
+            atom = None
+
+        quantifier = pattern[i] if i < n else ""
+        if quantifier and quantifier in "*?{+":
+            i = pattern.index("}", i) + 1 if quantifier == "{" else i + 1
+            if i < n and pattern[i] == "?":
+                i += 1
+            if quantifier == "+" and atom is not None:
+                current += atom  # 至少出现一次
+            runs.append(current)
+            current = ""
+        elif atom is None:
+            runs.append(current)
+            current = ""
+        else:
+            current += atom
+    runs.append(current)
+    return max(runs, key=len).lower() or None
+
+
+class KeywordMatcher:
+    """
+    一种语言的五张关键词表合并成一张匹配表，编译一次
+    每条规则先用必含字面量在小写文本上做子串判断（C 实现，远快于正则扫描），
+    只有字面量命中的规则才跑正则确认；结果与逐表 search 完全一致
+    """
+
+    TIERS = ("high", "core", "aux", "exclude", "low")
+
+    def __init__(self, tables):
+        self.rules = [
+            (tier, kw, pattern, _required_literal(kw))
+            for tier, keywords, compiled in tables
+            for kw, pattern in zip(keywords, compiled)
+        ]
+
+    def match(self, text: str) -> dict:
+        """返回各层命中的关键词（按词表顺序）"""
+        haystack = text.lower()
+        prefilter = not any(c in text for c in _CASEFOLD_SPECIAL)
+        matched = {tier: [] for tier in self.TIERS}
+        for tier, kw, pattern, literal in self.rules:
+            if tier == "exclude" and matched["exclude"]:
+                continue  # 只关心是否命中
+            if prefilter and literal is not None and literal not in haystack:
+                continue
+            if pattern.search(text):
+                matched[tier].append(kw)
+        return matched
+
+
+MATCHER_ZH = KeywordMatcher([
+    ("high", HIGH_VALUE_ZH, COMPILED_HIGH_ZH),
+    ("core", CORE_KEYWORDS_ZH, COMPILED_CORE_ZH),
+    ("aux", AUX_KEYWORDS_ZH, COMPILED_AUX_ZH),
+    ("exclude", EXCLUDE_KEYWORDS_ZH, COMPILED_EXCLUDE_ZH),
+    ("low", LOW_VALUE_SIGNALS_ZH, COMPILED_LOW_ZH),
+])
+MATCHER_EN = KeywordMatcher([
+    ("high", HIGH_VALUE_EN, COMPILED_HIGH_EN),
+    ("core", CORE_KEYWORDS_EN, COMPILED_CORE_EN),
+    ("aux", AUX_KEYWORDS_EN, COMPILED_AUX_EN),
+    ("exclude", EXCLUDE_KEYWORDS_EN, COMPILED_EXCLUDE_EN),
+    ("low", LOW_VALUE_SIGNALS_EN, COMPILED_LOW_EN),
+])
+
+
 def check_keywords(text: str, language: str) -> dict:
     """检查关键词匹配，返回分层结果"""
     if language == "zh":
-        high = [kw for kw, p in zip(HIGH_VALUE_ZH, COMPILED_HIGH_ZH) if p.search(text)]
-        core = [kw for kw, p in zip(CORE_KEYWORDS_ZH, COMPILED_CORE_ZH) if p.search(text)]
-        aux = [kw for kw, p in zip(AUX_KEYWORDS_ZH, COMPILED_AUX_ZH) if p.search(text)]
-        exclude = any(p.search(text) for p in COMPILED_EXCLUDE_ZH)
-        low_signals = sum(1 for p in COMPILED_LOW_ZH if p.search(text))
+        matched = MATCHER_ZH.match(text)
     else:
-        t = text.lower()
-        high = [kw for kw, p in zip(HIGH_VALUE_EN, COMPILED_HIGH_EN) if p.search(t)]
-        core = [kw for kw, p in zip(CORE_KEYWORDS_EN, COMPILED_CORE_EN) if p.search(t)]
-        aux = [kw for kw, p in zip(AUX_KEYWORDS_EN, COMPILED_AUX_EN) if p.search(t)]
-        exclude = any(p.search(t) for p in COMPILED_EXCLUDE_EN)
-        low_signals = sum(1 for p in COMPILED_LOW_EN if p.search(t))
+        matched = MATCHER_EN.match(text.lower())
+    core = matched["core"]
+    exclude = bool(matched["exclude"])
 
     return {
         "pass": len(core) >= 1 and not exclude,
-        "high_matched": high,
+        "high_matched": matched["high"],
         "core_matched": core,
-        "aux_matched": aux,
+        "aux_matched": matched["aux"],
         "has_exclude": exclude,
-        "low_signal_count": low_signals,
+        "low_signal_count": len(matched["low"]),
     }
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+源抓取缓存
+按源 key 保存上次的 ETag / Last-Modified 和解析结果，
+下次条件请求返回 304 时直接复用，不再重新下载解析；
+同时记住上次成功的 URL（RSSHub 源即胜出的镜像），下次优先只请求它
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from crawler.models import RawNewsItem
+
+logger = logging.getLogger(__name__)
+
+
+class FeedCache:
+    """源级条件请求缓存（线程安全）"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = self._load()
+        self._dirty = False
+
+    def _load(self) -> Dict[str, dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception as e:
+            logger.warning(f"读取源缓存失败，忽略: {e}")
+            return {}
+
+    def validators(self, key: str, url: str) -> Dict[str, str]:
+        """只有上次成功抓取的正是这个 URL（同一镜像）时才带条件请求头"""
+        with self._lock:
+            entry = self._entries.get(key) or {}
+        if entry.get("url") != url:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def url(self, key: str) -> Optional[str]:
+        """上次成功抓取该源所用的 URL"""
+        with self._lock:
+            entry = self._entries.get(key) or {}
+        return entry.get("url")
+
+    def items(self, key: str) -> Optional[List[RawNewsItem]]:
+        """304 时取回上次的解析结果"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if not entry or "items" not in entry:
+            return None
+        items = []
+        for raw in entry["items"]:
+            data = dict(raw)
+            if data.get("pub_time"):
+                try:
+                    data["pub_time"] = datetime.fromisoformat(data["pub_time"])
+                except ValueError:
+                    data["pub_time"] = None
+            items.append(RawNewsItem(**data))
+        return items
+
+    def store(self, key: str, url: str, headers, items: List[RawNewsItem]):
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        serialized = []
+        for item in items:
+            data = asdict(item)
+            data["pub_time"] = item.pub_time.isoformat() if item.pub_time else None
+            serialized.append(data)
+        with self._lock:
+            if not etag and not last_modified:
+                # 源不支持条件请求，缓存解析结果没有意义，只记住成功的 URL
+                if self._entries.get(key) != {"url": url}:
+                    self._entries[key] = {"url": url}
+                    self._dirty = True
+                return
+            self._entries[key] = {
+                "url": url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "fetched_at": datetime.now().isoformat(),
+                "items": serialized,
+            }
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp = None
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=str(self.path.parent), prefix=".feed-cache-", suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(self._entries, f, ensure_ascii=False)
+                os.replace(tmp, self.path)
+                self._dirty = False
+            except Exception as e:
+                logger.warning(f"保存源缓存失败: {e}")
+                if tmp and os.path.exists(tmp):
+                    os.remove(tmp)
@@ -19,6 +19,7 @@ class RawNewsItem:
     pub_time: Optional[datetime]
     summary: str
     content: str
+    title_zh: str = ""  # 上游（ai-hourly-buzz）已有的中文标题
 
 
 @dataclass
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+分类结果缓存
+按条目 ID 存放 AI 分类结果，重跑、预摘要后的日报运行不再重复请求
+"""
+
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Iterable
+
+from processor.sqlite_store import SqliteStore
+
+logger = logging.getLogger(__name__)
+
+
+class CategoryCache:
+    """条目 ID -> 分类（线程安全）"""
+
+    def __init__(self, db_path: Path, ttl_hours: float = 72):
+        self.db_path = Path(db_path)
+        self._store = SqliteStore(
+            self.db_path, "categories",
+            "id TEXT PRIMARY KEY, category TEXT NOT NULL, created REAL NOT NULL",
+            max_age=ttl_hours * 3600,
+        )
+        self.evict()
+
+    def evict(self) -> int:
+        """删除超过有效期的记录"""
+        return self._store.evict()
+
+    def get_many(self, ids: Iterable[str]) -> Dict[str, str]:
+        return dict(self._store.select_many(ids, "id, category"))
+
+    def put_many(self, categories: Dict[str, str]):
+        now = time.time()
+        self._store.write_many(
+            ("id", "category", "created"),
+            ((item_id, category, now) for item_id, category in categories.items() if item_id),
+        )
+
+    def close(self):
+        self._store.close()
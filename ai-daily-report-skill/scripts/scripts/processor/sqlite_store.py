@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite 键值表
+各个本地缓存（已处理 URL、LLM 响应、预摘要、分类结果）共用的底层：文本主键 + 记录时间列，
+负责建表、WAL、按时间清理过期记录、按主键分批查询与批量写入；线程安全
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Sequence
+
+_BATCH = 500  # 低于 SQLite 默认的绑定参数上限
+
+
+class SqliteStore:
+    """
+    一张以 key 为主键、time_column 记录写入时间的表
+    max_age 为保留秒数（0 表示不清理）；schema 是完整的列定义，需包含 key 与 time_column
+    """
+
+    def __init__(self, db_path: Path, table: str, schema: str, key: str = "id",
+                 time_column: str = "created", max_age: float = 0, wal: bool = True):
+        self.db_path = Path(db_path)
+        self.table = table
+        self.key = key
+        self.time_column = time_column
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        if wal:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({schema}) WITHOUT ROWID")
+
+    def cutoff(self) -> float:
+        """早于该时间戳的记录已过期"""
+        return time.time() - self.max_age if self.max_age else float("-inf")
+
+    def evict(self) -> int:
+        """删除过期记录，返回删除条数"""
+        if not self.max_age:
+            return 0
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"DELETE FROM {self.table} WHERE {self.time_column} < ?", (self.cutoff(),)
+            )
+        return cursor.rowcount
+
+    def select_many(self, keys: Iterable[str], columns: str, where: str = "",
+                    params: Sequence = (), fresh: bool = True) -> List[tuple]:
+        """
+        按主键分批查询（空键与重复键忽略）；fresh 时只返回未过期的记录，
+        where / params 为追加的过滤条件
+        """
+        keys = list(dict.fromkeys(k for k in keys if k))
+        conditions = []
+        extra = []
+        if fresh and self.max_age:
+            conditions.append(f"{self.time_column} >= ?")
+            extra.append(self.cutoff())
+        if where:
+            conditions.append(where)
+            extra.extend(params)
+        suffix = "".join(f" AND {condition}" for condition in conditions)
+        found = []
+        with self._lock:
+            for i in range(0, len(keys), _BATCH):
+                chunk = keys[i:i + _BATCH]
+                placeholders = ",".join("?" * len(chunk))
+                found.extend(self._conn.execute(
+                    f"SELECT {columns} FROM {self.table} WHERE {self.key} IN ({placeholders}){suffix}",
+                    (*chunk, *extra),
+                ))
+        return found
+
+    def write_many(self, columns: Sequence[str], rows: Iterable[tuple], replace: bool = True):
+        """批量写入；replace 为 False 时已存在的主键保持不变"""
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        placeholders = ",".join("?" * len(columns))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"{verb} INTO {self.table} ({', '.join(columns)}) VALUES ({placeholders})", rows
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
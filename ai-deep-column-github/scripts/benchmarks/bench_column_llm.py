@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+专栏生成离线压测
+
+在进程内启动 llm_stub_server 桩服务，向临时共享目录写入合成的 latest-24h.json（若干个热点话题，
+每个话题多家来源的相似报道）和正文缓存（素材收集全部命中，不走网络），然后跑完整的
+选题 → 素材 → 流式撰写 → 解析 → HTML 流程（不发布），按并发度逐组测量：
+每篇耗时分布、总吞吐、token 与桩服务观测到的并发峰值、注入错误数。
+
+    python benchmarks/bench_column_llm.py --topics 8 --concurrency 1,4
+    python benchmarks/bench_column_llm.py --latency lognormal:1.5,0.5 --tokens-per-second 60 --error-rate 0.1
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from llm_stub_server import add_stub_arguments, stub_from_args
+
+_TOPICS = [
+    ("OpenAI", "GPT-5", "OpenAI 发布 GPT-5，推理能力大幅提升"),
+    ("Google", "Gemini", "Google 推出 Gemini 新版本，多模态能力升级"),
+    ("Anthropic", "Claude", "Anthropic 发布 Claude 新模型，编程能力领先"),
+    ("Meta", "Llama", "Meta 开源 Llama 新模型，参数规模再创新高"),
+    ("NVIDIA", "Blackwell", "NVIDIA 发布 Blackwell 新芯片，AI 训练成本下降"),
+    ("Microsoft", "Copilot", "Microsoft 更新 Copilot，全面接入办公套件"),
+    ("DeepSeek", "DeepSeek-V3", "DeepSeek 开源 DeepSeek-V3，推理成本大降"),
+    ("Mistral", "Mixtral", "Mistral 发布 Mixtral 新版本，欧洲大模型提速"),
+]
+_SITES = ["aibase", "jiqizhixin", "qbitai", "36kr", "techcrunch", "theverge"]
+_SUFFIXES = ["", "，业内关注", "，开发者反响热烈", "，官方公布细节", "，附实测对比"]
+
+
+def make_latest(topics: int, per_topic: int) -> list:
+    """每个话题 per_topic 篇来自不同来源的相似报道（标题相似度足以聚成一簇）"""
+    now = datetime.now(timezone.utc)
+    items = []
+    for t in range(topics):
+        company, product, title = _TOPICS[t % len(_TOPICS)]
+        if t >= len(_TOPICS):
+            title = f"{title}（{t // len(_TOPICS) + 1}）"
+        for k in range(per_topic):
+            items.append({
+                "id": f"bench-{t}-{k}",
+                "title": title + _SUFFIXES[k % len(_SUFFIXES)],
+                "title_zh": "",
+                "url": f"https://bench.example.com/{t}/{k}",
+                "site_id": _SITES[k % len(_SITES)],
+                "site_name": _SITES[k % len(_SITES)],
+                "published_at": (now - timedelta(hours=1 + t, minutes=k * 7)).isoformat(),
+            })
+    return items
+
+
+def write_shared_data(shared_dir: Path, items: list):
+    from content_cache import CACHE_VERSION, normalize_url
+
+    shared_dir.mkdir(parents=True, exist_ok=True)
+    with open(shared_dir / "latest-24h.json", "w", encoding="utf-8") as f:
+        json.dump({"items_ai": items}, f, ensure_ascii=False)
+    fetched_at = datetime.now(timezone.utc).isoformat()
+    entries = {}
+    for item in items:
+        text = (item["title"] + "。") * 20
+        entries[normalize_url(item["url"])] = {
+            "url": item["url"], "text": text, "pub_time": item["published_at"], "description": item["title"],
+            "fetched_at": fetched_at, "etag": None, "last_modified": None, "partial": False,
+        }
+    with open(shared_dir / "content-cache.json", "w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "entries": entries}, f, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="专栏生成离线压测（选题 → 素材 → 撰写 + 桩服务）")
+    parser.add_argument("--topics", type=int, default=8, help="合成热点话题数（同时也是生成篇数上限）")
+    parser.add_argument("--per-topic", type=int, default=5, help="每个话题的报道数")
+    parser.add_argument("--concurrency", default="1,4", help="同时撰写的篇数，逗号分隔逐组运行")
+    add_stub_arguments(parser)
+    parser.set_defaults(tokens_per_second=80.0)
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="bench-column-"))
+    server = stub_from_args(args).start()
+    # 配置在导入时读取环境变量，必须先设置再导入流水线模块
+    os.environ.update({
+        "DEEPSEEK_API_KEY": "stub", "DEEPSEEK_BASE_URL": server.base_url,
+        "SHARED_DATA_DIR": str(root / "shared"), "SHARED_QUERY_SOCKET": "", "LLM_CACHE_ENABLED": "0",
+    })
+    try:
+        write_shared_data(root / "shared", make_latest(args.topics, args.per_topic))
+
+        from config.settings import CONTENT_CACHE_FILE, CONTENT_CACHE_TTL_HOURS, CONTENT_CACHE_MAX_ENTRIES
+        from article_writer import get_writer
+        from content_cache import ContentCache
+        from html_generator import HTMLGenerator
+        from material_collector import MaterialCollector
+        from topic_selector import TopicSelector
+
+        selector = TopicSelector()
+        started = time.perf_counter()
+        clusters = selector.cluster(selector.load_news())
+        print(f"桩服务 {server.base_url}，延迟 {args.latency}，生成速度 {args.tokens_per_second} token/s，"
+              f"500 注入 {args.error_rate:.0%}，429 注入 {args.rate_limit_rate:.0%}")
+        print(f"选题: {len(clusters)} 个热点，耗时 {(time.perf_counter() - started) * 1000:.0f} ms")
+        if not clusters:
+            return 1
+
+        collector = MaterialCollector(cache=ContentCache(
+            CONTENT_CACHE_FILE, CONTENT_CACHE_TTL_HOURS, CONTENT_CACHE_MAX_ENTRIES,
+        ))
+        writer = get_writer()
+        html_gen = HTMLGenerator()
+        drafts = root / "drafts"
+        drafts.mkdir()
+
+        def generate(index: int):
+            cluster = clusters[index]
+            began = time.perf_counter()
+            materials = collector.collect(cluster)
+            title, body = writer.write_article(cluster.representative_title, materials,
+                                               draft_path=drafts / f"draft_{index}.md")
+            if not title or not body:
+                return time.perf_counter() - began, False
+            html_gen.generate(title, body, {"article_count": cluster.count, "source_count": cluster.source_count})
+            return time.perf_counter() - began, True
+
+        for concurrency in [int(c) for c in args.concurrency.split(",") if c.strip()]:
+            server.stats.reset()
+            tokens_before = writer.total_tokens
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                results = list(pool.map(generate, range(len(clusters))))
+            elapsed = time.perf_counter() - started
+            latencies = sorted(seconds for seconds, _ in results)
+            ok = sum(1 for _, success in results if success)
+            stub = server.stats.snapshot()
+            print(f"并发{concurrency:<3} {ok}/{len(results)} 篇成功，总耗时 {elapsed:6.1f}s，"
+                  f"{ok / elapsed * 60:.1f} 篇每分钟 | 每篇 中位 {statistics.median(latencies):.1f}s / "
+                  f"最大 {latencies[-1]:.1f}s")
+            print(f"{'':<6} token {writer.total_tokens - tokens_before}，请求 {stub['requests']}，"
+                  f"服务端并发峰值 {stub['max_in_flight']}，注入 500×{stub['errors']} 429×{stub['rate_limited']}")
+        return 0
+    finally:
+        server.stop()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+选题规模基准
+
+读取 ai-hourly-buzz 的 benchmarks/gen_archive.py 生成的各规模合成数据（每档一个目录，
+含 archive.json / latest-24h.json），每档每种数据源在独立子进程中运行
+TopicSelector.load_news → cluster，输出各步耗时与该进程的峰值内存：
+  latest  — 正常路径，读 latest-24h.json 的 items_ai
+  archive — 回退路径，只有 archive.json，全量读取后自行过滤
+    python ../../ai-hourly-buzz-github/scripts/benchmarks/bench_scale.py --tiers 7,30,90   # 先生成数据
+    python benchmarks/bench_topic_scale.py --data-root /tmp/buzz-scale
+    python benchmarks/bench_topic_scale.py --data-root /tmp/buzz-scale --tiers 30d-800 --sources archive
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def peak_rss_mb() -> float:
+    # Linux 上 ru_maxrss 单位是 KiB，macOS 上是字节
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_child() -> dict:
+    # SHARED_DATA_DIR 由父进程设置，配置在导入时读取
+    from topic_selector import TopicSelector
+
+    selector = TopicSelector()
+    started = time.perf_counter()
+    items = selector.load_news()
+    load_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    clusters = selector.cluster(items)
+    cluster_seconds = time.perf_counter() - started
+    return {
+        "loaded": len(items),
+        "clusters": len(clusters),
+        "timings": {"load": load_seconds, "cluster": cluster_seconds},
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_tier(data_dir: Path, source: str) -> dict:
+    with tempfile.TemporaryDirectory(prefix="bench-topic-") as tmp:
+        shared = Path(tmp)
+        files = ["archive.json"] if source == "archive" else ["latest-24h.json", "archive.json"]
+        for name in files:
+            (shared / name).symlink_to((data_dir / name).resolve())
+        env = dict(os.environ, SHARED_DATA_DIR=str(shared), SHARED_QUERY_SOCKET="",
+                   DEEPSEEK_API_KEY=os.environ.get("DEEPSEEK_API_KEY", "bench"))
+        proc = subprocess.run([sys.executable, __file__, "--child"], env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip())
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def find_tiers(data_root: Path, names: str) -> list:
+    if names:
+        return [data_root / name.strip() for name in names.split(",") if name.strip()]
+    tiers = [p.parent for p in data_root.glob("*/archive.json")]
+    return sorted(tiers, key=lambda p: p.joinpath("archive.json").stat().st_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="选题规模基准（load_news → cluster）")
+    parser.add_argument("--data-root", default=str(Path(tempfile.gettempdir()) / "buzz-scale"),
+                        help="gen_archive.py / bench_scale.py 生成数据的根目录")
+    parser.add_argument("--tiers", default="", help="只跑指定的档位目录名，逗号分隔（默认全部，按大小排序）")
+    parser.add_argument("--sources", default="latest,archive", help="latest / archive，逗号分隔")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child()))
+        return 0
+
+    tiers = find_tiers(Path(args.data_root), args.tiers)
+    if not tiers:
+        print(f"{args.data_root} 下没有合成数据，先运行 ai-hourly-buzz 的 benchmarks/gen_archive.py 或 bench_scale.py")
+        return 1
+
+    ok = True
+    for data_dir in tiers:
+        size_mb = (data_dir / "archive.json").stat().st_size / 1e6
+        for source in [s.strip() for s in args.sources.split(",") if s.strip()]:
+            try:
+                r = run_tier(data_dir, source)
+            except RuntimeError as e:
+                ok = False
+                print(f"{data_dir.name} / {source} 运行失败:\n{e}")
+                continue
+            t = r["timings"]
+            print(f"{data_dir.name:>12} {source:<7} archive {size_mb:7.1f} MB | 窗口内 {r['loaded']} 条 → "
+                  f"{r['clusters']} 个热点 | load {t['load'] * 1000:.0f}ms  cluster {t['cluster'] * 1000:.0f}ms | "
+                  f"峰值内存 {r['peak_rss_mb']:.1f} MB")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
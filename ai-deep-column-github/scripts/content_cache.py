@@ -0,0 +1,172 @@
+"""文章正文缓存
+
+按规范化 URL 缓存正文、发布时间、meta 描述、抓取时间与 ETag，
+存放在共享数据目录，与 ai-daily-report 共用同一文件（格式须保持一致）。
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+_TRACKING_PARAMS = {"fbclid", "gclid", "ref", "ref_src", "spm", "from"}
+
+
+def normalize_url(url: str) -> str:
+    """缓存键：小写协议与域名，去掉 fragment、跟踪参数和末尾斜杠，参数排序"""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    ]
+    host = (parts.hostname or "").lower()
+    if parts.port and not (parts.scheme == "http" and parts.port == 80) \
+            and not (parts.scheme == "https" and parts.port == 443):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), host, path, urlencode(sorted(query)), ""))
+
+
+class ContentCache:
+    """
+    正文缓存（线程安全）
+
+    条目字段：url / text / pub_time / description / fetched_at / etag / last_modified / partial
+    partial=True 表示只抓了摘要（深度专栏写入），日报提取正文时视为未命中。
+    过期条目仍保留 ETag / Last-Modified，用于条件请求；304 时直接续期。
+    """
+
+    def __init__(self, path: Path, ttl_hours: float = 72, max_entries: int = 3000):
+        self.path = Path(path)
+        self.ttl = timedelta(hours=ttl_hours)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = self._load()
+        self._dirty = set()
+        self.stats = {"hit": 0, "miss": 0, "revalidated": 0, "stored": 0}
+
+    def _load(self) -> Dict[str, dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            entries = data.get("entries", {}) if isinstance(data, dict) else {}
+            return entries if isinstance(entries, dict) else {}
+        except Exception as e:
+            logger.warning(f"读取正文缓存失败，忽略: {e}")
+            return {}
+
+    def _is_fresh(self, entry: dict) -> bool:
+        try:
+            fetched_at = datetime.fromisoformat(entry["fetched_at"])
+        except (KeyError, TypeError, ValueError):
+            return False
+        return datetime.now(timezone.utc) - fetched_at < self.ttl
+
+    def get(self, url: str, allow_partial: bool = False) -> Optional[dict]:
+        """返回未过期的条目，未命中返回 None"""
+        with self._lock:
+            entry = self._entries.get(normalize_url(url))
+            if entry and self._is_fresh(entry) and (allow_partial or not entry.get("partial")):
+                self.stats["hit"] += 1
+                return dict(entry)
+            self.stats["miss"] += 1
+            return None
+
+    def validators(self, url: str, allow_partial: bool = False) -> Dict[str, str]:
+        """
+        过期条目的条件请求头（If-None-Match / If-Modified-Since）
+        摘要条目的 304 只能换回摘要，不能当正文用，除非 allow_partial 否则不带条件头
+        """
+        with self._lock:
+            entry = self._entries.get(normalize_url(url)) or {}
+        if entry.get("partial") and not allow_partial:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def revalidate(self, url: str, allow_partial: bool = False) -> Optional[dict]:
+        """服务端返回 304：续期并返回旧条目；摘要条目同 get() 一样视为未命中"""
+        key = normalize_url(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry or (entry.get("partial") and not allow_partial):
+                return None
+            entry["fetched_at"] = datetime.now(timezone.utc).isoformat()
+            self._dirty.add(key)
+            self.stats["revalidated"] += 1
+            return dict(entry)
+
+    def put(self, url: str, text: str = "", pub_time: Optional[str] = None, description: str = "",
+            etag: Optional[str] = None, last_modified: Optional[str] = None, partial: bool = False):
+        key = normalize_url(url)
+        entry = {
+            "url": url,
+            "text": text or "",
+            "pub_time": pub_time,
+            "description": description or "",
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+            "etag": etag,
+            "last_modified": last_modified,
+            "partial": partial,
+        }
+        with self._lock:
+            old = self._entries.get(key)
+            # 摘要条目不覆盖未过期的完整正文
+            if partial and old and not old.get("partial") and self._is_fresh(old):
+                return
+            self._entries[key] = entry
+            self._dirty.add(key)
+            self.stats["stored"] += 1
+
+    def save(self):
+        """与磁盘上的最新内容合并后原子写入，按抓取时间淘汰过期与超量条目"""
+        with self._lock:
+            if not self._dirty:
+                self._log_stats()
+                return
+            merged = self._load()
+            for key in self._dirty:
+                merged[key] = self._entries[key]
+            merged = {k: v for k, v in merged.items() if self._is_fresh(v) or v.get("etag") or v.get("last_modified")}
+            if len(merged) > self.max_entries:
+                newest = sorted(merged.items(), key=lambda kv: kv[1].get("fetched_at", ""), reverse=True)
+                merged = dict(newest[:self.max_entries])
+            self._entries = merged
+            self._dirty.clear()
+
+            tmp = None
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=str(self.path.parent), prefix=".content-cache-", suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump({"version": CACHE_VERSION, "entries": merged}, f, ensure_ascii=False)
+                os.replace(tmp, self.path)
+            except Exception as e:
+                logger.warning(f"保存正文缓存失败: {e}")
+                if tmp and os.path.exists(tmp):
+                    os.remove(tmp)
+                return
+            self._log_stats()
+
+    def _log_stats(self):
+        logger.info(
+            f"正文缓存: 命中 {self.stats['hit']}，未命中 {self.stats['miss']}，"
+            f"304 续期 {self.stats['revalidated']}，写入 {self.stats['stored']}，共 {len(self._entries)} 条"
+        )
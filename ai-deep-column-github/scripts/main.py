@@ -10,10 +10,12 @@ AI 深度专栏 (ai-deep-column) 主流水线
   python main.py discover           # 发现候选话题
   python main.py generate 1         # 生成第1个话题的专栏
   python main.py auto               # 自动选最热话题并生成（全自动模式）
+  追加 --no-llm-cache 可跳过 LLM 响应缓存，强制重新调用 API
 """
 import sys
 import os
 import logging
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -22,7 +24,11 @@ import pytz
 # 确保项目路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from config.settings import LOGS_DIR, LOG_FILE
+from config.settings import (
+    LOGS_DIR, LOG_FILE, DRAFTS_DIR, DRAFT_RETENTION_DAYS,
+    CONTENT_CACHE_FILE, CONTENT_CACHE_TTL_HOURS, CONTENT_CACHE_MAX_ENTRIES,
+)
+from content_cache import ContentCache
 from topic_selector import TopicSelector
 from material_collector import MaterialCollector
 from article_writer import get_writer
@@ -34,6 +40,17 @@ BJT = pytz.timezone("Asia/Shanghai")
 logger = logging.getLogger(__name__)
 
 
+def prune_drafts():
+    """删除超过保留天数的草稿（失败运行留下的）"""
+    cutoff = time.time() - DRAFT_RETENTION_DAYS * 86400
+    for path in DRAFTS_DIR.glob("draft_*.md"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
+
+
 def setup_logging():
     """配置日志"""
     LOGS_DIR.mkdir(parents=True, exist_ok=True)
@@ -52,7 +69,9 @@ class DeepColumnPipeline:
 
     def __init__(self):
         self.selector = TopicSelector()
-        self.collector = MaterialCollector()
+        self.collector = MaterialCollector(cache=ContentCache(
+            CONTENT_CACHE_FILE, CONTENT_CACHE_TTL_HOURS, CONTENT_CACHE_MAX_ENTRIES,
+        ))
         self.writer = get_writer()
         self.html_gen = HTMLGenerator()
         self.publisher = WeChatPublisher()
@@ -120,10 +139,15 @@ class DeepColumnPipeline:
 
         # 3. AI 生成文章
         logger.info("🤖 AI 撰写文章...")
-        title, body = self.writer.write_article(topic_title, materials)
+        DRAFTS_DIR.mkdir(parents=True, exist_ok=True)
+        prune_drafts()
+        draft_path = DRAFTS_DIR / f"draft_{datetime.now(BJT).strftime('%Y%m%d_%H%M%S')}.md"
+        title, body = self.writer.write_article(topic_title, materials, draft_path=draft_path)
         if not title or not body:
-            logger.error("文章生成失败")
+            logger.error("文章生成失败"
+                         + (f"，未完成的草稿保留在 {draft_path}" if draft_path.exists() else ""))
             return False
+        draft_path.unlink(missing_ok=True)
         logger.info(f"文章生成完成: {title} ({len(body)} 字符)")
 
         # 4. 生成 HTML
@@ -144,6 +168,8 @@ class DeepColumnPipeline:
         if success:
             tokens = self.writer.total_tokens
             logger.info(f"🎉 专栏发布成功！Token 消耗: {tokens}")
+            if self.writer.cache:
+                logger.info(self.writer.cache.summary())
         return success
 
     def auto(self) -> bool:
@@ -157,6 +183,10 @@ class DeepColumnPipeline:
 def main():
     setup_logging()
 
+    if "--no-llm-cache" in sys.argv:
+        sys.argv.remove("--no-llm-cache")
+        get_writer().disable_cache()
+
     if len(sys.argv) < 2:
         print(__doc__)
         sys.exit(1)
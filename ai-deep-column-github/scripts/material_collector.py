@@ -8,6 +8,7 @@ import re
 import requests
 from typing import List, Dict, Optional
 
+from content_cache import ContentCache
 from topic_selector import TopicCluster, NewsItem
 
 logger = logging.getLogger(__name__)
@@ -22,8 +23,9 @@ HEADERS = {
 class MaterialCollector:
     """从聚类中收集写作素材"""
 
-    def __init__(self, timeout: int = 15):
+    def __init__(self, timeout: int = 15, cache: Optional[ContentCache] = None):
         self.timeout = timeout
+        self.cache = cache
 
     def collect(self, cluster: TopicCluster, max_articles: int = 8) -> str:
         """
@@ -47,6 +49,9 @@ class MaterialCollector:
                 entry += f"\n摘要: {excerpt}"
             materials.append(entry)
 
+        if self.cache:
+            self.cache.save()
+
         header = (
             f"话题: {cluster.representative_title}\n"
             f"报道数量: {cluster.count} 篇，涉及 {cluster.source_count} 个来源\n"
@@ -57,23 +62,42 @@ class MaterialCollector:
         """尝试从 URL 抓取摘要文本"""
         if not url:
             return ""
+        # 日报提取过的正文或上次抓的摘要都可直接复用
+        if self.cache:
+            entry = self.cache.get(url, allow_partial=True)
+            if entry:
+                return self._excerpt_from_entry(entry, max_chars)
         try:
-            resp = requests.get(url, headers=HEADERS, timeout=self.timeout, allow_redirects=True)
+            headers = dict(HEADERS)
+            if self.cache:
+                headers.update(self.cache.validators(url, allow_partial=True))
+            resp = requests.get(url, headers=headers, timeout=self.timeout, allow_redirects=True)
+            if resp.status_code == 304 and self.cache:
+                entry = self.cache.revalidate(url, allow_partial=True)
+                if entry:
+                    return self._excerpt_from_entry(entry, max_chars)
+                resp = requests.get(url, headers=HEADERS, timeout=self.timeout, allow_redirects=True)
             resp.raise_for_status()
             text = resp.text
 
-            # 尝试提取 meta description
+            # meta description 优先，其次 og:description
             desc = self._extract_meta_description(text)
-            if desc and len(desc) > 30:
-                return desc[:max_chars]
+            if not (desc and len(desc) > 30):
+                og_desc = self._extract_og_description(text)
+                if og_desc and len(og_desc) > 30:
+                    desc = og_desc
+            body_text = self._extract_body_text(text)
 
-            # 尝试提取 og:description
-            og_desc = self._extract_og_description(text)
-            if og_desc and len(og_desc) > 30:
-                return og_desc[:max_chars]
+            if self.cache:
+                self.cache.put(
+                    url, text=body_text, description=desc,
+                    etag=resp.headers.get("ETag"), last_modified=resp.headers.get("Last-Modified"),
+                    partial=True,
+                )
 
+            if desc and len(desc) > 30:
+                return desc[:max_chars]
             # 提取正文前 N 字符
-            body_text = self._extract_body_text(text)
             if body_text:
                 return body_text[:max_chars]
 
@@ -81,6 +105,13 @@ class MaterialCollector:
             logger.debug(f"获取摘要失败 {url}: {e}")
         return ""
 
+    @staticmethod
+    def _excerpt_from_entry(entry: Dict, max_chars: int) -> str:
+        desc = entry.get("description") or ""
+        if len(desc) > 30:
+            return desc[:max_chars]
+        return (entry.get("text") or "")[:max_chars]
+
     @staticmethod
     def _extract_meta_description(html: str) -> str:
         match = re.search(
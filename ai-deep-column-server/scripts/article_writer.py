@@ -1,18 +1,26 @@
 """AI 深度专栏文章撰写
 
 使用 DeepSeek 基于素材生成结构化长文。
+基于 AsyncOpenAI 流式生成，边生成边写入草稿文件，日志记录首字节耗时；
+对外仍是同步接口，协程在后台事件循环上执行。
 """
+import asyncio
 import logging
+import random
+import threading
 import time
+from pathlib import Path
 from typing import Optional, Tuple
-from openai import OpenAI
+from openai import AsyncOpenAI
 
 from config.settings import (
     DEEPSEEK_API_KEY, DEEPSEEK_BASE_URL, DEEPSEEK_MODEL,
     API_MAX_RETRIES, API_RETRY_DELAY, API_TIMEOUT,
     ARTICLE_WORD_COUNT,
+    LLM_CACHE_ENABLED, LLM_CACHE_FILE, LLM_CACHE_TTL_HOURS,
 )
 from config.prompts import ARTICLE_SYSTEM, ARTICLE_USER
+from llm_cache import LLMCache, cache_key
 
 logger = logging.getLogger(__name__)
 
@@ -27,20 +35,61 @@ def get_writer() -> "ArticleWriter":
     return _client
 
 
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _run_sync(coro):
+    """在后台事件循环上执行协程（异步客户端的连接池绑定在这个循环上）；中断时取消协程"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="writer-loop", daemon=True).start()
+    future = asyncio.run_coroutine_threadsafe(coro, _loop)
+    try:
+        return future.result()
+    except BaseException:
+        future.cancel()
+        raise
+
+
+def _backoff(attempt: int) -> float:
+    """指数退避加随机抖动"""
+    return API_RETRY_DELAY * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+
 class ArticleWriter:
     """AI 文章撰写器"""
 
     def __init__(self):
-        self.client = OpenAI(
+        # 重试由 _achat 负责（带抖动），关闭 SDK 自带的重试
+        self.client = AsyncOpenAI(
             api_key=DEEPSEEK_API_KEY,
             base_url=DEEPSEEK_BASE_URL,
             timeout=API_TIMEOUT,
+            max_retries=0,
         )
         self.total_tokens = 0
+        self.cache: Optional[LLMCache] = None
+        if LLM_CACHE_ENABLED:
+            try:
+                self.cache = LLMCache(LLM_CACHE_FILE, LLM_CACHE_TTL_HOURS)
+            except Exception as e:
+                logger.warning(f"LLM 缓存不可用，直接调用 API: {e}")
+
+    def disable_cache(self):
+        """--no-llm-cache：本次运行不读也不写缓存"""
+        if self.cache:
+            self.cache.close()
+            self.cache = None
+        logger.info("已禁用 LLM 响应缓存")
 
-    def write_article(self, topic_title: str, materials: str) -> Tuple[Optional[str], Optional[str]]:
+    def write_article(self, topic_title: str, materials: str,
+                      draft_path: Optional[Path] = None) -> Tuple[Optional[str], Optional[str]]:
         """
         生成专栏文章。
+        draft_path 不为空时，原始输出边生成边写入该文件（缓存命中时不写）。
         返回 (title, body_markdown) 或 (None, None)。
         """
         user_prompt = ARTICLE_USER.format(
@@ -54,6 +103,7 @@ class ArticleWriter:
             user=user_prompt,
             temperature=0.6,
             max_tokens=4000,
+            draft_path=draft_path,
         )
 
         if not response:
@@ -62,33 +112,78 @@ class ArticleWriter:
         return self._parse_article(response)
 
     def _chat(self, system: str, user: str,
-              temperature: float = 0.3, max_tokens: int = 2000) -> Optional[str]:
-        """调用 DeepSeek API，带重试"""
+              temperature: float = 0.3, max_tokens: int = 2000,
+              draft_path: Optional[Path] = None) -> Optional[str]:
+        """调用 DeepSeek API，带重试（同步包装）"""
+        return _run_sync(self._achat(system, user, temperature, max_tokens, draft_path))
+
+    async def _achat(self, system: str, user: str, temperature: float, max_tokens: int,
+                     draft_path: Optional[Path]) -> Optional[str]:
+        """流式调用；每次重试都从头重写草稿文件"""
         messages = [
             {"role": "system", "content": system},
             {"role": "user", "content": user},
         ]
 
+        # 与日报共用缓存：键只取决于模型和请求参数，存原始响应
+        key = None
+        if self.cache:
+            key = cache_key(DEEPSEEK_MODEL, messages, temperature, max_tokens)
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.info(f"LLM 缓存命中，跳过 API 调用 ({self.cache.summary()})")
+                return cached.strip()
+
         for attempt in range(API_MAX_RETRIES):
+            started = time.monotonic()
+            ttfb = None
+            parts = []
+            tokens = 0
             try:
-                resp = self.client.chat.completions.create(
+                stream = await self.client.chat.completions.create(
                     model=DEEPSEEK_MODEL,
                     messages=messages,
                     temperature=temperature,
                     max_tokens=max_tokens,
+                    stream=True,
+                    extra_body={"stream_options": {"include_usage": True}},
                 )
-                if resp.usage:
-                    self.total_tokens += resp.usage.total_tokens
-                    logger.info(f"Token 消耗: +{resp.usage.total_tokens} (累计 {self.total_tokens})")
-
-                content = resp.choices[0].message.content
+                draft = open(draft_path, "w", encoding="utf-8") if draft_path else None
+                try:
+                    async for chunk in stream:
+                        if chunk.usage:
+                            tokens = chunk.usage.total_tokens
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if not delta:
+                            continue
+                        if ttfb is None:
+                            ttfb = time.monotonic() - started
+                            logger.info(f"首字节耗时: {ttfb:.2f}s")
+                        parts.append(delta)
+                        if draft:
+                            draft.write(delta)
+                            draft.flush()
+                finally:
+                    if draft:
+                        draft.close()
+
+                content = "".join(parts)
+                logger.info(f"生成完成: {len(content)} 字符，用时 {time.monotonic() - started:.1f}s"
+                            + (f"，草稿: {draft_path}" if draft_path else ""))
+                if tokens:
+                    self.total_tokens += tokens
+                    logger.info(f"Token 消耗: +{tokens} (累计 {self.total_tokens})")
+                if key and content:
+                    self.cache.put(key, DEEPSEEK_MODEL, content, tokens)
                 return content.strip() if content else None
 
             except Exception as e:
-                delay = API_RETRY_DELAY * (attempt + 1)
+                delay = _backoff(attempt)
                 logger.warning(f"API 调用失败 (尝试 {attempt+1}/{API_MAX_RETRIES}): {e}")
                 if attempt < API_MAX_RETRIES - 1:
-                    time.sleep(delay)
+                    await asyncio.sleep(delay)
 
         logger.error("API 调用全部失败")
         return None
@@ -1,7 +1,8 @@
 """热点聚类选题引擎
 
 优先从 latest-24h.json 的 items_ai 加载已过滤的AI新闻（数据量小、无需重复过滤），
-回退到 archive.json 全量过滤。
+回退到 archive.json 全量过滤。配置了 SHARED_QUERY_SOCKET 时先问 buzz 的本机查询服务，
+服务不可用再读文件。
 按「标题相似度 + 关键实体重叠」双重策略聚类，
 找出被多个源报道的同一事件作为热点候选。
 """
@@ -21,11 +22,14 @@ import pytz
 from config.settings import (
     SHARED_ARCHIVE_FILE,
     SHARED_LATEST_FILE,
+    SHARED_QUERY_SOCKET,
+    SHARED_QUERY_TIMEOUT,
     CLUSTER_SIMILARITY_THRESHOLD,
     CLUSTER_MIN_ARTICLES,
     CLUSTER_TIME_WINDOW_HOURS,
     MAX_CANDIDATE_TOPICS,
 )
+from shared_query_client import query_shared_data
 
 logger = logging.getLogger(__name__)
 BJT = pytz.timezone("Asia/Shanghai")
@@ -305,11 +309,19 @@ class TopicSelector:
         """优先从 latest-24h.json 的 items_ai 加载（已预过滤AI新闻），
         回退到 archive.json 全量过滤。"""
 
-        items_raw = []
+        items_raw = None
         source_name = ""
+        now = datetime.now(timezone.utc)
+        cutoff = now - timedelta(hours=CLUSTER_TIME_WINDOW_HOURS)
 
+        # 同机部署: 查询服务常驻了同样的数据，省去解析大文件
+        if SHARED_QUERY_SOCKET:
+            items_raw, source_name = self._load_from_service(cutoff)
+
+        if items_raw is not None:
+            logger.info(f"从 {source_name} 加载数据")
         # 优先: latest-24h.json → items_ai（已过滤，数据量小）
-        if SHARED_LATEST_FILE.exists():
+        elif SHARED_LATEST_FILE.exists():
             with open(SHARED_LATEST_FILE, "r", encoding="utf-8") as f:
                 data = json.load(f)
             items_raw = data.get("items_ai", [])
@@ -327,8 +339,6 @@ class TopicSelector:
             logger.error(f"数据文件不存在: {SHARED_LATEST_FILE} / {SHARED_ARCHIVE_FILE}")
             return []
 
-        now = datetime.now(timezone.utc)
-        cutoff = now - timedelta(hours=CLUSTER_TIME_WINDOW_HOURS)
         items = []
 
         for raw in items_raw:
@@ -360,6 +370,20 @@ class TopicSelector:
         logger.info(f"数据源: {source_name}，时间窗口内有效 {len(items)} 条")
         return items
 
+    @staticmethod
+    def _load_from_service(cutoff: datetime):
+        """与读文件相同的优先级：latest 的 items_ai，没有再要归档窗口自行过滤；服务不可用返回 (None, "")"""
+        result = query_shared_data(SHARED_QUERY_SOCKET, "latest", ai=True, timeout=SHARED_QUERY_TIMEOUT)
+        if result is not None:
+            items = result[1]
+            return items, f"查询服务 latest-24h.json/items_ai ({len(items)} 条)"
+        result = query_shared_data(SHARED_QUERY_SOCKET, "archive", since=cutoff.timestamp(),
+                                   timeout=SHARED_QUERY_TIMEOUT)
+        if result is not None:
+            items = [r for r in result[1] if is_ai_related(r)]
+            return items, f"查询服务 archive (过滤后 {len(items)} 条)"
+        return None, ""
+
     def cluster(self, items: List[NewsItem]) -> List[TopicCluster]:
         """对新闻进行聚类"""
         clusters: List[TopicCluster] = []
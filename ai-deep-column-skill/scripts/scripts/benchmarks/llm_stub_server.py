@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线 OpenAI 兼容桩服务（压测 LLM 阶段用，不需要 DeepSeek 密钥）
+
+实现 DeepSeekClient / ArticleWriter 用到的 POST /chat/completions（普通与 SSE 流式），
+按提示词识别请求类型，返回解析器期望格式的确定性输出：
+    批量摘要 -> JSON 数组；分类 -> {"0": "big_tech", ...}；标题批量翻译 -> 每行一条；
+    专栏文章 -> TITLE: 标题 / --- / Markdown 正文；其余 -> 一段中文
+可配置延迟分布、按输出 token 计的生成速度、500 / 429 注入与每分钟请求上限，
+响应带 usage；GET /stats 返回请求数、并发峰值、错误数与 token 合计，POST /stats/reset 清零。
+
+    python benchmarks/llm_stub_server.py --port 8765 --latency lognormal:0.8,0.4 --error-rate 0.02
+    DEEPSEEK_BASE_URL=http://127.0.0.1:8765 DEEPSEEK_API_KEY=stub python main.py --no-publish   # 日报
+    DEEPSEEK_BASE_URL=http://127.0.0.1:8765 DEEPSEEK_API_KEY=stub python main.py auto          # 深度专栏
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional, Tuple
+
+CATEGORIES = ["big_tech", "ai_products", "ai_tech", "ai_gaming", "industry_news"]
+
+_COMPANIES = ["OpenAI", "Google", "Anthropic", "Meta", "Microsoft", "英伟达", "字节跳动", "腾讯"]
+_EVENTS = ["发布新一代模型", "上线智能体平台", "开放 API 接口", "完成新一轮融资", "推出游戏 AI 工具", "更新推理框架"]
+_IMPACTS = ["推理成本明显下降", "开发者接入门槛降低", "行业竞争进一步加剧", "游戏内容生产效率提升", "企业落地进度加快"]
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    延迟分布（秒）：
+        fixed:0.5 | uniform:0.2,1.0 | normal:0.8,0.2 | lognormal:中位数,sigma | exp:均值
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v.strip()] if args else []
+    if kind == "fixed":
+        return lambda rng: values[0] if values else 0.0
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    if kind == "exp":
+        return lambda rng: rng.expovariate(1.0 / values[0])
+    raise ValueError(f"未知延迟分布: {spec}")
+
+
+def count_tokens(text: str) -> int:
+    """粗略计数：中文每字 1 个，其余每 4 个字符 1 个（与限流器的预估口径接近即可）"""
+    cjk = sum(1 for c in text if '\u4e00' <= c <= '\u9fff')
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def _pick(options: list, *keys: str):
+    digest = hashlib.md5("\n".join(keys).encode("utf-8")).digest()
+    return options[int.from_bytes(digest[:4], "big") % len(options)]
+
+
+def _sentence(key: str) -> str:
+    return f"{_pick(_COMPANIES, key, 'c')}{_pick(_EVENTS, key, 'e')}，{_pick(_IMPACTS, key, 'i')}。"
+
+
+def _count_items(text: str, pattern: str) -> int:
+    declared = re.search(r"以下(\d+)条", text)
+    if declared:
+        return int(declared.group(1))
+    return len(re.findall(pattern, text, re.M))
+
+
+def canned_reply(messages: list) -> Tuple[str, str]:
+    """按提示词返回 (请求类型, 确定性输出)"""
+    system = " ".join(str(m.get("content", "")) for m in messages if m.get("role") == "system")
+    user = "\n".join(str(m.get("content", "")) for m in messages if m.get("role") != "system")
+    everything = f"{system}\n{user}"
+
+    if "分类" in everything and "新闻列表" in user:
+        listing = re.search(r"新闻列表：\s*(\[[\s\S]*?\])\s*\n\s*请按", user)
+        try:
+            entries = json.loads(listing.group(1)) if listing else []
+        except ValueError:
+            entries = []
+        result = {str(e.get("index", i)): _pick(CATEGORIES, str(e.get("title", ""))) for i, e in enumerate(entries)}
+        return "classify", json.dumps(result, ensure_ascii=False)
+
+    if "JSON数组" in everything:
+        entries = re.split(r"【新闻\d+】", user)[1:]
+        n = _count_items(user, r"【新闻\d+】")
+        summaries = [_sentence(entries[i] if i < len(entries) else str(i)) for i in range(n)]
+        return "summarize", json.dumps(summaries, ensure_ascii=False)
+
+    if "TITLE:" in user:
+        topic = re.search(r"「(.+?)」", user)
+        topic = topic.group(1) if topic else "AI 行业动态"
+        sections = []
+        for heading in ["事件背景", "核心要点", "行业影响", "未来展望"]:
+            paragraph = "".join(_sentence(f"{topic}/{heading}/{k}") for k in range(4))
+            sections.append(f"## {heading}\n\n{paragraph}")
+        body = f"{_sentence(topic)}\n\n" + "\n\n".join(sections)
+        return "article", f"TITLE: {topic}背后的行业变局\n---\n{body}"
+
+    if "新闻标题" in user and re.search(r"^\d+\. ", user, re.M):
+        titles = re.findall(r"^\d+\. (.+)$", user, re.M)
+        return "translate", "\n".join(f"{_pick(_COMPANIES, t)}：{_pick(_EVENTS, t, 'e')}" for t in titles)
+
+    if "导语" in everything:
+        return "lede", "今日" + _sentence(user) + "与此同时，" + _sentence(user[::-1])
+
+    if "翻译" in everything:
+        return "translate", f"{_pick(_COMPANIES, user)}{_pick(_EVENTS, user, 'e')}"
+
+    if "摘要" in everything:
+        return "summarize", _sentence(user)
+
+    return "other", _sentence(user)
+
+
+class StubStats:
+    """请求统计（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.by_kind = {}
+            self.streamed = 0
+            self.errors = 0
+            self.rate_limited = 0
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+            self.in_flight = 0
+            self.max_in_flight = 0
+
+    def enter(self):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def rejected(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def completed(self, kind: str, streamed: bool, prompt_tokens: int, completion_tokens: int):
+        with self._lock:
+            self.by_kind[kind] = self.by_kind.get(kind, 0) + 1
+            self.streamed += streamed
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests, "by_kind": dict(self.by_kind), "streamed": self.streamed,
+                "errors": self.errors, "rate_limited": self.rate_limited,
+                "prompt_tokens": self.prompt_tokens, "completion_tokens": self.completion_tokens,
+                "max_in_flight": self.max_in_flight,
+            }
+
+
+class StubServer:
+    """
+    桩服务本体，可在基准脚本里以线程方式启动：
+        server = StubServer(latency="fixed:0.3").start(); ...; server.stop()
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: str = "fixed:0",
+                 tokens_per_second: float = 0.0, error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 rpm: int = 0, chunk_chars: int = 20, seed: int = 0):
+        self.sample_latency = parse_latency(latency)
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rpm = rpm
+        self.chunk_chars = max(1, chunk_chars)
+        self.stats = StubStats()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._window = deque()
+        self._window_lock = threading.Lock()
+        self._thread = None
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="llm-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _random(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    def _latency(self) -> float:
+        with self._rng_lock:
+            return self.sample_latency(self._rng)
+
+    def _over_rpm(self) -> bool:
+        if not self.rpm:
+            return False
+        now = time.monotonic()
+        with self._window_lock:
+            while self._window and now - self._window[0] >= 60:
+                self._window.popleft()
+            if len(self._window) >= self.rpm:
+                return True
+            self._window.append(now)
+            return False
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # 保持连接，客户端连接池可复用
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, payload: dict, headers: Optional[dict] = None):
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _error(self, status: int, message: str, kind: str, headers: Optional[dict] = None):
+                self._send_json(status, {"error": {"message": message, "type": kind}}, headers)
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/stats"):
+                    self._send_json(200, stub.stats.snapshot())
+                elif self.path.rstrip("/").endswith("/models"):
+                    self._send_json(200, {"object": "list", "data": [{"id": "stub", "object": "model"}]})
+                else:
+                    self._error(404, "not found", "invalid_request_error")
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                path = self.path.rstrip("/")
+                if path.endswith("/stats/reset"):
+                    stub.stats.reset()
+                    self._send_json(200, {"ok": True})
+                    return
+                if not path.endswith("/chat/completions"):
+                    self._error(404, "not found", "invalid_request_error")
+                    return
+                try:
+                    request = json.loads(raw or b"{}")
+                except ValueError:
+                    self._error(400, "invalid json", "invalid_request_error")
+                    return
+                stub.stats.enter()
+                try:
+                    self._complete(request)
+                finally:
+                    stub.stats.leave()
+
+            def _complete(self, request: dict):
+                if stub._over_rpm() or stub._random() < stub.rate_limit_rate:
+                    stub.stats.rejected("rate_limited")
+                    self._error(429, "rate limit exceeded (stub)", "rate_limit_error", {"Retry-After": "1"})
+                    return
+                if stub._random() < stub.error_rate:
+                    time.sleep(stub._latency())
+                    stub.stats.rejected("errors")
+                    self._error(500, "injected server error (stub)", "server_error")
+                    return
+
+                messages = request.get("messages") or []
+                kind, content = canned_reply(messages)
+                max_tokens = int(request.get("max_tokens") or 0)
+                if max_tokens and count_tokens(content) > max_tokens:
+                    content = content[:max_tokens]
+                prompt_tokens = sum(count_tokens(str(m.get("content", ""))) for m in messages)
+                completion_tokens = count_tokens(content)
+                usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                         "total_tokens": prompt_tokens + completion_tokens}
+                generation = completion_tokens / stub.tokens_per_second if stub.tokens_per_second else 0.0
+                base = {"id": f"chatcmpl-stub-{time.monotonic_ns()}", "created": int(time.time()),
+                        "model": request.get("model") or "stub"}
+
+                time.sleep(stub._latency())
+                if request.get("stream"):
+                    stub.stats.completed(kind, True, prompt_tokens, completion_tokens)
+                    include_usage = (request.get("stream_options") or {}).get("include_usage")
+                    self._stream(base, content, generation, usage if include_usage else None)
+                    return
+
+                time.sleep(generation)
+                stub.stats.completed(kind, False, prompt_tokens, completion_tokens)
+                self._send_json(200, dict(base, object="chat.completion", choices=[{
+                    "index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop",
+                }], usage=usage))
+
+            def _stream(self, base: dict, content: str, generation: float, usage: Optional[dict]):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                def send(payload):
+                    data = f"data: {payload}\n\n".encode("utf-8")
+                    self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                    self.wfile.flush()
+
+                pieces = [content[i:i + stub.chunk_chars] for i in range(0, len(content), stub.chunk_chars)] or [""]
+                delay = generation / len(pieces)
+                chunk = dict(base, object="chat.completion.chunk")
+                send(json.dumps(dict(chunk, choices=[{
+                    "index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None,
+                }]), ensure_ascii=False))
+                for piece in pieces:
+                    if delay:
+                        time.sleep(delay)
+                    send(json.dumps(dict(chunk, choices=[{
+                        "index": 0, "delta": {"content": piece}, "finish_reason": None,
+                    }]), ensure_ascii=False))
+                send(json.dumps(dict(chunk, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])))
+                if usage:
+                    send(json.dumps(dict(chunk, choices=[], usage=usage)))
+                send("[DONE]")
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser):
+    """桩服务参数，基准脚本复用"""
+    parser.add_argument("--latency", default="lognormal:0.8,0.4",
+                        help="首字节延迟分布: fixed:S | uniform:A,B | normal:M,SD | lognormal:中位数,sigma | exp:均值")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="输出生成速度（0 表示瞬时）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="注入 500 错误的概率")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="注入 429 的概率")
+    parser.add_argument("--rpm", type=int, default=0, help="每分钟请求上限，超出返回 429（0 表示不限）")
+    parser.add_argument("--seed", type=int, default=0, help="延迟与错误注入的随机种子")
+
+
+def stub_from_args(args: argparse.Namespace, host: str = "127.0.0.1", port: int = 0) -> StubServer:
+    return StubServer(
+        host=host, port=port, latency=args.latency, tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, rpm=args.rpm, seed=args.seed,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="离线 OpenAI 兼容桩服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_stub_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = stub_from_args(args, args.host, args.port)
+    print(f"桩服务已启动: {server.base_url}（Ctrl+C 退出，GET /stats 查看统计）")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(json.dumps(server.stats.snapshot(), ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
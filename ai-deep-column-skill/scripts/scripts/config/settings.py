@@ -39,6 +39,19 @@ SHARED_DATA_DIR = Path(os.environ.get(
 ))
 SHARED_ARCHIVE_FILE = SHARED_DATA_DIR / "archive.json"
 SHARED_LATEST_FILE = SHARED_DATA_DIR / "latest-24h.json"  # 已过滤的AI新闻
+# buzz 的本机查询服务（shared_query_server.py）socket，为空不启用；服务没开时自动回退读文件
+SHARED_QUERY_SOCKET = os.environ.get("SHARED_QUERY_SOCKET", "")
+SHARED_QUERY_TIMEOUT = float(os.environ.get("SHARED_QUERY_TIMEOUT", "5"))
+
+# 正文缓存：与 ai-daily-report 共用，日报提取过的文章不再重复下载
+CONTENT_CACHE_FILE = Path(os.environ.get("CONTENT_CACHE_FILE", str(SHARED_DATA_DIR / "content-cache.json")))
+CONTENT_CACHE_TTL_HOURS = float(os.environ.get("CONTENT_CACHE_TTL_HOURS", "72"))
+CONTENT_CACHE_MAX_ENTRIES = 3000
+
+# LLM 响应缓存：与 ai-daily-report 共用，相同请求直接返回本地结果；--no-llm-cache 可临时关闭
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "1") != "0"
+LLM_CACHE_FILE = Path(os.environ.get("LLM_CACHE_FILE", str(SHARED_DATA_DIR / "llm-cache.sqlite3")))
+LLM_CACHE_TTL_HOURS = float(os.environ.get("LLM_CACHE_TTL_HOURS", "72"))
 
 # ============== 热点聚类参数 ==============
 CLUSTER_SIMILARITY_THRESHOLD = 0.58  # 标题相似度阈值
@@ -46,6 +59,9 @@ CLUSTER_MIN_ARTICLES = 4             # 最少报道数才算热点
 CLUSTER_TIME_WINDOW_HOURS = 28       # 时间窗口（含缓冲）
 MAX_CANDIDATE_TOPICS = 8             # 最多推送候选话题数
 ARTICLE_WORD_COUNT = "800-1500"      # 专栏文章字数范围
+# 流式生成的原始输出边生成边写入草稿（可 tail -f 查看）；成功后删除，失败时保留供排查，超过天数自动清理
+DRAFTS_DIR = OUTPUT_DIR / "drafts"
+DRAFT_RETENTION_DAYS = 7
 
 # ============== 封面 ==============
 DEFAULT_COVER = DATA_DIR / "default_cover.jpg"
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+LLM 响应缓存
+按 (模型, messages, temperature, max_tokens) 的哈希缓存原始响应，SQLite 存放在共享数据目录，
+ai-daily-report 与 ai-deep-column 共用同一文件，相同调用直接从本地返回
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(model: str, messages: list, temperature: float, max_tokens: int) -> str:
+    payload = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens},
+        ensure_ascii=False, sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """响应缓存（线程安全，多进程共用同一数据库文件）"""
+
+    def __init__(self, db_path: Path, ttl_hours: float = 72):
+        self.db_path = Path(db_path)
+        self.ttl = ttl_hours * 3600
+        self.stats = {"hit": 0, "miss": 0, "tokens_saved": 0}
+        self._lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT NOT NULL,"
+            " response TEXT NOT NULL,"
+            " tokens INTEGER NOT NULL,"
+            " created REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        evicted = self.evict()
+        if evicted:
+            logger.info(f"LLM缓存: 清理过期 {evicted} 条")
+
+    def evict(self) -> int:
+        """删除超过有效期的响应"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM llm_cache WHERE created < ?", (time.time() - self.ttl,))
+        return cursor.rowcount
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, tokens FROM llm_cache WHERE key = ? AND created >= ?",
+                (key, time.time() - self.ttl),
+            ).fetchone()
+            if row is None:
+                self.stats["miss"] += 1
+                return None
+            self.stats["hit"] += 1
+            self.stats["tokens_saved"] += row[1]
+            return row[0]
+
+    def put(self, key: str, model: str, response: str, tokens: int = 0):
+        if not response:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, response, tokens, created) VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, tokens, time.time()),
+            )
+
+    def summary(self) -> str:
+        return (f"LLM缓存: 命中 {self.stats['hit']}，未命中 {self.stats['miss']}，"
+                f"节省tokens {self.stats['tokens_saved']}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -6,6 +6,7 @@ from __future__ import annotations
 import argparse
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import hashlib
+import io
 import json
 import random
 import re
@@ -14,7 +15,7 @@ import xml.etree.ElementTree as ET
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
 from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
 from zoneinfo import ZoneInfo
 
@@ -69,6 +70,22 @@ RSS_FEED_SKIP_EXACT: set[str] = {
     "https://flak.tedunangst.com/rss",
 }
 
+RSS_MAX_FEED_BYTES = 10 * 1024 * 1024
+
+# A source that fails this many runs in a row is skipped until next_retry_at,
+# then probed once (half-open); the backoff doubles on every further failure.
+CIRCUIT_FAILURE_THRESHOLD = 2
+CIRCUIT_BASE_BACKOFF_MINUTES = 120
+CIRCUIT_MAX_BACKOFF_MINUTES = 24 * 60
+CIRCUIT_SCHEDULE_SLACK = timedelta(minutes=5)
+
+# --time-budget-seconds is split across stages by these weights; time a stage
+# does not use flows on to the stages after it.
+TIME_BUDGET_WEIGHTS: dict[str, float] = {"web": 4.0, "opml": 3.0, "translate": 2.0, "waytoagi": 1.0}
+TIME_BUDGET_WRITE_RESERVE_SECONDS = 10.0
+FEED_ENTRY_TAGS = {"item", "entry"}
+FEED_DATE_TAGS = ("pubDate", "published", "updated", "date")
+
 
 @dataclass
 class RawItem:
@@ -187,41 +204,196 @@ def is_mostly_english(text: str) -> bool:
     return len(letters) >= max(6, len(s) // 4)
 
 
-def parse_feed_entries_via_xml(feed_xml: bytes) -> list[dict[str, Any]]:
-    out: list[dict[str, Any]] = []
+class DeadlineExceeded(Exception):
+    pass
+
+
+class Deadline:
+    """Monotonic run deadline checked cooperatively by each stage; no seconds means unlimited."""
+
+    def __init__(self, seconds: float | None = None) -> None:
+        self.expires_at = None if seconds is None else time.monotonic() + max(0.0, seconds)
+
+    def remaining(self) -> float | None:
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def check(self) -> None:
+        if self.expired():
+            raise DeadlineExceeded("deadline exceeded")
+
+    def clamp_timeout(self, timeout: float | None) -> float | None:
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        remaining = max(0.5, remaining)
+        return remaining if timeout is None else min(float(timeout), remaining)
+
+    def child(self, share: float) -> Deadline:
+        remaining = self.remaining()
+        if remaining is None:
+            return Deadline()
+        return Deadline(remaining * min(1.0, max(0.0, share)))
+
+
+def run_deadline(budget_seconds: float) -> Deadline | None:
+    if budget_seconds <= 0:
+        return None
+    return Deadline(max(1.0, budget_seconds - TIME_BUDGET_WRITE_RESERVE_SECONDS))
+
+
+def stage_deadline(
+    deadline: Deadline | None,
+    stage: str,
+    later_stages: tuple[str, ...] = (),
+) -> Deadline | None:
+    if deadline is None:
+        return None
+    weight = TIME_BUDGET_WEIGHTS[stage]
+    total = weight + sum(TIME_BUDGET_WEIGHTS[s] for s in later_stages)
+    return deadline.child(weight / total)
+
+
+class BudgetedSession:
+    """Session proxy that refuses new requests past the deadline and clamps timeouts to it."""
+
+    def __init__(self, session: requests.Session, deadline: Deadline) -> None:
+        self.session = session
+        self.deadline = deadline
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        self.deadline.check()
+        kwargs["timeout"] = self.deadline.clamp_timeout(kwargs.get("timeout"))
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.session, name)
+
+
+class CappedReader:
+    """File-like wrapper over a response body that refuses to read past max_bytes."""
+
+    def __init__(self, raw: Any, max_bytes: int = 0, deadline: Deadline | None = None) -> None:
+        self.raw = raw
+        self.max_bytes = max_bytes
+        self.deadline = deadline
+        self.buffer = bytearray()
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            chunks = []
+            while True:
+                chunk = self.read(64 * 1024)
+                if not chunk:
+                    return b"".join(chunks)
+                chunks.append(chunk)
+        if self.deadline is not None:
+            self.deadline.check()
+        chunk = self.raw.read(size) or b""
+        self.buffer.extend(chunk)
+        if self.max_bytes > 0 and len(self.buffer) > self.max_bytes:
+            raise ValueError(f"Feed exceeds max size ({self.max_bytes} bytes)")
+        return chunk
+
+    def read_all(self) -> bytes:
+        self.read()
+        return bytes(self.buffer)
+
+
+def xml_local_name(tag: Any) -> str:
+    if not isinstance(tag, str):
+        return ""
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_feed_entries(source: Any, now: datetime | None = None) -> Iterator[dict[str, Any]]:
+    # Streams <item>/<entry> nodes and frees each one once read, so large
+    # full-content feeds never sit in memory as a whole tree.
     seen: set[tuple[str, str]] = set()
+    for _event, node in ET.iterparse(source, events=("end",)):
+        if xml_local_name(node.tag) not in FEED_ENTRY_TAGS:
+            continue
+        title = ""
+        link = ""
+        fallback_link = ""
+        dates: dict[str, str] = {}
+        for child in node:
+            name = xml_local_name(child.tag)
+            if name == "title" and not title:
+                title = (child.text or "").strip()
+            elif name == "link":
+                href = (child.get("href") or "").strip()
+                if href and (child.get("rel") or "alternate") == "alternate":
+                    link = link or href
+                else:
+                    fallback_link = fallback_link or href or (child.text or "").strip()
+            elif name in FEED_DATE_TAGS and name not in dates and (child.text or "").strip():
+                dates[name] = child.text.strip()
+        node.clear()
+
+        link = link or fallback_link
+        if not title or not link:
+            continue
+        key = (title, link)
+        if key in seen:
+            continue
+        seen.add(key)
+        published = next((dates[name] for name in FEED_DATE_TAGS if name in dates), None)
+        entry: dict[str, Any] = {"title": title, "link": link, "published": published}
+        if now is not None:
+            entry["published_at"] = parse_date_any(published, now)
+        yield entry
+
+
+def within_horizon(
+    entries: Iterable[dict[str, Any]],
+    keep_after: datetime | None,
+    stop_after_old: int = 0,
+    stats: dict[str, Any] | None = None,
+) -> Iterator[dict[str, Any]]:
+    # Undated entries pass through; callers decide what to do with them.
+    old_streak = 0
+    for entry in entries:
+        published_at = entry.get("published_at")
+        if keep_after is not None and published_at is not None and published_at < keep_after:
+            old_streak += 1
+            if stats is not None:
+                stats["dropped_old"] = int(stats.get("dropped_old") or 0) + 1
+            if stop_after_old > 0 and old_streak >= stop_after_old:
+                if stats is not None:
+                    stats["stopped_early"] = True
+                return
+            continue
+        old_streak = 0
+        yield entry
+
+
+def parse_feed_entries_via_xml(
+    feed_xml: bytes,
+    now: datetime | None = None,
+    keep_after: datetime | None = None,
+    stop_after_old: int = 0,
+) -> list[dict[str, Any]]:
+    out: list[dict[str, Any]] = []
+    entries = iter_feed_entries(io.BytesIO(feed_xml), now)
+    if now is not None:
+        entries = within_horizon(entries, keep_after, stop_after_old)
     try:
-        root = ET.fromstring(feed_xml)
+        for entry in entries:
+            out.append(entry)
     except Exception:
         return out
-
-    for tag in (".//item", ".//{*}item", ".//entry", ".//{*}entry"):
-        for node in root.findall(tag):
-            title = (
-                node.findtext("title")
-                or node.findtext("{*}title")
-                or ""
-            ).strip()
-            link = ""
-            link_node = node.find("link")
-            if link_node is not None:
-                link = (link_node.get("href") or link_node.text or "").strip()
-            if not link:
-                link = (node.findtext("{*}link") or node.findtext("link") or "").strip()
-            published = (
-                node.findtext("pubDate")
-                or node.findtext("{*}pubDate")
-                or node.findtext("published")
-                or node.findtext("{*}published")
-                or node.findtext("updated")
-                or node.findtext("{*}updated")
-            )
-            if title and link:
-                key = (title, link)
-                if key in seen:
-                    continue
-                seen.add(key)
-                out.append({"title": title, "link": link, "published": published})
     return out
 
 
@@ -1430,7 +1602,94 @@ def fetch_newsnow(session: requests.Session, now: datetime) -> list[RawItem]:
     return out
 
 
-def collect_all(session: requests.Session, now: datetime) -> tuple[list[RawItem], list[dict[str, Any]]]:
+def load_source_health(path: Path) -> dict[str, dict[str, Any]]:
+    if not path.exists():
+        return {}
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+    sources = payload.get("sources") if isinstance(payload, dict) else None
+    if not isinstance(sources, dict):
+        return {}
+    return {str(k): v for k, v in sources.items() if isinstance(v, dict)}
+
+
+def circuit_state(health: dict[str, dict[str, Any]] | None, key: str, now: datetime) -> str:
+    record = (health or {}).get(key)
+    if not record or int(record.get("consecutive_failures") or 0) < CIRCUIT_FAILURE_THRESHOLD:
+        return "closed"
+    retry_at = parse_iso(record.get("next_retry_at"))
+    if retry_at and now + CIRCUIT_SCHEDULE_SLACK < retry_at:
+        return "open"
+    return "half_open"
+
+
+def record_source_result(
+    health: dict[str, dict[str, Any]] | None,
+    key: str,
+    now: datetime,
+    error: str | None,
+) -> None:
+    if health is None:
+        return
+    if error is None:
+        # Only failing sources are remembered, so the state file stays small and stable.
+        health.pop(key, None)
+        return
+    record = health.setdefault(key, {})
+    failures = int(record.get("consecutive_failures") or 0) + 1
+    record["consecutive_failures"] = failures
+    record["last_error"] = error[:500]
+    record["last_failure_at"] = iso(now)
+    record["next_retry_at"] = None
+    if failures >= CIRCUIT_FAILURE_THRESHOLD:
+        backoff = min(
+            CIRCUIT_MAX_BACKOFF_MINUTES,
+            CIRCUIT_BASE_BACKOFF_MINUTES * 2 ** (failures - CIRCUIT_FAILURE_THRESHOLD),
+        )
+        record["next_retry_at"] = iso(now + timedelta(minutes=backoff))
+
+
+def circuit_open_status(
+    health: dict[str, dict[str, Any]] | None,
+    key: str,
+) -> dict[str, Any]:
+    record = (health or {}).get(key) or {}
+    return {
+        "ok": False,
+        "item_count": 0,
+        "duration_ms": 0,
+        "error": f"circuit open until {record.get('next_retry_at')}: {record.get('last_error')}",
+        "skipped": True,
+        "skip_reason": "circuit_open",
+        "circuit": "open",
+        "consecutive_failures": int(record.get("consecutive_failures") or 0),
+        "next_retry_at": record.get("next_retry_at"),
+    }
+
+
+def deadline_exceeded_status() -> dict[str, Any]:
+    return {
+        "ok": False,
+        "item_count": 0,
+        "duration_ms": 0,
+        "error": "deadline exceeded",
+        "skipped": True,
+        "skip_reason": "deadline_exceeded",
+        "deadline_exceeded": True,
+    }
+
+
+def collect_all(
+    session: requests.Session,
+    now: datetime,
+    health: dict[str, dict[str, Any]] | None = None,
+    deadline: Deadline | None = None,
+) -> tuple[list[RawItem], list[dict[str, Any]]]:
+    if deadline is not None:
+        session = BudgetedSession(session, deadline)
+
     tasks = [
         ("techurls", "TechURLs", fetch_techurls),
         ("buzzing", "Buzzing", fetch_buzzing),
@@ -1448,16 +1707,29 @@ def collect_all(session: requests.Session, now: datetime) -> tuple[list[RawItem]
     statuses: list[dict[str, Any]] = []
 
     for site_id, site_name, fn in tasks:
+        circuit = circuit_state(health, site_id, now)
+        if circuit == "open":
+            statuses.append({"site_id": site_id, "site_name": site_name, **circuit_open_status(health, site_id)})
+            continue
+        if deadline is not None and deadline.expired():
+            statuses.append({"site_id": site_id, "site_name": site_name, **deadline_exceeded_status()})
+            continue
+
         start = time.perf_counter()
         error = None
         count = 0
+        deadline_exceeded = False
         try:
             items = fn(session, now)
             count = len(items)
             raw_items.extend(items)
         except Exception as exc:
             error = str(exc)
+            # A request cut short by the run deadline is not the source's fault.
+            deadline_exceeded = isinstance(exc, DeadlineExceeded) or bool(deadline and deadline.expired())
         elapsed_ms = int((time.perf_counter() - start) * 1000)
+        if not deadline_exceeded:
+            record_source_result(health, site_id, now, error)
         statuses.append(
             {
                 "site_id": site_id,
@@ -1465,7 +1737,9 @@ def collect_all(session: requests.Session, now: datetime) -> tuple[list[RawItem]
                 "ok": error is None,
                 "item_count": count,
                 "duration_ms": elapsed_ms,
-                "error": error,
+                "error": "deadline exceeded" if deadline_exceeded else error,
+                "circuit": circuit,
+                "deadline_exceeded": deadline_exceeded,
             }
         )
 
@@ -1520,6 +1794,11 @@ def fetch_opml_rss(
     now: datetime,
     opml_path: Path,
     max_feeds: int = 0,
+    keep_after: datetime | None = None,
+    stop_after_old: int = 0,
+    max_feed_bytes: int = RSS_MAX_FEED_BYTES,
+    health: dict[str, dict[str, Any]] | None = None,
+    deadline: Deadline | None = None,
 ) -> tuple[list[RawItem], dict[str, Any], list[dict[str, Any]]]:
     feeds = parse_opml_subscriptions(opml_path)
     if max_feeds > 0:
@@ -1551,6 +1830,19 @@ def fetch_opml_rss(
                 }
             )
             continue
+        if circuit_state(health, resolved_url, now) == "open":
+            feed_statuses.append(
+                {
+                    "site_id": f"opmlrss:{hashlib.sha1(resolved_url.encode('utf-8')).hexdigest()[:10]}",
+                    "site_name": "OPML RSS",
+                    "feed_title": feed["title"],
+                    "feed_url": original_url,
+                    "effective_feed_url": resolved_url,
+                    **circuit_open_status(health, resolved_url),
+                    "replaced": bool(resolved_url != original_url),
+                }
+            )
+            continue
         record = dict(feed)
         record["xml_url_original"] = original_url
         record["xml_url"] = resolved_url
@@ -1562,79 +1854,107 @@ def fetch_opml_rss(
         original_feed_url = str(feed.get("xml_url_original") or feed_url)
         feed_title = feed["title"]
         feed_id = hashlib.sha1(feed_url.encode("utf-8")).hexdigest()[:10]
+        circuit = circuit_state(health, feed_url, now)
+        if deadline is not None and deadline.expired():
+            return [], {
+                "site_id": f"opmlrss:{feed_id}",
+                "site_name": "OPML RSS",
+                "feed_title": feed_title,
+                "feed_url": original_feed_url,
+                "effective_feed_url": feed_url,
+                **deadline_exceeded_status(),
+                "replaced": bool(original_feed_url != feed_url),
+                "circuit": circuit,
+            }
+
         start = time.perf_counter()
         error = None
+        deadline_exceeded = False
         local_items: list[RawItem] = []
+        horizon_stats: dict[str, Any] = {"dropped_old": 0, "stopped_early": False}
 
         try:
-            resp = requests.get(
+            with requests.get(
                 feed_url,
-                timeout=12,
+                timeout=deadline.clamp_timeout(12) if deadline is not None else 12,
+                stream=True,
                 headers={
                     "User-Agent": BROWSER_UA,
                     "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
                 },
-            )
-            resp.raise_for_status()
+            ) as resp:
+                resp.raise_for_status()
+                declared_size = resp.headers.get("Content-Length") or ""
+                if max_feed_bytes > 0 and declared_size.isdigit() and int(declared_size) > max_feed_bytes:
+                    raise ValueError(f"Feed exceeds max size ({max_feed_bytes} bytes)")
+                resp.raw.decode_content = True
+                reader = CappedReader(resp.raw, max_feed_bytes, deadline)
 
-            if feedparser is not None:
-                parsed = feedparser.parse(resp.content)
-                source_name = first_non_empty(
-                    feed_title,
-                    getattr(parsed, "feed", {}).get("title"),
-                    host_of_url(feed_url),
-                )
-                entries = parsed.entries
-                for entry in entries:
-                    title = str(entry.get("title", "")).strip()
-                    link = str(entry.get("link", "")).strip()
-                    if not title or not link:
-                        continue
-                    published = (
-                        parse_date_any(entry.get("published"), now)
-                        or parse_date_any(entry.get("updated"), now)
-                        or parse_date_any(entry.get("pubDate"), now)
+                source_name = first_non_empty(feed_title, host_of_url(feed_url))
+                entries: list[dict[str, Any]] = []
+                parse_error: Exception | None = None
+                try:
+                    for entry in within_horizon(
+                        iter_feed_entries(reader, now), keep_after, stop_after_old, horizon_stats
+                    ):
+                        entries.append(entry)
+                except ET.ParseError as exc:
+                    parse_error = exc
+                except DeadlineExceeded:
+                    # Keep the entries streamed so far.
+                    deadline_exceeded = True
+
+                # Malformed feeds: let feedparser's lenient parser have the whole body.
+                if parse_error is not None and feedparser is not None:
+                    parsed = feedparser.parse(reader.read_all())
+                    source_name = first_non_empty(
+                        feed_title,
+                        getattr(parsed, "feed", {}).get("title"),
+                        host_of_url(feed_url),
                     )
-                    if not published:
-                        continue
-                    local_items.append(
-                        RawItem(
-                            site_id="opmlrss",
-                            site_name="OPML RSS",
-                            source=source_name,
-                            title=title,
-                            url=link,
-                            published_at=published,
-                            meta={
-                                "feed_url": feed_url,
-                                "feed_home": feed.get("html_url") or "",
-                            },
-                        )
+                    fallback_entries = (
+                        {
+                            "title": str(entry.get("title", "")).strip(),
+                            "link": str(entry.get("link", "")).strip(),
+                            "published_at": (
+                                parse_date_any(entry.get("published"), now)
+                                or parse_date_any(entry.get("updated"), now)
+                                or parse_date_any(entry.get("pubDate"), now)
+                            ),
+                        }
+                        for entry in parsed.entries
                     )
-            else:
-                source_name = first_non_empty(feed_title, host_of_url(feed_url))
-                entries = parse_feed_entries_via_xml(resp.content)
-                for entry in entries:
-                    published = parse_date_any(entry.get("published"), now)
-                    if not published:
-                        continue
-                    local_items.append(
-                        RawItem(
-                            site_id="opmlrss",
-                            site_name="OPML RSS",
-                            source=source_name,
-                            title=entry.get("title", ""),
-                            url=entry.get("link", ""),
-                            published_at=published,
-                            meta={
-                                "feed_url": feed_url,
-                                "feed_home": feed.get("html_url") or "",
-                            },
-                        )
+                    horizon_stats = {"dropped_old": 0, "stopped_early": False}
+                    entries = list(within_horizon(fallback_entries, keep_after, stop_after_old, horizon_stats))
+                elif parse_error is not None and not entries:
+                    raise parse_error
+
+            for entry in entries:
+                title = entry.get("title", "")
+                link = entry.get("link", "")
+                published = entry.get("published_at")
+                if not title or not link or not published:
+                    continue
+                local_items.append(
+                    RawItem(
+                        site_id="opmlrss",
+                        site_name="OPML RSS",
+                        source=source_name,
+                        title=title,
+                        url=link,
+                        published_at=published,
+                        meta={
+                            "feed_url": feed_url,
+                            "feed_home": feed.get("html_url") or "",
+                        },
                     )
+                )
         except Exception as exc:
             error = str(exc)
+            deadline_exceeded = isinstance(exc, DeadlineExceeded) or bool(deadline and deadline.expired())
 
+        if deadline_exceeded:
+            error = "deadline exceeded"
         duration_ms = int((time.perf_counter() - start) * 1000)
         status = {
             "site_id": f"opmlrss:{feed_id}",
@@ -1649,6 +1969,10 @@ def fetch_opml_rss(
             "skipped": False,
             "skip_reason": None,
             "replaced": bool(original_feed_url != feed_url),
+            "dropped_old_count": int(horizon_stats.get("dropped_old") or 0),
+            "stopped_early": bool(horizon_stats.get("stopped_early")),
+            "circuit": circuit,
+            "deadline_exceeded": deadline_exceeded,
         }
         return local_items, status
 
@@ -1660,12 +1984,16 @@ def fetch_opml_rss(
                 items, status = future.result()
                 out.extend(items)
                 feed_statuses.append(status)
+                if not status.get("deadline_exceeded"):
+                    record_source_result(health, str(status["effective_feed_url"]), now, status["error"])
 
     feed_statuses.sort(key=lambda x: str(x.get("feed_title") or x.get("feed_url") or ""))
     total_duration_ms = sum(int(s.get("duration_ms") or 0) for s in feed_statuses)
     ok_feeds = sum(1 for s in feed_statuses if s["ok"])
     failed_feeds = sum(1 for s in feed_statuses if not s["ok"])
     skipped_feeds = sum(1 for s in feed_statuses if s.get("skipped"))
+    circuit_open_feeds = sum(1 for s in feed_statuses if s.get("skip_reason") == "circuit_open")
+    deadline_exceeded_feeds = sum(1 for s in feed_statuses if s.get("deadline_exceeded"))
     replaced_feeds = sum(1 for s in feed_statuses if s.get("replaced"))
 
     summary_status = {
@@ -1681,7 +2009,11 @@ def fetch_opml_rss(
         "ok_feed_count": ok_feeds,
         "failed_feed_count": failed_feeds,
         "skipped_feed_count": skipped_feeds,
+        "circuit_open_feed_count": circuit_open_feeds,
+        "deadline_exceeded_feed_count": deadline_exceeded_feeds,
+        "deadline_exceeded": deadline_exceeded_feeds > 0,
         "replaced_feed_count": replaced_feeds,
+        "dropped_old_count": sum(int(s.get("dropped_old_count") or 0) for s in feed_statuses),
     }
     return out, summary_status, feed_statuses
 
@@ -1943,7 +2275,12 @@ def add_bilingual_fields(
     session: requests.Session,
     cache: dict[str, str],
     max_new_translations: int,
+    deadline: Deadline | None = None,
+    stats: dict[str, Any] | None = None,
 ) -> tuple[list[dict[str, Any]], list[dict[str, Any]], dict[str, str]]:
+    if deadline is not None:
+        session = BudgetedSession(session, deadline)
+
     zh_by_url: dict[str, str] = {}
     for it in items_all:
         title = str(it.get("title") or "").strip()
@@ -1952,9 +2289,10 @@ def add_bilingual_fields(
             zh_by_url[url] = title
 
     translated_now = 0
+    deadline_exceeded = False
 
     def enrich(item: dict[str, Any], allow_translate: bool) -> dict[str, Any]:
-        nonlocal translated_now
+        nonlocal translated_now, deadline_exceeded
         out = dict(item)
         title = str(out.get("title") or "").strip()
         url = normalize_url(str(out.get("url") or ""))
@@ -1976,6 +2314,11 @@ def add_bilingual_fields(
         zh_title = zh_by_url.get(url)
         if not zh_title:
             zh_title = cache.get(title)
+        if not zh_title and allow_translate and translated_now < max_new_translations:
+            # Out of time: keep the item untranslated rather than holding up the run.
+            if deadline is not None and deadline.expired():
+                deadline_exceeded = True
+                allow_translate = False
         if not zh_title and allow_translate and translated_now < max_new_translations:
             tr = translate_to_zh_cn(session, title)
             if tr and has_cjk(tr):
@@ -1990,6 +2333,9 @@ def add_bilingual_fields(
 
     ai_out = [enrich(it, allow_translate=True) for it in items_ai]
     all_out = [enrich(it, allow_translate=False) for it in items_all]
+    if stats is not None:
+        stats["translated"] = translated_now
+        stats["deadline_exceeded"] = deadline_exceeded
     return ai_out, all_out, cache
 
 
@@ -2023,59 +2369,9 @@ def dedupe_items_by_title_url(items: list[dict[str, Any]], random_pick: bool = T
     return out
 
 
-def main() -> int:
-    parser = argparse.ArgumentParser(description="Aggregate AI news updates from multiple sources")
-    parser.add_argument("--output-dir", default="data", help="Directory for output JSON files")
-    parser.add_argument("--window-hours", type=int, default=24, help="24h window size")
-    parser.add_argument("--archive-days", type=int, default=45, help="Keep archive for N days")
-    parser.add_argument("--translate-max-new", type=int, default=80, help="Max new EN->ZH title translations per run")
-    parser.add_argument("--rss-opml", default="", help="Optional OPML file path to include RSS sources")
-    parser.add_argument("--rss-max-feeds", type=int, default=0, help="Optional max OPML RSS feeds to fetch (0 means all)")
-    args = parser.parse_args()
-
-    now = utc_now()
-    output_dir = Path(args.output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    archive_path = output_dir / "archive.json"
-    latest_path = output_dir / "latest-24h.json"
-    status_path = output_dir / "source-status.json"
-    waytoagi_path = output_dir / "waytoagi-7d.json"
-    title_cache_path = output_dir / "title-zh-cache.json"
-
-    archive = load_archive(archive_path)
-
-    session = create_session()
-    raw_items, statuses = collect_all(session, now)
-    rss_feed_statuses: list[dict[str, Any]] = []
-
-    if args.rss_opml:
-        opml_path = Path(args.rss_opml).expanduser()
-        if opml_path.exists():
-            rss_items, rss_summary_status, rss_feed_statuses = fetch_opml_rss(
-                now,
-                opml_path,
-                max_feeds=max(0, int(args.rss_max_feeds)),
-            )
-            raw_items.extend(rss_items)
-            statuses.append(rss_summary_status)
-        else:
-            statuses.append(
-                {
-                    "site_id": "opmlrss",
-                    "site_name": "OPML RSS",
-                    "ok": False,
-                    "item_count": 0,
-                    "duration_ms": 0,
-                    "error": f"OPML not found: {opml_path}",
-                    "feed_count": 0,
-                    "ok_feed_count": 0,
-                    "failed_feed_count": 0,
-                }
-            )
-
+def upsert_archive(archive: dict[str, dict[str, Any]], raw_items: list[RawItem], now: datetime) -> set[str]:
+    """Merge this run's items into the archive in place; returns the ids seen this run."""
     seen_this_run: set[str] = set()
-
     for raw in raw_items:
         title = raw.title.strip()
         url = normalize_url(raw.url)
@@ -2111,9 +2407,12 @@ def main() -> int:
                 if raw.site_id == "opmlrss" or not existing.get("published_at"):
                     existing["published_at"] = iso(raw.published_at)
             existing["last_seen_at"] = iso(now)
+    return seen_this_run
 
-    # Prune old archive
-    keep_after = now - timedelta(days=args.archive_days)
+
+def prune_archive(archive: dict[str, dict[str, Any]], now: datetime, archive_days: int) -> dict[str, dict[str, Any]]:
+    """Drop records not seen (or published) within the last archive_days."""
+    keep_after = now - timedelta(days=archive_days)
     pruned: dict[str, dict[str, Any]] = {}
     for item_id, record in archive.items():
         ts = (
@@ -2124,10 +2423,12 @@ def main() -> int:
         )
         if ts >= keep_after:
             pruned[item_id] = record
-    archive = pruned
+    return pruned
+
 
-    # 24h view
-    window_start = now - timedelta(hours=args.window_hours)
+def build_window(archive: dict[str, dict[str, Any]], now: datetime, window_hours: int) -> list[dict[str, Any]]:
+    """Records whose event time falls in the window, display-normalized, newest first."""
+    window_start = now - timedelta(hours=window_hours)
     latest_items_all: list[dict[str, Any]] = []
     for record in archive.values():
         ts = event_time(record)
@@ -2150,19 +2451,20 @@ def main() -> int:
     latest_items_all = normalize_aihubtoday_records(latest_items_all)
 
     latest_items_all.sort(key=lambda x: event_time(x) or datetime.min.replace(tzinfo=UTC), reverse=True)
-    latest_items = [record for record in latest_items_all if is_ai_related_record(record)]
-    title_cache = load_title_zh_cache(title_cache_path)
-    latest_items, latest_items_all, title_cache = add_bilingual_fields(
-        latest_items,
-        latest_items_all,
-        session,
-        title_cache,
-        max_new_translations=max(0, args.translate_max_new),
-    )
-    latest_items_ai_dedup = dedupe_items_by_title_url(latest_items, random_pick=False)
-    latest_items_all_dedup = dedupe_items_by_title_url(latest_items_all, random_pick=True)
+    return latest_items_all
 
-    # site stats
+
+def build_latest_payload(
+    now: datetime,
+    window_hours: int,
+    archive_total: int,
+    latest_items: list[dict[str, Any]],
+    latest_items_all: list[dict[str, Any]],
+    latest_items_ai_dedup: list[dict[str, Any]],
+    latest_items_all_dedup: list[dict[str, Any]],
+    statuses: list[dict[str, Any]],
+) -> dict[str, Any]:
+    """latest-24h.json body, including per-site counts."""
     site_stat: dict[str, dict[str, Any]] = {}
     raw_count_by_site: dict[str, int] = {}
     for record in latest_items_all:
@@ -2198,15 +2500,15 @@ def main() -> int:
             "raw_count": raw_count_by_site.get(sid, 0),
         }
 
-    latest_payload = {
+    return {
         "generated_at": iso(now),
-        "window_hours": args.window_hours,
+        "window_hours": window_hours,
         "total_items": len(latest_items_ai_dedup),
         "total_items_ai_raw": len(latest_items),
         "total_items_raw": len(latest_items_all),
         "total_items_all_mode": len(latest_items_all_dedup),
         "topic_filter": "ai_tech_robotics",
-        "archive_total": len(archive),
+        "archive_total": archive_total,
         "site_count": len(site_stat),
         "source_count": len({f"{i['site_id']}::{i['source']}" for i in latest_items_ai_dedup}),
         "site_stats": sorted(site_stat.values(), key=lambda x: x["count"], reverse=True),
@@ -2216,7 +2518,10 @@ def main() -> int:
         "items_all": latest_items_all_dedup,
     }
 
-    archive_payload = {
+
+def build_archive_payload(archive: dict[str, dict[str, Any]], now: datetime) -> dict[str, Any]:
+    """archive.json body: every record, most recently seen first."""
+    return {
         "generated_at": iso(now),
         "total_items": len(archive),
         "items": sorted(
@@ -2226,12 +2531,190 @@ def main() -> int:
         ),
     }
 
+
+ARCHIVE_SHARD_DIRNAME = "archive-days"
+ARCHIVE_SHARD_UNDATED = "undated"
+_UTC_ISO_RE = re.compile(r"^\d{4}-\d{2}-\d{2}T[^+]*Z$")
+
+
+def archive_shard_day(record: dict[str, Any]) -> str:
+    """UTC day of the record's latest timestamp; a reader with cutoff C only needs shards >= C's day."""
+    days = []
+    for key in ("last_seen_at", "published_at", "first_seen_at"):
+        value = record.get(key)
+        if not value:
+            continue
+        # iso() output is already UTC, so its date prefix is the day; anything else goes through the parser.
+        if isinstance(value, str) and _UTC_ISO_RE.match(value):
+            days.append(value[:10])
+        else:
+            dt = parse_iso(str(value))
+            if dt:
+                days.append(dt.date().isoformat())
+    return max(days) if days else ARCHIVE_SHARD_UNDATED
+
+
+def write_json_atomic(path: Path, payload: Any) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp_path.replace(path)
+
+
+def write_archive_shards(shard_dir: Path, items: list[dict[str, Any]], now: datetime) -> dict[str, int]:
+    """Split archive items (archive.json order) into per-day files plus index.json.
+
+    Lets downstream readers that only want the last day or two skip parsing the whole archive.
+    index.json is written last, so a reader that finds it older than archive.json knows the
+    shards are stale and falls back to archive.json.
+    """
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    shards: dict[str, list[dict[str, Any]]] = {}
+    for record in items:
+        shards.setdefault(archive_shard_day(record), []).append(record)
+
+    for day, records in shards.items():
+        write_json_atomic(shard_dir / f"{day}.json", {"day": day, "items": records})
+    for stale in shard_dir.glob("*.json"):
+        if stale.name != "index.json" and stale.stem not in shards:
+            stale.unlink()
+
+    counts = {day: len(shards[day]) for day in sorted(shards, reverse=True)}
+    write_json_atomic(
+        shard_dir / "index.json",
+        {
+            "version": 1,
+            "generated_at": iso(now),
+            "shard_key": "utc_date(max(last_seen_at, published_at, first_seen_at))",
+            "total_items": len(items),
+            "days": counts,
+        },
+    )
+    return counts
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Aggregate AI news updates from multiple sources")
+    parser.add_argument("--output-dir", default="data", help="Directory for output JSON files")
+    parser.add_argument("--window-hours", type=int, default=24, help="24h window size")
+    parser.add_argument("--archive-days", type=int, default=45, help="Keep archive for N days")
+    parser.add_argument("--translate-max-new", type=int, default=80, help="Max new EN->ZH title translations per run")
+    parser.add_argument("--rss-opml", default="", help="Optional OPML file path to include RSS sources")
+    parser.add_argument("--rss-max-feeds", type=int, default=0, help="Optional max OPML RSS feeds to fetch (0 means all)")
+    parser.add_argument(
+        "--rss-stop-after-old",
+        type=int,
+        default=0,
+        help="Stop reading a feed after N consecutive entries older than --archive-days (0 disables)",
+    )
+    parser.add_argument(
+        "--rss-max-feed-bytes",
+        type=int,
+        default=RSS_MAX_FEED_BYTES,
+        help="Abort OPML feeds larger than this many bytes (0 disables)",
+    )
+    parser.add_argument(
+        "--time-budget-seconds",
+        type=float,
+        default=0,
+        help="Overall run deadline; pending work is dropped and partial results written (0 disables)",
+    )
+    args = parser.parse_args()
+
+    now = utc_now()
+    deadline = run_deadline(args.time_budget_seconds)
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    archive_path = output_dir / "archive.json"
+    latest_path = output_dir / "latest-24h.json"
+    status_path = output_dir / "source-status.json"
+    waytoagi_path = output_dir / "waytoagi-7d.json"
+    title_cache_path = output_dir / "title-zh-cache.json"
+    health_path = output_dir / "source-health.json"
+
+    archive = load_archive(archive_path)
+    health = load_source_health(health_path)
+
+    session = create_session()
+    raw_items, statuses = collect_all(
+        session,
+        now,
+        health,
+        deadline=stage_deadline(deadline, "web", ("opml", "translate", "waytoagi")),
+    )
+    rss_feed_statuses: list[dict[str, Any]] = []
+
+    if args.rss_opml:
+        opml_path = Path(args.rss_opml).expanduser()
+        if opml_path.exists():
+            rss_items, rss_summary_status, rss_feed_statuses = fetch_opml_rss(
+                now,
+                opml_path,
+                max_feeds=max(0, int(args.rss_max_feeds)),
+                keep_after=now - timedelta(days=args.archive_days),
+                stop_after_old=max(0, int(args.rss_stop_after_old)),
+                max_feed_bytes=max(0, int(args.rss_max_feed_bytes)),
+                health=health,
+                deadline=stage_deadline(deadline, "opml", ("translate", "waytoagi")),
+            )
+            raw_items.extend(rss_items)
+            statuses.append(rss_summary_status)
+        else:
+            statuses.append(
+                {
+                    "site_id": "opmlrss",
+                    "site_name": "OPML RSS",
+                    "ok": False,
+                    "item_count": 0,
+                    "duration_ms": 0,
+                    "error": f"OPML not found: {opml_path}",
+                    "feed_count": 0,
+                    "ok_feed_count": 0,
+                    "failed_feed_count": 0,
+                }
+            )
+
+    upsert_archive(archive, raw_items, now)
+    archive = prune_archive(archive, now, args.archive_days)
+
+    latest_items_all = build_window(archive, now, args.window_hours)
+    latest_items = [record for record in latest_items_all if is_ai_related_record(record)]
+    title_cache = load_title_zh_cache(title_cache_path)
+    translation_stats: dict[str, Any] = {}
+    latest_items, latest_items_all, title_cache = add_bilingual_fields(
+        latest_items,
+        latest_items_all,
+        session,
+        title_cache,
+        max_new_translations=max(0, args.translate_max_new),
+        deadline=stage_deadline(deadline, "translate", ("waytoagi",)),
+        stats=translation_stats,
+    )
+    latest_items_ai_dedup = dedupe_items_by_title_url(latest_items, random_pick=False)
+    latest_items_all_dedup = dedupe_items_by_title_url(latest_items_all, random_pick=True)
+
+    latest_payload = build_latest_payload(
+        now,
+        args.window_hours,
+        len(archive),
+        latest_items,
+        latest_items_all,
+        latest_items_ai_dedup,
+        latest_items_all_dedup,
+        statuses,
+    )
+    archive_payload = build_archive_payload(archive, now)
+
     status_payload = {
         "generated_at": iso(now),
         "sites": statuses,
         "successful_sites": sum(1 for s in statuses if s["ok"]),
         "failed_sites": [s["site_id"] for s in statuses if not s["ok"]],
+        "circuit_open_sites": [s["site_id"] for s in statuses if s.get("skip_reason") == "circuit_open"],
         "zero_item_sites": [s["site_id"] for s in statuses if s.get("ok") and int(s.get("item_count") or 0) == 0],
+        "deadline_exceeded_sites": [s["site_id"] for s in statuses if s.get("deadline_exceeded")],
+        "source_health": health,
+        "translation": translation_stats,
         "fetched_raw_items": len(raw_items),
         "items_before_topic_filter": len(latest_items_all),
         "items_in_24h": len(latest_items_ai_dedup),
@@ -2242,6 +2725,18 @@ def main() -> int:
             "effective_feed_total": sum(1 for s in rss_feed_statuses if not s.get("skipped")),
             "ok_feeds": sum(1 for s in rss_feed_statuses if s["ok"] and not s.get("skipped")),
             "failed_feeds": [s.get("effective_feed_url") or s["feed_url"] for s in rss_feed_statuses if not s["ok"]],
+            "deadline_exceeded_feeds": [
+                s.get("effective_feed_url") or s["feed_url"] for s in rss_feed_statuses if s.get("deadline_exceeded")
+            ],
+            "circuit_open_feeds": [
+                {
+                    "feed_url": s.get("effective_feed_url") or s["feed_url"],
+                    "consecutive_failures": s.get("consecutive_failures"),
+                    "next_retry_at": s.get("next_retry_at"),
+                }
+                for s in rss_feed_statuses
+                if s.get("skip_reason") == "circuit_open"
+            ],
             "zero_item_feeds": [
                 s.get("effective_feed_url") or s["feed_url"]
                 for s in rss_feed_statuses
@@ -2250,7 +2745,7 @@ def main() -> int:
             "skipped_feeds": [
                 {"feed_url": s["feed_url"], "reason": s.get("skip_reason")}
                 for s in rss_feed_statuses
-                if s.get("skipped")
+                if s.get("skipped") and s.get("skip_reason") != "circuit_open"
             ],
             "replaced_feeds": [
                 {"from": s["feed_url"], "to": s.get("effective_feed_url")}
@@ -2261,9 +2756,18 @@ def main() -> int:
         },
     }
 
+    waytoagi_deadline = stage_deadline(deadline, "waytoagi")
     try:
-        waytoagi_payload = fetch_waytoagi_recent_7d(session, now, WAYTOAGI_DEFAULT)
+        waytoagi_payload = fetch_waytoagi_recent_7d(
+            BudgetedSession(session, waytoagi_deadline) if waytoagi_deadline else session,
+            now,
+            WAYTOAGI_DEFAULT,
+        )
+        waytoagi_payload["deadline_exceeded"] = False
     except Exception as exc:
+        waytoagi_deadline_exceeded = isinstance(exc, DeadlineExceeded) or bool(
+            waytoagi_deadline and waytoagi_deadline.expired()
+        )
         waytoagi_payload = {
             "generated_at": iso(now),
             "timezone": "Asia/Shanghai",
@@ -2274,20 +2778,42 @@ def main() -> int:
             "updates_7d": [],
             "warning": "WaytoAGI 近7日更新抓取失败",
             "has_error": True,
-            "error": str(exc),
+            "error": "deadline exceeded" if waytoagi_deadline_exceeded else str(exc),
+            "deadline_exceeded": waytoagi_deadline_exceeded,
         }
 
+    status_payload["time_budget"] = {
+        "seconds": args.time_budget_seconds if deadline else None,
+        "deadline_exceeded": [
+            stage
+            for stage, exceeded in (
+                ("web", any(s.get("deadline_exceeded") for s in statuses if s["site_id"] != "opmlrss")),
+                ("opml", any(s.get("deadline_exceeded") for s in rss_feed_statuses)),
+                ("translate", bool(translation_stats.get("deadline_exceeded"))),
+                ("waytoagi", bool(waytoagi_payload.get("deadline_exceeded"))),
+            )
+            if exceeded
+        ],
+    }
+
     latest_path.write_text(json.dumps(latest_payload, ensure_ascii=False, indent=2), encoding="utf-8")
     archive_path.write_text(json.dumps(archive_payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    shard_counts = write_archive_shards(output_dir / ARCHIVE_SHARD_DIRNAME, archive_payload["items"], now)
     status_path.write_text(json.dumps(status_payload, ensure_ascii=False, indent=2), encoding="utf-8")
     waytoagi_path.write_text(json.dumps(waytoagi_payload, ensure_ascii=False, indent=2), encoding="utf-8")
     title_cache_path.write_text(json.dumps(title_cache, ensure_ascii=False, indent=2), encoding="utf-8")
+    health_path.write_text(
+        json.dumps({"generated_at": iso(now), "sources": health}, ensure_ascii=False, indent=2),
+        encoding="utf-8",
+    )
 
     print(f"Wrote: {latest_path} ({len(latest_items)} items)")
     print(f"Wrote: {archive_path} ({len(archive)} items)")
+    print(f"Wrote: {output_dir / ARCHIVE_SHARD_DIRNAME} ({len(shard_counts)} day shards)")
     print(f"Wrote: {status_path}")
     print(f"Wrote: {waytoagi_path} ({waytoagi_payload.get('count_7d', 0)} items)")
     print(f"Wrote: {title_cache_path} ({len(title_cache)} entries)")
+    print(f"Wrote: {health_path} ({len(health)} failing sources)")
 
     return 0
 
@@ -69,22 +69,30 @@ EXISTING=$(crontab -l 2>/dev/null | grep -v "ai-news\|ai-hourly-buzz\|ai-daily-r
 # 环境变量加载：从 buzz 的 .env 读取
 ENV_LOADER="set -a; source $BUZZ_DIR/.env 2>/dev/null; set +a;"
 
+# 共享数据查询服务：buzz 整点采集后若没在运行就拉起，日报通过它读取数据（服务不在时自动回退读文件）
+QUERY_SOCKET="$BUZZ_DIR/data/shared-query.sock"
+
 NEW_CRON="$EXISTING
 
 # === AI News Server (auto-generated by setup_cron.sh) ===
 # ai-hourly-buzz: 每小时整点运行
-0 * * * * $ENV_LOADER cd $BUZZ_DIR && $PYTHON scripts/main.py --output-dir data >> $LOG_DIR/buzz.log 2>&1
+0 * * * * $ENV_LOADER cd $BUZZ_DIR && $PYTHON scripts/main.py --output-dir data --query-socket $QUERY_SOCKET >> $LOG_DIR/buzz.log 2>&1
+
+# ai-daily-report 预摘要: 每小时第 20 分钟（buzz 采集之后），提前生成摘要，7:00 日报直接复用
+20 * * * * $ENV_LOADER cd $REPORT_DIR/scripts && SHARED_DATA_DIR=$BUZZ_DIR/data SHARED_QUERY_SOCKET=$QUERY_SOCKET $PYTHON main.py --presummarize >> $LOG_DIR/presummary.log 2>&1
 
 # ai-daily-report: 每天北京时间 7:00 (UTC 23:00 前一天)
-0 23 * * * $ENV_LOADER SHARED_DATA_DIR=$BUZZ_DIR/data cd $REPORT_DIR/scripts && $PYTHON main.py >> $LOG_DIR/daily-report.log 2>&1
+0 23 * * * $ENV_LOADER cd $REPORT_DIR/scripts && SHARED_DATA_DIR=$BUZZ_DIR/data SHARED_QUERY_SOCKET=$QUERY_SOCKET $PYTHON main.py >> $LOG_DIR/daily-report.log 2>&1
 "
 
 echo "$NEW_CRON" | crontab -
 
 echo "cron 任务已写入："
 echo "  - ai-hourly-buzz:   每小时整点"
+echo "  - 日报预摘要:       每小时第 20 分钟"
 echo "  - ai-daily-report:  每天 UTC 23:00（北京时间 7:00）"
 echo ""
+echo "共享数据查询服务: $QUERY_SOCKET（整点采集后自动拉起）"
 echo "日志目录: $LOG_DIR"
 echo ""
 echo "=== 部署完成 ==="
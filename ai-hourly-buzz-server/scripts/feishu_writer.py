@@ -3,6 +3,9 @@
 将 latest-24h.json 中的新条目追加写入飞书多维表格（Bitable）。
 通过对比上次写入的记录 ID，只写入本次新增的条目，避免重复。
 
+upsert 模式下额外对已写入条目做字段哈希比对，只把内容有变化的行
+（如 title_zh 晚到、OPML 修正了 published_at）通过 batch_update 更新。
+
 环境变量：
     FEISHU_APP_ID        飞书自建应用 App ID
     FEISHU_APP_SECRET    飞书自建应用 App Secret
@@ -12,9 +15,14 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 import os
+import random
+import threading
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 from typing import Any
@@ -29,78 +37,279 @@ FEISHU_APP_SECRET = os.environ.get("FEISHU_APP_SECRET", "")
 FEISHU_BITABLE_TOKEN = os.environ.get("FEISHU_BITABLE_TOKEN", "")
 FEISHU_TABLE_ID = os.environ.get("FEISHU_TABLE_ID", "")
 
-_token_cache: dict[str, Any] = {"token": "", "expires_at": 0}
+BATCH_SIZE = 500          # batch_create 单次上限
+MAX_WORKERS = 4           # 并发写入的批次数
+MAX_RETRIES = 5           # 限流 / 5xx 时的最大重试次数
+WRITTEN_IDS_MAX = 5000    # 已写入 ID 缓存上限，按写入时间淘汰最旧的
+RATE_LIMIT_CODES = {99991400}
+SYNC_MODES = ("append", "upsert")
 
+class _FeishuAPIError(ValueError):
+    """飞书返回了明确的业务错误码，重试无意义"""
 
-def _get_tenant_access_token() -> str:
-    """获取飞书 tenant_access_token，有效期内复用缓存"""
-    now = time.time()
-    if _token_cache["token"] and _token_cache["expires_at"] > now + 60:
-        return _token_cache["token"]
 
-    resp = requests.post(
-        "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal",
-        json={"app_id": FEISHU_APP_ID, "app_secret": FEISHU_APP_SECRET},
-        timeout=10,
-    )
-    resp.raise_for_status()
-    data = resp.json()
-    if data.get("code") != 0:
-        raise RuntimeError(f"飞书鉴权失败: {data}")
+_token_cache: dict[str, Any] = {"token": "", "expires_at": 0}
+_token_lock = threading.Lock()
 
-    _token_cache["token"] = data["tenant_access_token"]
-    _token_cache["expires_at"] = now + int(data.get("expire", 7200))
-    return _token_cache["token"]
 
+def _load_token_file(token_path: Path | None) -> None:
+    if token_path is None or not token_path.exists():
+        return
+    try:
+        data = json.loads(token_path.read_text(encoding="utf-8"))
+    except Exception:
+        return
+    # app_id 变更后旧 token 作废
+    if isinstance(data, dict) and data.get("app_id") == FEISHU_APP_ID:
+        _token_cache["token"] = str(data.get("token") or "")
+        _token_cache["expires_at"] = float(data.get("expires_at") or 0)
+
+
+def _save_token_file(token_path: Path | None) -> None:
+    if token_path is None:
+        return
+    payload = {
+        "app_id": FEISHU_APP_ID,
+        "token": _token_cache["token"],
+        "expires_at": _token_cache["expires_at"],
+    }
+    # 先写 0600 的临时文件再替换，token 任何时刻都不会以默认权限落盘
+    tmp_path = token_path.with_suffix(token_path.suffix + ".tmp")
+    try:
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.fchmod(fd, 0o600)  # 残留的旧临时文件保持原权限，这里显式收紧
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(json.dumps(payload))
+        tmp_path.replace(token_path)
+    except Exception as exc:
+        print(f"[Feishu] token 缓存写入失败: {exc}")
+
+
+def _get_tenant_access_token(token_path: Path | None = None) -> str:
+    """获取飞书 tenant_access_token，有效期内复用内存或磁盘缓存"""
+    with _token_lock:
+        now = time.time()
+        if not _token_cache["token"]:
+            _load_token_file(token_path)
+        if _token_cache["token"] and _token_cache["expires_at"] > now + 60:
+            return _token_cache["token"]
+
+        resp = requests.post(
+            "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal",
+            json={"app_id": FEISHU_APP_ID, "app_secret": FEISHU_APP_SECRET},
+            timeout=10,
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        if data.get("code") != 0:
+            raise RuntimeError(f"飞书鉴权失败: {data}")
+
+        _token_cache["token"] = data["tenant_access_token"]
+        _token_cache["expires_at"] = now + int(data.get("expire", 7200))
+        _save_token_file(token_path)
+        return _token_cache["token"]
 
-def _bitable_headers() -> dict[str, str]:
+
+def _bitable_headers(token_path: Path | None = None) -> dict[str, str]:
     return {
-        "Authorization": f"Bearer {_get_tenant_access_token()}",
+        "Authorization": f"Bearer {_get_tenant_access_token(token_path)}",
         "Content-Type": "application/json",
     }
 
 
-def _append_records(records: list[dict[str, Any]]) -> int:
-    """批量写入记录，每批最多 500 条，返回实际写入条数"""
-    if not records:
-        return 0
+def _retry_delay(resp: requests.Response | None, attempt: int) -> float:
+    """优先使用飞书返回的限流重置时间，否则指数退避加抖动"""
+    if resp is not None:
+        reset = resp.headers.get("x-ogw-ratelimit-reset") or resp.headers.get("Retry-After") or ""
+        try:
+            return max(0.5, float(reset)) + random.uniform(0, 0.5)
+        except ValueError:
+            pass
+    return min(30.0, 2 ** attempt) + random.uniform(0, 0.5)
+
+
+def _batch_client_token(item_ids: list[str]) -> str:
+    """由批次内条目 ID 派生稳定的 uuid4 格式 client_token，重试同一批次时飞书侧幂等"""
+    digest = hashlib.sha1("|".join(sorted(item_ids)).encode("utf-8")).digest()
+    return str(uuid.UUID(bytes=digest[:16], version=4))
+
+
+def _post_with_retry(
+    url: str,
+    payload: dict[str, Any],
+    params: dict[str, str] | None = None,
+    token_path: Path | None = None,
+) -> dict[str, Any]:
+    """POST 到 Bitable，遇到 429 / 99991400 / 5xx 时退避重试"""
+    for attempt in range(MAX_RETRIES + 1):
+        resp = None
+        try:
+            resp = requests.post(
+                url,
+                headers=_bitable_headers(token_path),
+                params=params,
+                json=payload,
+                timeout=30,
+            )
+            if resp.status_code == 429 or resp.status_code >= 500:
+                raise RuntimeError(f"HTTP {resp.status_code}")
+            try:
+                data = resp.json()
+            except ValueError:
+                # 飞书接口本身总是返回 JSON，HTML 等非 JSON 响应来自网关（502/504 错误页），按瞬时错误重试
+                raise RuntimeError(f"HTTP {resp.status_code} 非 JSON 响应: {resp.text[:100]!r}") from None
+            if data.get("code") in RATE_LIMIT_CODES:
+                raise RuntimeError(f"飞书限流: {data.get('msg')}")
+            if data.get("code") != 0:
+                raise _FeishuAPIError(f"飞书接口返回错误: {data}")
+            return data
+        except _FeishuAPIError:
+            raise
+        except Exception as exc:
+            if attempt >= MAX_RETRIES:
+                raise RuntimeError(f"飞书请求重试 {MAX_RETRIES} 次后仍失败: {exc}") from exc
+            delay = _retry_delay(resp, attempt)
+            print(f"[Feishu] {exc}，{delay:.1f}s 后重试")
+            time.sleep(delay)
+    raise RuntimeError("unreachable")
+
+
+def _bitable_url(action: str) -> str:
+    return f"https://open.feishu.cn/open-apis/bitable/v1/apps/{FEISHU_BITABLE_TOKEN}/tables/{FEISHU_TABLE_ID}/records/{action}"
+
+
+def _send_batches(batches: list[list[Any]], write_batch: Any) -> dict[str, str]:
+    """并发发送批次，汇总各批次返回的 条目 ID -> record_id；单批失败只记录日志"""
+    done: dict[str, str] = {}
+    if not batches:
+        return done
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(batches))) as executor:
+        futures = [executor.submit(write_batch, batch) for batch in batches]
+        for future in as_completed(futures):
+            try:
+                done.update(future.result())
+            except Exception as exc:
+                print(f"[Feishu] 批次写入失败: {exc}")
+    return done
 
-    url = f"https://open.feishu.cn/open-apis/bitable/v1/apps/{FEISHU_BITABLE_TOKEN}/tables/{FEISHU_TABLE_ID}/records/batch_create"
-    written = 0
-    batch_size = 500
 
-    for i in range(0, len(records), batch_size):
-        batch = records[i : i + batch_size]
-        payload = {"records": [{"fields": r} for r in batch]}
-        resp = requests.post(url, headers=_bitable_headers(), json=payload, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
-        if data.get("code") != 0:
-            raise RuntimeError(f"写入飞书多维表格失败: {data}")
-        written += len(batch)
+def _append_records(
+    records: list[tuple[str, dict[str, Any]]],
+    token_path: Path | None = None,
+) -> dict[str, str]:
+    """
+    并发批量写入记录，每批最多 500 条。
+    records 为 (条目 ID, 字段) 列表；返回成功写入的 条目 ID -> 飞书 record_id。
+    单个批次失败不影响其它批次，失败批次的条目下次运行会重新写入。
+    """
+    url = _bitable_url("batch_create")
+
+    def write_batch(batch: list[tuple[str, dict[str, Any]]]) -> dict[str, str]:
+        item_ids = [item_id for item_id, _ in batch]
+        data = _post_with_retry(
+            url,
+            {"records": [{"fields": fields} for _, fields in batch]},
+            params={"client_token": _batch_client_token(item_ids)},
+            token_path=token_path,
+        )
+        created = (data.get("data") or {}).get("records") or []
+        # batch_create 按请求顺序返回记录
+        return {
+            item_id: str((created[i] if i < len(created) else {}).get("record_id") or "")
+            for i, item_id in enumerate(item_ids)
+        }
+
+    batches = [records[i : i + BATCH_SIZE] for i in range(0, len(records), BATCH_SIZE)]
+    return _send_batches(batches, write_batch)
+
+
+def _update_records(
+    updates: list[tuple[str, str, dict[str, Any]]],
+    token_path: Path | None = None,
+) -> dict[str, str]:
+    """
+    并发批量更新记录，每批最多 500 条。
+    updates 为 (条目 ID, 飞书 record_id, 字段) 列表；返回成功更新的 条目 ID -> record_id。
+    """
+    url = _bitable_url("batch_update")
+
+    def write_batch(batch: list[tuple[str, str, dict[str, Any]]]) -> dict[str, str]:
+        _post_with_retry(
+            url,
+            {"records": [{"record_id": record_id, "fields": fields} for _, record_id, fields in batch]},
+            token_path=token_path,
+        )
+        return {item_id: record_id for item_id, record_id, _ in batch}
+
+    batches = [updates[i : i + BATCH_SIZE] for i in range(0, len(updates), BATCH_SIZE)]
+    return _send_batches(batches, write_batch)
+
+
+def _record_fields(it: dict[str, Any]) -> dict[str, Any]:
+    """条目 -> 多维表格字段（不含采集时间，采集时间只在首次写入时填写）"""
+    title_zh = it.get("title_zh") or ""
+    title_en = it.get("title_en") or ""
+    title = it.get("title") or ""
+    display_title = title_zh or title
+
+    # 发布时间转北京时间字符串
+    published_raw = it.get("published_at") or it.get("first_seen_at") or ""
+    published_str = published_raw
+    if published_raw:
+        try:
+            from collector import parse_iso
+            dt = parse_iso(published_raw)
+            if dt:
+                published_str = dt.astimezone(SH_TZ).strftime("%Y-%m-%d %H:%M")
+        except Exception:
+            pass
 
-    return written
+    return {
+        "标题": display_title,
+        "英文标题": title_en or title,
+        "链接": it.get("url") or "",
+        "来源": it.get("source") or it.get("site_name") or "",
+        "发布时间": published_str,
+    }
 
 
-def _load_written_ids(cache_path: Path) -> set[str]:
-    """加载已写入飞书的条目 ID 集合"""
+def _fields_hash(fields: dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(fields, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _load_written_ids(cache_path: Path) -> dict[str, dict[str, Any]]:
+    """加载已写入飞书的条目：ID -> {written_at, record_id, hash}，按写入时间先后排列"""
     if not cache_path.exists():
-        return set()
+        return {}
     try:
         data = json.loads(cache_path.read_text(encoding="utf-8"))
-        return set(data) if isinstance(data, list) else set()
     except Exception:
-        return set()
-
-
-def _save_written_ids(cache_path: Path, ids: set[str]) -> None:
-    cache_path.write_text(json.dumps(sorted(ids), ensure_ascii=False), encoding="utf-8")
-
-
-def sync_to_feishu(latest_path: Path, cache_path: Path) -> int:
+        return {}
+    if isinstance(data, list):
+        # 旧格式：无时间信息的 ID 列表，视为最旧的一批
+        return {str(item_id): {"written_at": "", "record_id": ""} for item_id in data}
+    entries = data.get("items") if isinstance(data, dict) else None
+    if not isinstance(entries, dict):
+        return {}
+    out = {str(k): v for k, v in entries.items() if isinstance(v, dict)}
+    return dict(sorted(out.items(), key=lambda kv: str(kv[1].get("written_at") or "")))
+
+
+def _save_written_ids(cache_path: Path, entries: dict[str, dict[str, Any]]) -> None:
+    # 只保留最近写入的 WRITTEN_IDS_MAX 条，淘汰最早写入的
+    ordered = sorted(entries.items(), key=lambda kv: str(kv[1].get("written_at") or ""))
+    kept = dict(ordered[-WRITTEN_IDS_MAX:])
+    payload = {"version": 2, "items": kept}
+    tmp_path = cache_path.with_suffix(cache_path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    tmp_path.replace(cache_path)
+
+
+def sync_to_feishu(latest_path: Path, cache_path: Path, mode: str = "append") -> int:
     """
     将 latest-24h.json 中的新条目写入飞书多维表格。
-    返回本次写入的条数，0 表示无新增或配置缺失。
+    mode="upsert" 时，已写入且字段有变化的条目会通过 batch_update 更新。
+    返回本次新增和更新的总条数，0 表示无变化或配置缺失。
     """
     if not all([FEISHU_APP_ID, FEISHU_APP_SECRET, FEISHU_BITABLE_TOKEN, FEISHU_TABLE_ID]):
         print("[Feishu] 环境变量未配置，跳过飞书写入")
@@ -113,48 +322,42 @@ def sync_to_feishu(latest_path: Path, cache_path: Path) -> int:
     payload = json.loads(latest_path.read_text(encoding="utf-8"))
     items = payload.get("items_ai") or payload.get("items") or []
 
-    written_ids = _load_written_ids(cache_path)
-    new_items = [it for it in items if it.get("id") and it["id"] not in written_ids]
-
-    if not new_items:
-        print("[Feishu] 无新增条目，跳过写入")
+    written = _load_written_ids(cache_path)
+    collected_at = datetime.now(SH_TZ).strftime("%Y-%m-%d %H:%M")
+
+    records: list[tuple[str, dict[str, Any]]] = []
+    updates: list[tuple[str, str, dict[str, Any]]] = []
+    hashes: dict[str, str] = {}
+    for it in items:
+        item_id = it.get("id")
+        if not item_id or item_id in hashes:
+            continue
+        fields = _record_fields(it)
+        hashes[item_id] = _fields_hash(fields)
+        entry = written.get(item_id)
+        if entry is None:
+            records.append((item_id, {**fields, "采集时间": collected_at}))
+        elif mode == "upsert" and entry.get("record_id") and entry.get("hash") != hashes[item_id]:
+            # 旧缓存没有 record_id 的条目无法定位行，只能跳过
+            updates.append((item_id, str(entry["record_id"]), fields))
+
+    if not records and not updates:
+        print("[Feishu] 无新增或变更条目，跳过写入")
         return 0
 
-    records = []
-    for it in new_items:
-        title_zh = it.get("title_zh") or ""
-        title_en = it.get("title_en") or ""
-        title = it.get("title") or ""
-        display_title = title_zh or title
-
-        # 发布时间转北京时间字符串
-        published_raw = it.get("published_at") or it.get("first_seen_at") or ""
-        published_str = published_raw
-        if published_raw:
-            try:
-                from collector import parse_iso
-                dt = parse_iso(published_raw)
-                if dt:
-                    published_str = dt.astimezone(SH_TZ).strftime("%Y-%m-%d %H:%M")
-            except Exception:
-                pass
-
-        records.append({
-            "标题": display_title,
-            "英文标题": title_en or title,
-            "链接": it.get("url") or "",
-            "来源": it.get("source") or it.get("site_name") or "",
-            "发布时间": published_str,
-            "采集时间": datetime.now(SH_TZ).strftime("%Y-%m-%d %H:%M"),
-        })
-
-    count = _append_records(records)
-    new_ids = {it["id"] for it in new_items}
-    # 只保留最近 5000 条 ID，防止缓存无限增长
-    all_ids = written_ids | new_ids
-    if len(all_ids) > 5000:
-        all_ids = set(sorted(all_ids)[-5000:])
-    _save_written_ids(cache_path, all_ids)
-
-    print(f"[Feishu] 写入 {count} 条新记录")
-    return count
+    token_path = cache_path.parent / "feishu-token.json"
+    created = _append_records(records, token_path=token_path) if records else {}
+    updated = _update_records(updates, token_path=token_path) if updates else {}
+
+    now_str = datetime.now(SH_TZ).isoformat()
+    for item_id, record_id in created.items():
+        written[item_id] = {"written_at": now_str, "record_id": record_id, "hash": hashes[item_id]}
+    for item_id in updated:
+        written[item_id].update({"hash": hashes[item_id], "updated_at": now_str})
+    _save_written_ids(cache_path, written)
+
+    failed = len(records) + len(updates) - len(created) - len(updated)
+    if failed:
+        print(f"[Feishu] {failed} 条写入失败，下次运行重试")
+    print(f"[Feishu] 写入 {len(created)} 条新记录，更新 {len(updated)} 条")
+    return len(created) + len(updated)
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""Scale benchmark for the collector's non-network path.
+
+For each size tier (archive span in days) a synthetic dataset is generated with
+gen_archive.py (reused if already present under --work), then a fresh child process
+replays one hourly run against it without touching the network:
+
+    load -> upsert (simulated hourly fetch) -> prune -> window -> filter
+         -> bilingual (title cache only) -> dedupe -> payload -> write
+
+Each tier runs in its own process so peak RSS is per tier. Per-stage wall time is
+reported; --tracemalloc additionally reports each stage's peak Python allocation
+(slower, so timings under it are not comparable).
+
+    python benchmarks/bench_scale.py --tiers 7,30,90 --per-day 800
+    python benchmarks/bench_scale.py --tiers 30 --tracemalloc --regen
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+STAGES = ["load", "upsert", "prune", "window", "filter", "bilingual", "dedupe", "payload", "write"]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def hourly_batch(archive: dict[str, dict[str, Any]], now, per_day: int, seed: int) -> list:
+    """What one hourly fetch returns: most of the current listings again, plus an hour of new items."""
+    from collector import RawItem, parse_iso
+    from gen_archive import generate_records
+
+    rng = random.Random(seed)
+    cutoff = now - timedelta(hours=24)
+    listed = []
+    for record in archive.values():
+        last_seen = parse_iso(record.get("last_seen_at"))
+        if last_seen and last_seen >= cutoff:
+            listed.append(record)
+    rng.shuffle(listed)
+    fresh, _ = generate_records(1, max(1, per_day // 24), seed=seed + 1, now=now)
+    batch = []
+    for record in listed[: int(len(listed) * 0.6)] + list(fresh.values()):
+        batch.append(RawItem(
+            site_id=record["site_id"],
+            site_name=record["site_name"],
+            source=record["source"],
+            title=record["title"],
+            url=record["url"],
+            published_at=parse_iso(record.get("published_at")),
+            meta={},
+        ))
+    return batch
+
+
+def run_child(data_dir: Path, archive_days: int, per_day: int, seed: int, trace: bool) -> dict[str, Any]:
+    from collector import (
+        ARCHIVE_SHARD_DIRNAME,
+        add_bilingual_fields,
+        build_archive_payload,
+        build_latest_payload,
+        build_window,
+        dedupe_items_by_title_url,
+        is_ai_related_record,
+        load_archive,
+        load_title_zh_cache,
+        prune_archive,
+        upsert_archive,
+        utc_now,
+        write_archive_shards,
+    )
+
+    now = utc_now()
+    timings: dict[str, float] = {}
+    peaks: dict[str, float] = {}
+    state: dict[str, Any] = {}
+
+    # The fetch itself is not part of the measured path.
+    state["raw_items"] = hourly_batch(load_archive(data_dir / "archive.json"), now, per_day, seed)
+
+    def stage(name: str, fn) -> None:
+        if trace:
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        fn()
+        timings[name] = time.perf_counter() - started
+        if trace:
+            peaks[name] = tracemalloc.get_traced_memory()[1] / 1e6
+
+    def load() -> None:
+        state["archive"] = load_archive(data_dir / "archive.json")
+        state["title_cache"] = load_title_zh_cache(data_dir / "title-zh-cache.json")
+
+    def prune() -> None:
+        state["archive"] = prune_archive(state["archive"], now, archive_days)
+
+    def window() -> None:
+        state["all"] = build_window(state["archive"], now, 24)
+
+    def filter_ai() -> None:
+        state["ai"] = [record for record in state["all"] if is_ai_related_record(record)]
+
+    def bilingual() -> None:
+        state["ai"], state["all"], state["title_cache"] = add_bilingual_fields(
+            state["ai"], state["all"], None, state["title_cache"], max_new_translations=0,
+        )
+
+    def dedupe() -> None:
+        state["ai_dedup"] = dedupe_items_by_title_url(state["ai"], random_pick=False)
+        state["all_dedup"] = dedupe_items_by_title_url(state["all"], random_pick=True)
+
+    def payload() -> None:
+        state["latest"] = build_latest_payload(
+            now, 24, len(state["archive"]), state["ai"], state["all"], state["ai_dedup"], state["all_dedup"], [],
+        )
+        state["archive_payload"] = build_archive_payload(state["archive"], now)
+
+    def write() -> None:
+        with tempfile.TemporaryDirectory(prefix="bench-scale-") as tmp:
+            out = Path(tmp)
+            (out / "latest-24h.json").write_text(
+                json.dumps(state["latest"], ensure_ascii=False, indent=2), encoding="utf-8"
+            )
+            (out / "archive.json").write_text(
+                json.dumps(state["archive_payload"], ensure_ascii=False, indent=2), encoding="utf-8"
+            )
+            (out / "title-zh-cache.json").write_text(
+                json.dumps(state["title_cache"], ensure_ascii=False, indent=2), encoding="utf-8"
+            )
+            write_archive_shards(out / ARCHIVE_SHARD_DIRNAME, state["archive_payload"]["items"], now)
+
+    if trace:
+        tracemalloc.start()
+    stage("load", load)
+    stage("upsert", lambda: upsert_archive(state["archive"], state["raw_items"], now))
+    stage("prune", prune)
+    stage("window", window)
+    stage("filter", filter_ai)
+    stage("bilingual", bilingual)
+    stage("dedupe", dedupe)
+    stage("payload", payload)
+    stage("write", write)
+    if trace:
+        tracemalloc.stop()
+
+    return {
+        "archive_items": len(state["archive"]),
+        "raw_items": len(state["raw_items"]),
+        "window_items": len(state["all"]),
+        "ai_items": len(state["ai_dedup"]),
+        "archive_mb": (data_dir / "archive.json").stat().st_size / 1e6,
+        "timings": timings,
+        "trace_peaks_mb": peaks,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def ensure_tier(work: Path, days: int, per_day: int, seed: int, regen: bool) -> Path:
+    data_dir = work / f"{days}d-{per_day}"
+    if regen or not (data_dir / "archive.json").exists():
+        from gen_archive import write_dataset
+
+        started = time.perf_counter()
+        stats = write_dataset(data_dir, days, per_day, seed)
+        print(f"generated {data_dir} ({stats['archive_items']} items, {stats['archive_mb']:.1f} MB) "
+              f"in {time.perf_counter() - started:.1f}s")
+    return data_dir
+
+
+def print_tier(days: int, result: dict[str, Any]) -> None:
+    timings = result["timings"]
+    total = sum(timings.values())
+    print(f"{days:>4}d  archive {result['archive_items']:>7} items {result['archive_mb']:7.1f} MB | "
+          f"fetch {result['raw_items']} -> window {result['window_items']} -> ai {result['ai_items']} | "
+          f"total {total:6.2f}s  peak RSS {result['peak_rss_mb']:7.1f} MB")
+    print("       " + "  ".join(f"{name} {timings[name] * 1000:.0f}ms" for name in STAGES))
+    if result["trace_peaks_mb"]:
+        print("       peak alloc " + "  ".join(f"{name} {result['trace_peaks_mb'][name]:.0f}MB" for name in STAGES))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Collector scale benchmark (synthetic archive, no network)")
+    parser.add_argument("--tiers", default="7,30,90", help="Archive spans in days, comma separated")
+    parser.add_argument("--per-day", type=int, default=800, help="Archive records per day")
+    parser.add_argument("--work", default=str(Path(tempfile.gettempdir()) / "buzz-scale"),
+                        help="Where generated tiers are kept (reused across runs)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--regen", action="store_true",
+                        help="Regenerate tiers (timestamps are relative to generation time, so stale tiers shrink the window)")
+    parser.add_argument("--tracemalloc", action="store_true", help="Also report per-stage peak allocation")
+    parser.add_argument("--json", action="store_true", help="Print raw per-tier results as JSON lines")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--archive-days", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_child(Path(args.child), args.archive_days, args.per_day, args.seed, args.tracemalloc)
+        print(json.dumps(result))
+        return 0
+
+    work = Path(args.work)
+    ok = True
+    for days in [int(d) for d in args.tiers.split(",") if d.strip()]:
+        data_dir = ensure_tier(work, days, args.per_day, args.seed, args.regen)
+        command = [sys.executable, __file__, "--child", str(data_dir), "--archive-days", str(days),
+                   "--per-day", str(args.per_day), "--seed", str(args.seed)]
+        if args.tracemalloc:
+            command.append("--tracemalloc")
+        proc = subprocess.run(command, capture_output=True, text=True)
+        if proc.returncode != 0:
+            ok = False
+            print(f"{days}d failed:\n{proc.stderr.strip()}")
+            continue
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        if args.json:
+            print(json.dumps({"days": days, **result}))
+        else:
+            print_tier(days, result)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
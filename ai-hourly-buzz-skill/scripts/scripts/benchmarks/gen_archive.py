@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""Synthetic archive generator for scale benchmarks.
+
+Produces archive.json (+ archive-days/ shards) / latest-24h.json / title-zh-cache.json
+shaped like the collector's output: the real site_id mix (aggregators, tophub boards, OPML RSS), zh/en titles,
+stories syndicated across sites as near-duplicate titles and tracking-param URLs,
+and the collector's timestamp formats (ISO "Z" with and without microseconds,
+missing published_at for sites that do not expose one, RSS backfill).
+latest-24h.json is built with the collector's own window/filter/dedupe helpers.
+
+    python benchmarks/gen_archive.py --out /tmp/buzz-scale/30d --days 30 --per-day 800
+    python benchmarks/gen_archive.py --out /tmp/buzz-scale/300d --days 300 --per-day 800
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from collector import (
+    ARCHIVE_SHARD_DIRNAME,
+    add_bilingual_fields,
+    build_archive_payload,
+    build_latest_payload,
+    build_window,
+    dedupe_items_by_title_url,
+    is_ai_related_record,
+    iso,
+    make_item_id,
+    normalize_url,
+    utc_now,
+    write_archive_shards,
+)
+
+# site_id, site_name, weight, title language, P(has published_at), listing lifetime (hours), sources
+SITES: list[tuple[str, str, int, str, float, int, list[str]]] = [
+    ("techurls", "TechURLs", 10, "en", 0.0, 12, ["Hacker News", "Reddit", "GitHub Trending", "Lobsters"]),
+    ("buzzing", "Buzzing", 8, "en", 0.9, 24, ["buzzing"]),
+    ("iris", "Info Flow", 6, "en", 0.9, 24, ["Info Flow"]),
+    ("bestblogs", "BestBlogs", 6, "mixed", 0.95, 72, ["BestBlogs 精选", "BestBlogs AI"]),
+    ("tophub", "TopHub", 14, "zh", 0.0, 24,
+     ["知乎热榜", "36氪 24小时热榜", "机器之心", "量子位", "Readhub · AI", "IT之家", "微博热搜", "淘宝 热销总榜"]),
+    ("zeli", "Zeli", 4, "en", 0.8, 24, ["Hacker News 24h最热", "Hacker News 最新"]),
+    ("aihubtoday", "AI HubToday", 5, "zh", 1.0, 48, ["AI HubToday"]),
+    ("aibase", "AIbase", 8, "zh", 1.0, 48, ["AIbase"]),
+    ("aihot", "AI Hot", 5, "zh", 0.7, 48, ["AI Hot"]),
+    ("newsnow", "NewsNow", 12, "mixed", 0.3, 12, ["华尔街见闻", "财联社", "IT之家", "Hacker News", "Product Hunt"]),
+    ("opmlrss", "OPML RSS", 22, "en", 1.0, 96,
+     ["OpenAI News", "Simon Willison", "The Verge AI", "TechCrunch AI", "Google AI Blog", "量子位", "机器之心"]),
+]
+
+_EN_COMPANIES = ["OpenAI", "Anthropic", "Google", "DeepMind", "Meta", "Microsoft", "NVIDIA", "Mistral",
+                 "Hugging Face", "Apple", "Amazon", "xAI", "Perplexity", "Cohere", "Stability AI", "Runway"]
+_EN_ACTIONS = ["launches", "releases", "open-sources", "unveils", "raises $%dM for", "acquires", "previews",
+               "cuts prices of", "benchmarks", "ships"]
+_EN_AI_OBJECTS = ["a reasoning LLM", "an agent framework", "a multimodal model", "a diffusion model for video",
+                  "a coding assistant", "GPT-style small models", "an inference chip", "a robotics foundation model",
+                  "an AI search engine", "a fine-tuning API", "open weights", "a prompt caching API"]
+_EN_TECH_OBJECTS = ["a Rust terminal emulator", "a new Linux scheduler", "a SQLite extension", "a browser engine",
+                    "a password manager", "a static site generator", "a TCP congestion algorithm"]
+_EN_TAILS = ["", " with 1M-token context", " for enterprises", " in 40 languages", " after safety review",
+             " for on-device inference", " at half the price", " to rival competitors"]
+_ZH_COMPANIES = ["字节跳动", "阿里巴巴", "腾讯", "百度", "智谱", "月之暗面", "DeepSeek", "MiniMax", "商汤", "华为",
+                 "小米", "阶跃星辰", "科大讯飞", "快手", "OpenAI", "英伟达"]
+_ZH_AI_EVENTS = ["发布新一代大模型", "开源多模态模型", "推出 AI 智能体平台", "上线 AI 编程助手", "发布推理芯片",
+                 "完成新一轮融资", "发布具身智能机器人", "大幅下调模型 API 价格", "推出视频生成模型", "升级 AI 搜索"]
+_ZH_TECH_EVENTS = ["发布新款手机", "公布季度财报", "调整组织架构", "推出新款笔记本", "发布操作系统更新"]
+_ZH_NOISE = ["明星综艺收视率创新高", "足球联赛爆冷", "旅游旺季机票涨价", "美食节开幕", "券后价直降 300 元"]
+_ZH_TAILS = ["", "，性能提升 50%", "，开发者可免费试用", "，对标 GPT-4", "，业内人士解读", "（附实测）"]
+_EN_SUFFIXES = [" - The Verge", " | TechCrunch", " - Ars Technica", " (2025)", ""]
+_ZH_DECORATIONS = [("【AI】", ""), ("", "｜机器之心"), ("", " - 量子位"), ("重磅！", ""), ("", "")]
+_HOSTS_EN = ["openai.com", "techcrunch.com", "theverge.com", "arstechnica.com", "simonwillison.net",
+             "github.com", "huggingface.co", "blog.google", "news.ycombinator.com", "medium.com"]
+_HOSTS_ZH = ["jiqizhixin.com", "qbitai.com", "36kr.com", "ithome.com", "aibase.com", "zhihu.com", "sspai.com"]
+
+
+def _story(rng: random.Random, serial: int) -> dict[str, Any]:
+    """One underlying news event: language, AI-ness, canonical title and URL."""
+    zh = rng.random() < 0.45
+    kind = rng.choices(["ai", "tech", "noise"], weights=[65, 25, 10])[0]
+    if zh:
+        company = rng.choice(_ZH_COMPANIES)
+        if kind == "ai":
+            title = f"{company}{rng.choice(_ZH_AI_EVENTS)}{rng.choice(_ZH_TAILS)}"
+        elif kind == "tech":
+            title = f"{company}{rng.choice(_ZH_TECH_EVENTS)}{rng.choice(_ZH_TAILS)}"
+        else:
+            title = rng.choice(_ZH_NOISE)
+        title += f" 第{serial % 997}期" if rng.random() < 0.3 else ""
+        host = rng.choice(_HOSTS_ZH)
+    else:
+        company = rng.choice(_EN_COMPANIES)
+        action = rng.choice(_EN_ACTIONS)
+        if "%d" in action:
+            action = action % rng.choice([20, 50, 100, 300, 1000])
+        objects = _EN_AI_OBJECTS if kind == "ai" else _EN_TECH_OBJECTS
+        title = f"{company} {action} {rng.choice(objects)}{rng.choice(_EN_TAILS)}"
+        if kind == "noise":
+            title = f"Show HN: {rng.choice(_EN_TECH_OBJECTS)} written in a weekend"
+        if rng.random() < 0.4:
+            title += f" (v{serial % 50}.{serial % 7})"
+        host = rng.choice(_HOSTS_EN)
+    slug = "-".join(str(serial * 7919 % 1000003).split()) + f"-{rng.randrange(16 ** 6):06x}"
+    return {"zh": zh, "kind": kind, "title": title, "url": f"https://{host}/p/{slug}"}
+
+
+def _variant(rng: random.Random, story: dict[str, Any], copy_index: int) -> str:
+    """Near-duplicate title as it shows up on another site."""
+    title = story["title"]
+    if copy_index == 0:
+        return title
+    if story["zh"]:
+        prefix, suffix = rng.choice(_ZH_DECORATIONS)
+        if rng.random() < 0.3:
+            title = title.replace("，", " ")
+        return f"{prefix}{title}{suffix}"
+    choice = rng.random()
+    if choice < 0.3:
+        return title + rng.choice(_EN_SUFFIXES)
+    if choice < 0.5:
+        return title.lower()
+    if choice < 0.7:
+        return title.rstrip(")").replace(" (v", ", version ") if "(v" in title else title + "."
+    return title
+
+
+def _variant_url(rng: random.Random, story: dict[str, Any], site_id: str, serial: int) -> str:
+    """Aggregators link the original (sometimes with tracking params); boards link their own page."""
+    url = story["url"]
+    if site_id in {"tophub", "aibase", "aihot", "aihubtoday"} and rng.random() < 0.6:
+        return f"https://{site_id}.example.com/item/{serial}"
+    if rng.random() < 0.25:
+        return f"{url}?utm_source={site_id}&utm_medium=rss"
+    if rng.random() < 0.1:
+        return url + "/"
+    return url
+
+
+def _pseudo_zh(title: str, rng: random.Random) -> str:
+    return f"{rng.choice(_ZH_COMPANIES)}{rng.choice(_ZH_AI_EVENTS)}（译）"
+
+
+def generate_records(days: int, per_day: int, seed: int = 0, now: datetime | None = None,
+                     ) -> tuple[dict[str, dict[str, Any]], dict[str, str]]:
+    """Archive records spread over `days` days ending at `now`, plus a title-zh cache."""
+    rng = random.Random(seed)
+    now = now or utc_now()
+    weights = [site[2] for site in SITES]
+    archive: dict[str, dict[str, Any]] = {}
+    title_cache: dict[str, str] = {}
+    serial = 0
+    total = days * per_day
+    start = now - timedelta(days=days)
+
+    while len(archive) < total:
+        serial += 1
+        story = _story(rng, serial)
+        # Hourly runs: first_seen lands a few minutes past the hour the story surfaced.
+        surfaced = start + timedelta(seconds=rng.uniform(0, days * 86400))
+        copies = 1
+        while copies < 5 and rng.random() < 0.38:
+            copies += 1
+        sites = rng.choices(SITES, weights=weights, k=copies)
+        for copy_index, (site_id, site_name, _, lang, p_pub, lifetime, sources) in enumerate(sites):
+            if lang == "zh" and not story["zh"] and rng.random() < 0.7:
+                continue
+            if lang == "en" and story["zh"] and site_id != "opmlrss" and rng.random() < 0.7:
+                continue
+            title = _variant(rng, story, copy_index)
+            url = normalize_url(_variant_url(rng, story, site_id, serial * 10 + copy_index))
+            source = rng.choice(sources)
+            item_id = make_item_id(site_id, source, title, url)
+            if item_id in archive:
+                continue
+
+            seen = surfaced + timedelta(hours=copy_index * rng.uniform(0, 6))
+            seen = seen.replace(minute=rng.randint(0, 6), second=rng.randint(0, 59),
+                                microsecond=rng.randint(0, 999999))
+            if seen > now:
+                continue
+            published = None
+            if rng.random() < p_pub:
+                lag = rng.uniform(0, 2)
+                if site_id == "opmlrss" and rng.random() < 0.15:
+                    lag += rng.uniform(24, 24 * 20)  # feed backfill: old posts seen for the first time
+                published = (seen - timedelta(hours=lag)).replace(microsecond=0)
+            last_seen = min(now, seen + timedelta(hours=rng.randint(0, lifetime)))
+
+            archive[item_id] = {
+                "id": item_id,
+                "site_id": site_id,
+                "site_name": site_name,
+                "source": source,
+                "title": title,
+                "url": url,
+                "published_at": iso(published),
+                "first_seen_at": iso(seen),
+                "last_seen_at": iso(last_seen),
+            }
+            if not story["zh"] and story["kind"] == "ai" and rng.random() < 0.7:
+                title_cache[title] = _pseudo_zh(title, rng)
+    return archive, title_cache
+
+
+def write_dataset(out_dir: Path, days: int, per_day: int, seed: int = 0, window_hours: int = 24) -> dict[str, Any]:
+    """Write archive.json, latest-24h.json and title-zh-cache.json the way the collector does."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    now = utc_now()
+    archive, title_cache = generate_records(days, per_day, seed, now)
+
+    latest_items_all = build_window(archive, now, window_hours)
+    latest_items = [record for record in latest_items_all if is_ai_related_record(record)]
+    latest_items, latest_items_all, title_cache = add_bilingual_fields(
+        latest_items, latest_items_all, None, title_cache, max_new_translations=0,
+    )
+    latest_payload = build_latest_payload(
+        now,
+        window_hours,
+        len(archive),
+        latest_items,
+        latest_items_all,
+        dedupe_items_by_title_url(latest_items, random_pick=False),
+        dedupe_items_by_title_url(latest_items_all, random_pick=True),
+        [],
+    )
+
+    archive_payload = build_archive_payload(archive, now)
+    (out_dir / "archive.json").write_text(json.dumps(archive_payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    write_archive_shards(out_dir / ARCHIVE_SHARD_DIRNAME, archive_payload["items"], now)
+    (out_dir / "latest-24h.json").write_text(json.dumps(latest_payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    (out_dir / "title-zh-cache.json").write_text(json.dumps(title_cache, ensure_ascii=False, indent=2), encoding="utf-8")
+    return {
+        "archive_items": len(archive),
+        "latest_items_ai": latest_payload["total_items"],
+        "latest_items_raw": latest_payload["total_items_raw"],
+        "archive_mb": (out_dir / "archive.json").stat().st_size / 1e6,
+        "latest_mb": (out_dir / "latest-24h.json").stat().st_size / 1e6,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic collector archive")
+    parser.add_argument("--out", required=True, help="Output directory (archive.json / latest-24h.json / title-zh-cache.json)")
+    parser.add_argument("--days", type=int, default=30, help="Archive span in days")
+    parser.add_argument("--per-day", type=int, default=800, help="Archive records per day")
+    parser.add_argument("--window-hours", type=int, default=24, help="latest-24h window size")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    stats = write_dataset(Path(args.out), args.days, args.per_day, args.seed, args.window_hours)
+    print(
+        f"Wrote {args.out}: archive {stats['archive_items']} items ({stats['archive_mb']:.1f} MB), "
+        f"latest {stats['latest_items_ai']} AI / {stats['latest_items_raw']} raw ({stats['latest_mb']:.1f} MB) "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""共享数据本地查询服务
+
+同一台服务器上的日报、深度专栏不必各自解析 archive.json / latest-24h.json：
+本服务把归档最近 window_hours 的部分（优先读 archive-days/ 按天切分，旧数据目录回退 archive.json）
+和 latest-24h.json 常驻内存，在 Unix domain socket 上应答查询。每个连接一个请求，
+请求是一行 JSON，应答是紧凑的 JSON lines：首行是头部（ok / count / 数据版本），随后 count 行条目。
+
+    -> {"op": "query", "dataset": "archive", "since": 1760832000, "sites": ["aibase"], "ai": true}
+    <- {"ok": true, "dataset": "archive", "count": 2, "generated_at": "...", "window_start": ...}
+    <- {"id": "...", "site_id": "aibase", "title": "...", ...}
+    <- {"id": "...", "site_id": "aibase", "title": "...", ...}
+
+请求：
+  ping                     服务与数据状态
+  query dataset=archive    最晚时间戳（last_seen / published / first_seen）不早于 since（epoch 秒）
+                           或 hours 小时内的归档条目，顺序同 archive.json；没有时间的条目总是返回
+  query dataset=latest     latest-24h.json：ai=true 返回 items_ai，否则 items_all
+  可选过滤：sites=[site_id, ...]、ai=true/false（collector 的 AI 话题判定）
+
+文件 mtime 变化时下一次查询前重新加载，每小时的采集只管写文件。
+main.py 带 --query-socket 时会在服务没运行时拉起它，也可以手动启动：
+
+    python scripts/shared_query_server.py --data-dir data --socket data/shared-query.sock
+"""
+
+from __future__ import annotations
+
+import argparse
+import fcntl
+import json
+import os
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from collector import ARCHIVE_SHARD_DIRNAME, ARCHIVE_SHARD_UNDATED, is_ai_related_record, parse_iso
+
+MAX_REQUEST_BYTES = 64 * 1024
+DEFAULT_WINDOW_HOURS = 72
+# archive.json 比 index.json 新出这么多秒，说明切分没跟着更新，改读 archive.json
+SHARD_STALE_SLACK_SECONDS = 60
+
+
+def _epoch(value: Any) -> float | None:
+    if not value:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value)
+    try:
+        dt = datetime.fromisoformat(text[:-1] + "+00:00" if text.endswith("Z") else text)
+        if dt.tzinfo is None:
+            dt = parse_iso(text)
+    except ValueError:
+        dt = parse_iso(text)
+    return dt.timestamp() if dt else None
+
+
+def record_epoch(record: dict[str, Any]) -> float | None:
+    """条目最晚的时间戳（与 archive-days 的分天依据一致）"""
+    stamps = [_epoch(record.get(key)) for key in ("last_seen_at", "published_at", "first_seen_at")]
+    stamps = [s for s in stamps if s is not None]
+    return max(stamps) if stamps else None
+
+
+def _mtime(path: Path) -> float | None:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
+class _Dataset:
+    """一份常驻内存的数据：每条预先序列化成一行，查询时只做过滤和拼接"""
+
+    def __init__(self, entries: list[tuple[float | None, str, bool, bytes]], meta: dict[str, Any]):
+        self.entries = entries
+        self.meta = meta
+
+    def select(self, since: float | None, sites: set[str] | None, ai: bool | None) -> list[bytes]:
+        lines = []
+        for ts, site_id, is_ai, line in self.entries:
+            if since is not None and ts is not None and ts < since:
+                continue
+            if sites is not None and site_id not in sites:
+                continue
+            if ai is not None and is_ai != ai:
+                continue
+            lines.append(line)
+        return lines
+
+
+def _entries(records: list[dict[str, Any]], window_start: float | None = None) -> list:
+    entries = []
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        ts = record_epoch(record)
+        if window_start is not None and ts is not None and ts < window_start:
+            continue
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+        entries.append((ts, str(record.get("site_id") or ""), is_ai_related_record(record), line))
+    return entries
+
+
+class SharedDataStore:
+    """按 mtime 懒加载 archive / latest 两份数据，线程安全"""
+
+    def __init__(self, data_dir: Path, window_hours: float = DEFAULT_WINDOW_HOURS):
+        self.data_dir = Path(data_dir)
+        self.window_hours = window_hours
+        self.archive_path = self.data_dir / "archive.json"
+        self.index_path = self.data_dir / ARCHIVE_SHARD_DIRNAME / "index.json"
+        self.latest_path = self.data_dir / "latest-24h.json"
+        self._lock = threading.Lock()
+        self._archive: _Dataset | None = None
+        self._archive_signature: tuple | None = None
+        self._latest: dict[str, _Dataset] | None = None
+        self._latest_signature: float | None = None
+
+    def _load_archive(self) -> _Dataset | None:
+        window_start = time.time() - self.window_hours * 3600
+        index_mtime, archive_mtime = _mtime(self.index_path), _mtime(self.archive_path)
+        records: list[dict[str, Any]] | None = None
+        meta: dict[str, Any] = {}
+        if index_mtime is not None and (archive_mtime is None or archive_mtime <= index_mtime + SHARD_STALE_SLACK_SECONDS):
+            try:
+                index = json.loads(self.index_path.read_text(encoding="utf-8"))
+                first_day = datetime.fromtimestamp(window_start, tz=timezone.utc).date().isoformat()
+                days = index.get("days") or {}
+                wanted = sorted((d for d in days if d != ARCHIVE_SHARD_UNDATED and d >= first_day), reverse=True)
+                if ARCHIVE_SHARD_UNDATED in days:
+                    wanted.append(ARCHIVE_SHARD_UNDATED)
+                records = []
+                for day in wanted:
+                    shard = json.loads((self.index_path.parent / f"{day}.json").read_text(encoding="utf-8"))
+                    records.extend(shard.get("items", []))
+                meta = {"source": ARCHIVE_SHARD_DIRNAME, "generated_at": index.get("generated_at")}
+            except Exception as exc:
+                print(f"[QueryService] Failed to read {ARCHIVE_SHARD_DIRNAME}, falling back to archive.json: {exc}", flush=True)
+                records = None
+        if records is None:
+            if archive_mtime is None:
+                return None
+            try:
+                payload = json.loads(self.archive_path.read_text(encoding="utf-8"))
+            except Exception as exc:
+                print(f"[QueryService] Failed to read {self.archive_path}: {exc}", flush=True)
+                return None
+            items = payload if isinstance(payload, list) else payload.get("items", [])
+            records = items if isinstance(items, list) else list(items.values())
+            meta = {"source": "archive.json", "generated_at": None if isinstance(payload, list) else payload.get("generated_at")}
+
+        entries = _entries(records, window_start)
+        meta.update({"window_start": window_start, "window_hours": self.window_hours, "items": len(entries)})
+        return _Dataset(entries, meta)
+
+    def _load_latest(self) -> dict[str, _Dataset] | None:
+        try:
+            payload = json.loads(self.latest_path.read_text(encoding="utf-8"))
+        except Exception as exc:
+            print(f"[QueryService] Failed to read {self.latest_path}: {exc}", flush=True)
+            return None
+        meta = {"source": self.latest_path.name, "generated_at": payload.get("generated_at")}
+        return {
+            "items_ai": _Dataset(_entries(payload.get("items_ai") or []), dict(meta)),
+            "items_all": _Dataset(_entries(payload.get("items_all") or []), dict(meta)),
+        }
+
+    def refresh(self) -> None:
+        """文件有变化就重新加载（stat 开销可以忽略，每次查询前都检查）"""
+        with self._lock:
+            signature = (_mtime(self.index_path), _mtime(self.archive_path))
+            if signature != self._archive_signature:
+                started = time.perf_counter()
+                self._archive = self._load_archive()
+                self._archive_signature = signature
+                if self._archive:
+                    print(
+                        f"[QueryService] Loaded archive window: {self._archive.meta['items']} items from "
+                        f"{self._archive.meta['source']} in {time.perf_counter() - started:.2f}s",
+                        flush=True,
+                    )
+            latest_signature = _mtime(self.latest_path)
+            if latest_signature != self._latest_signature:
+                self._latest = self._load_latest() if latest_signature is not None else None
+                self._latest_signature = latest_signature
+
+    def status(self) -> dict[str, Any]:
+        self.refresh()
+        archive, latest = self._archive, self._latest
+        return {
+            "ok": True,
+            "pid": os.getpid(),
+            "data_dir": str(self.data_dir),
+            "archive": archive.meta if archive else None,
+            "latest": latest["items_ai"].meta if latest else None,
+        }
+
+    def query(self, request: dict[str, Any]) -> tuple[dict[str, Any], list[bytes]]:
+        self.refresh()
+        dataset = request.get("dataset", "archive")
+        ai = request.get("ai")
+        if ai is not None and not isinstance(ai, bool):
+            return {"ok": False, "error": "ai must be true, false or omitted"}, []
+        sites = request.get("sites")
+        sites = {str(s) for s in sites} if sites else None
+        since = request.get("since")
+        if since is None and request.get("hours") is not None:
+            since = time.time() - float(request["hours"]) * 3600
+        since = float(since) if since is not None else None
+
+        if dataset == "archive":
+            data = self._archive
+            if data is None:
+                return {"ok": False, "error": "archive not available"}, []
+            if since is None or since < data.meta["window_start"]:
+                # 只常驻了最近 window_hours，更早的请求交给调用方读文件
+                return {"ok": False, "error": f"window exceeds the {self.window_hours}h kept in memory"}, []
+        elif dataset == "latest":
+            if self._latest is None:
+                return {"ok": False, "error": "latest not available"}, []
+            data = self._latest["items_ai" if ai else "items_all"]
+            if ai:
+                ai = None  # items_ai 已经是 AI 条目
+        else:
+            return {"ok": False, "error": f"unknown dataset: {dataset}"}, []
+
+        lines = data.select(since, sites, ai)
+        header = {"ok": True, "dataset": dataset, "count": len(lines), **data.meta}
+        return header, lines
+
+    def handle(self, request: Any) -> tuple[dict[str, Any], list[bytes]]:
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "request must be a JSON object"}, []
+        op = request.get("op", "query")
+        if op == "ping":
+            return self.status(), []
+        if op == "query":
+            return self.query(request)
+        return {"ok": False, "error": f"unknown op: {op}"}, []
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    timeout = 10
+
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline(MAX_REQUEST_BYTES) or b"null")
+            header, lines = self.server.store.handle(request)
+        except (ValueError, TypeError) as exc:
+            header, lines = {"ok": False, "error": f"bad request: {exc}"}, []
+        except Exception as exc:
+            print(f"[QueryService] Query failed: {exc}", flush=True)
+            header, lines = {"ok": False, "error": "internal error"}, []
+        head = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+        try:
+            # wfile 不带缓冲，逐行写就是逐行 send，拼好一次写完
+            self.wfile.write(b"".join([head, *lines]))
+        except OSError:
+            pass  # 客户端已经超时断开
+
+
+class SharedQueryServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, store: SharedDataStore):
+        self.store = store
+        super().__init__(str(socket_path), _Handler)
+
+
+def ping(socket_path: Path, timeout: float = 2.0) -> dict[str, Any] | None:
+    """服务在跑返回状态，否则 None"""
+    if not hasattr(socket, "AF_UNIX") or not Path(socket_path).exists():
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(socket_path))
+            sock.sendall(b'{"op":"ping"}\n')
+            with sock.makefile("rb") as stream:
+                status = json.loads(stream.readline() or b"null")
+    except (OSError, ValueError):
+        return None
+    return status if isinstance(status, dict) and status.get("ok") else None
+
+
+def ensure_running(
+    socket_path: Path,
+    data_dir: Path,
+    window_hours: float = DEFAULT_WINDOW_HOURS,
+    wait_seconds: float = 10.0,
+) -> bool:
+    """服务没在跑就在后台拉起（脱离当前会话，采集进程退出后继续运行），返回是否可用"""
+    if ping(socket_path):
+        return True
+    log_path = Path(socket_path).with_suffix(".log")
+    with open(log_path, "ab") as log:
+        subprocess.Popen(
+            [
+                sys.executable,
+                str(Path(__file__).resolve()),
+                "--data-dir", str(Path(data_dir).resolve()),
+                "--socket", str(Path(socket_path).resolve()),
+                "--window-hours", str(window_hours),
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+    deadline = time.monotonic() + wait_seconds
+    while time.monotonic() < deadline:
+        if ping(socket_path, timeout=wait_seconds):
+            return True
+        time.sleep(0.2)
+    return False
+
+
+def serve(socket_path: Path, data_dir: Path, window_hours: float = DEFAULT_WINDOW_HOURS) -> int:
+    socket_path = Path(socket_path)
+    # 采集拉起和手动启动可能同时发生，锁住再清理旧 socket，避免互相删掉对方的
+    lock_file = open(socket_path.with_suffix(".lock"), "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        print(f"[QueryService] Already running on {socket_path}", flush=True)
+        return 0
+    if socket_path.exists():
+        socket_path.unlink()  # 上一个进程异常退出留下的
+
+    store = SharedDataStore(data_dir, window_hours)
+    store.refresh()
+    server = SharedQueryServer(socket_path, store)
+    os.chmod(socket_path, 0o600)
+
+    def stop(signum: int, frame: Any) -> None:
+        # shutdown() 会等 serve_forever 返回，不能在同一个线程里调用
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print(f"[QueryService] Serving {data_dir} on {socket_path} (pid {os.getpid()}, window {window_hours}h)", flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        try:
+            socket_path.unlink()
+        except OSError:
+            pass
+        lock_file.close()
+        print("[QueryService] Stopped", flush=True)
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Serve the shared data window over a Unix domain socket")
+    parser.add_argument("--data-dir", default="data", help="Directory with archive.json / archive-days / latest-24h.json")
+    parser.add_argument("--socket", default="", help="Socket path (default: <data-dir>/shared-query.sock)")
+    parser.add_argument("--window-hours", type=float, default=DEFAULT_WINDOW_HOURS,
+                        help="How much of the archive to keep in memory; older queries fall back to files")
+    parser.add_argument("--ping", action="store_true", help="Print the running service's status and exit")
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir)
+    socket_path = Path(args.socket) if args.socket else data_dir / "shared-query.sock"
+    if args.ping:
+        status = ping(socket_path)
+        print(json.dumps(status, ensure_ascii=False, indent=2) if status else f"Not running: {socket_path}")
+        return 0 if status else 1
+    return serve(socket_path, data_dir, args.window_hours)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())